@@ -0,0 +1 @@
+"""Работа с градуировочными таблицами: разбор, проверка и хранение."""
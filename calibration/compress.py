@@ -0,0 +1,108 @@
+"""
+Сжатие градуировочной таблицы в кусочно-линейную функцию с гарантированной погрешностью.
+
+Алгоритм «вращающейся двери» (swinging door): от начала отрезка поддерживается
+диапазон наклонов, при которых прямая проходит в пределах допуска от всех уже
+пройденных строк. Когда очередная строка делает диапазон пустым, отрезок
+закрывается на предыдущей строке и начинается новый. Один проход, O(N).
+
+Вместимость любой исходной строки, вычисленная интерполяцией по точкам излома,
+отличается от табличной не больше чем на tolerance.
+"""
+
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from calibration.table import CalibrationTable
+
+# Допуск по умолчанию, м3 - половина единицы третьего знака, с которым обычно записаны таблицы
+DEFAULT_TOLERANCE = 0.0005
+
+
+class CompressedTable(NamedTuple):
+    levels: np.ndarray      # уровни точек излома (подмножество исходных уровней), int64
+    volumes: np.ndarray     # вместимости в точках излома, float64
+    tolerance: float
+    source_rows: int        # число строк исходной таблицы
+    name: str = ''
+
+    def volume_at(self, levels: Union[int, float, np.ndarray]):
+        """Вместимость при уровне (или массиве уровней) интерполяцией по точкам излома."""
+        result = np.interp(levels, self.levels, self.volumes)
+        return float(result) if np.ndim(result) == 0 else result
+
+    @property
+    def nbytes(self) -> int:
+        return self.levels.nbytes + self.volumes.nbytes
+
+    @property
+    def ratio(self) -> float:
+        """Во сколько раз уменьшилось число строк."""
+        return self.source_rows / max(len(self.levels), 1)
+
+    def to_table(self) -> CalibrationTable:
+        """Точки излома в виде обычной таблицы (для записи в файл)."""
+        return CalibrationTable(self.levels, self.volumes, self.name)
+
+
+def compress_table(table: CalibrationTable, tolerance: float = DEFAULT_TOLERANCE) -> CompressedTable:
+    """
+    Сжимает таблицу до точек излома кусочно-линейной функции.
+
+    Args:
+        table: Таблица без повторяющихся уровней.
+        tolerance: Наибольшее допустимое отклонение вместимости, м3.
+
+    Returns:
+        CompressedTable: Точки излома и параметры сжатия.
+    """
+    if tolerance < 0:
+        raise ValueError("Допуск не может быть отрицательным")
+    ordered = table.sorted()
+    levels = ordered.levels
+    volumes = ordered.volumes
+    if np.any(np.diff(levels) == 0):
+        raise ValueError("Уровни таблицы повторяются - сначала устраните дубликаты")
+    if len(levels) < 3:
+        return CompressedTable(levels.copy(), volumes.copy(), tolerance, len(levels), table.name)
+
+    monotonic = bool(np.all(np.diff(volumes) >= 0))
+    x = levels.astype(np.float64).tolist()
+    y = volumes.tolist()
+
+    out_levels = [levels[0]]
+    out_volumes = [y[0]]
+    anchor_x, anchor_y = x[0], y[0]
+    low, high = -np.inf, np.inf
+    for i in range(1, len(x)):
+        dx = x[i] - anchor_x
+        point_low = (y[i] - tolerance - anchor_y) / dx
+        point_high = (y[i] + tolerance - anchor_y) / dx
+        new_low = max(low, point_low)
+        new_high = min(high, point_high)
+        if new_low <= new_high:
+            low, high = new_low, new_high
+            continue
+
+        # Отрезок закрывается на предыдущей строке, наклоном из середины допустимого диапазона
+        floor = max(low, 0.0) if monotonic else low
+        slope = (floor + high) / 2 if floor <= high else (low + high) / 2
+        end_x = x[i - 1]
+        end_y = anchor_y + slope * (end_x - anchor_x)
+        out_levels.append(levels[i - 1])
+        out_volumes.append(end_y)
+
+        anchor_x, anchor_y = end_x, end_y
+        dx = x[i] - anchor_x
+        low = (y[i] - tolerance - anchor_y) / dx
+        high = (y[i] + tolerance - anchor_y) / dx
+
+    # Последняя точка - как можно ближе к таблице в пределах допустимого диапазона наклонов
+    floor = max(low, 0.0) if monotonic and max(low, 0.0) <= high else low
+    last_slope = min(max((y[-1] - anchor_y) / (x[-1] - anchor_x), floor), high)
+    out_levels.append(levels[-1])
+    out_volumes.append(anchor_y + last_slope * (x[-1] - anchor_x))
+
+    return CompressedTable(np.array(out_levels, dtype=np.int64), np.array(out_volumes, dtype=np.float64),
+                           tolerance, len(levels), table.name)
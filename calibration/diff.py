@@ -0,0 +1,127 @@
+"""
+Сравнение двух версий градуировочной таблицы резервуара (например, после переградуировки).
+
+Таблицы выравниваются по уровню слиянием отсортированных массивов уровней, поэтому
+сравнение таблиц в десятки тысяч строк выполняется за миллисекунды.
+"""
+
+from typing import List, NamedTuple
+
+import numpy as np
+
+from calibration.table import CalibrationTable, format_volume
+
+
+class TableDiff(NamedTuple):
+    levels: np.ndarray        # уровни, присутствующие в обеих таблицах
+    old_volumes: np.ndarray
+    new_volumes: np.ndarray
+    inserted: np.ndarray      # уровни, появившиеся в новой таблице
+    removed: np.ndarray       # уровни, отсутствующие в новой таблице
+
+    @property
+    def deltas(self) -> np.ndarray:
+        """Изменение вместимости на общих уровнях (новая минус старая)."""
+        return self.new_volumes - self.old_volumes
+
+    @property
+    def changed(self) -> np.ndarray:
+        """Маска общих уровней, на которых вместимость изменилась."""
+        return self.deltas != 0
+
+    def summary(self, limit: int = 10) -> List[str]:
+        """
+        Краткая сводка изменений.
+
+        Args:
+            limit: Сколько диапазонов добавленных и удалённых уровней перечислять.
+        """
+        deltas = self.deltas
+        lines = [f"Общих уровней: {len(self.levels)}, изменено: {int(self.changed.sum())}",
+                 f"Добавлено уровней: {len(self.inserted)}, удалено: {len(self.removed)}"]
+        if len(deltas):
+            worst = int(np.abs(deltas).argmax())
+            lines.append(f"Наибольшее отклонение: {deltas[worst]:+.6g} м3 на уровне {self.levels[worst]}")
+            lines.append(f"Среднее абсолютное отклонение: {np.abs(deltas).mean():.6g} м3, "
+                         f"среднее: {deltas.mean():+.6g} м3")
+        step = self._step()
+        if len(self.inserted):
+            lines.append(f"Добавлены уровни ({len(self.inserted)}): {_ranges(self.inserted, step, limit)}")
+        if len(self.removed):
+            lines.append(f"Удалены уровни ({len(self.removed)}): {_ranges(self.removed, step, limit)}")
+        return lines
+
+    def _step(self) -> int:
+        """Самый частый шаг уровней обеих таблиц."""
+        levels = np.union1d(np.union1d(self.levels, self.inserted), self.removed)
+        steps = np.diff(levels)
+        if not len(steps):
+            return 1
+        values, counts = np.unique(steps, return_counts=True)
+        return int(values[counts.argmax()])
+
+    def write(self, path: str, changed_only: bool = False):
+        """
+        Записывает полный список изменений: 'уровень~старая~новая~разница'.
+
+        Добавленные и удалённые уровни записываются с пустой старой или новой вместимостью.
+        """
+        deltas = self.deltas
+        rows = self.changed if changed_only else np.ones(len(self.levels), dtype=bool)
+        with open(path, 'w', encoding='utf-8') as f:
+            for level, old, new, delta in zip(self.levels[rows].tolist(), self.old_volumes[rows].tolist(),
+                                              self.new_volumes[rows].tolist(), deltas[rows].tolist()):
+                f.write(f"{level}~{format_volume(old)}~{format_volume(new)}~{delta:+.6g}\n")
+            for level in self.removed.tolist():
+                f.write(f"{level}~removed\n")
+            for level in self.inserted.tolist():
+                f.write(f"{level}~inserted\n")
+
+
+def _ranges(levels: np.ndarray, step: int, limit: int) -> str:
+    """Уровни в виде диапазонов подряд идущих с шагом step: '0, 264..269'."""
+    breaks = np.flatnonzero(np.diff(levels) != step) + 1
+    starts = levels[np.r_[0, breaks]].tolist()
+    ends = levels[np.r_[breaks - 1, len(levels) - 1]].tolist()
+    parts = [str(start) if start == end else f"{start}..{end}" for start, end in zip(starts, ends)]
+    text = ', '.join(parts[:limit])
+    return text + (f" ... (всего диапазонов {len(parts)})" if len(parts) > limit else '')
+
+
+def _unique_levels(table: CalibrationTable):
+    """Уровни по возрастанию и вместимости; для повторяющегося уровня берётся последняя строка."""
+    reverse_levels = table.levels[::-1]
+    levels, last = np.unique(reverse_levels, return_index=True)
+    return levels, table.volumes[::-1][last]
+
+
+def diff_tables(old: CalibrationTable, new: CalibrationTable) -> TableDiff:
+    """
+    Сравнивает две версии таблицы по уровням.
+
+    Args:
+        old: Прежняя таблица.
+        new: Новая таблица.
+
+    Returns:
+        TableDiff: Вместимости на общих уровнях, добавленные и удалённые уровни.
+    """
+    old_levels, old_volumes = _unique_levels(old)
+    new_levels, new_volumes = _unique_levels(new)
+
+    # Для каждого уровня старой таблицы - позиция в новой; совпадение означает общий уровень
+    positions = np.searchsorted(new_levels, old_levels)
+    clipped = np.minimum(positions, len(new_levels) - 1)
+    common = (positions < len(new_levels)) & (new_levels[clipped] == old_levels) if len(new_levels) \
+        else np.zeros(len(old_levels), dtype=bool)
+
+    in_old = np.zeros(len(new_levels), dtype=bool)
+    in_old[positions[common]] = True
+
+    return TableDiff(
+        levels=old_levels[common],
+        old_volumes=old_volumes[common],
+        new_volumes=new_volumes[positions[common]],
+        inserted=new_levels[~in_old],
+        removed=old_levels[~common],
+    )
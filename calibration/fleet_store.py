@@ -0,0 +1,201 @@
+"""
+Двоичное хранилище таблиц всего парка в одном файле, открываемое через mmap.
+
+Формат (little-endian):
+
+    заголовок   magic 'CTSTORE1', версия uint32, число таблиц uint32
+    индекс      записи фиксированной длины, упорядоченные по номеру резервуара:
+                номер (utf-8, до ID_SIZE байт), смещение uint64, число строк uint32
+    данные      для каждой таблицы: уровни int32, затем вместимости float64,
+                каждый массив выровнен на 8 байт
+
+Индекс и массивы таблиц читаются как представления NumPy прямо над отображённым
+файлом: открытие не разбирает таблицы, а процессы, открывшие одно хранилище,
+разделяют одну физическую копию страниц в кэше ОС.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from calibration.table import CalibrationTable
+
+MAGIC = b'CTSTORE1'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+# Наибольшая длина номера резервуара в байтах utf-8
+ID_SIZE = 64
+
+INDEX_DTYPE = np.dtype([('tank_id', f'S{ID_SIZE}'), ('offset', '<u8'), ('rows', '<u4'), ('reserved', '<u4')])
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _encode_id(tank_id: str) -> bytes:
+    encoded = str(tank_id).encode('utf-8')
+    if len(encoded) > ID_SIZE:
+        raise ValueError(f"Номер резервуара длиннее {ID_SIZE} байт: {tank_id}")
+    if encoded.endswith(b'\0') or not encoded:
+        raise ValueError(f"Недопустимый номер резервуара: {tank_id!r}")
+    return encoded
+
+
+class StoredTable(NamedTuple):
+    tank_id: str
+    levels: np.ndarray      # int32, представление над файлом
+    volumes: np.ndarray     # float64, представление над файлом
+
+    def volume_at(self, levels):
+        """Вместимость при уровне (или массиве уровней) линейной интерполяцией."""
+        result = np.interp(levels, self.levels, self.volumes)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def to_table(self) -> CalibrationTable:
+        """Копия в виде обычной таблицы."""
+        return CalibrationTable(self.levels, self.volumes, self.tank_id)
+
+
+def build_store(path: Union[str, os.PathLike], tables: Iterable[Tuple[str, CalibrationTable]]) -> int:
+    """
+    Записывает хранилище из пар (номер резервуара, таблица).
+
+    Файл сначала пишется во временный и затем подменяет прежний. В POSIX процессы,
+    уже открывшие прежнее хранилище, продолжают работать с ним. В Windows отображённый
+    в память файл подменить нельзя: пока хранилище открыто читателями (в том числе
+    через ещё живые таблицы после close()), сборка завершается PermissionError,
+    а прежний файл остаётся нетронутым. Читатели закрывают хранилище, и сборка повторяется.
+
+    Returns:
+        int: Число записанных таблиц.
+
+    Raises:
+        ValueError: Повторяющийся номер резервуара, повторяющиеся уровни или уровни вне int32.
+        PermissionError: Прежнее хранилище открыто другим процессом (Windows).
+    """
+    entries = {}
+    for tank_id, table in tables:
+        key = _encode_id(tank_id)
+        if key in entries:
+            raise ValueError(f"Резервуар {tank_id} указан дважды")
+        ordered = table.sorted()
+        if len(ordered) and (ordered.levels[0] < _INT32.min or ordered.levels[-1] > _INT32.max):
+            raise ValueError(f"Резервуар {tank_id}: уровни не помещаются в int32")
+        if np.any(np.diff(ordered.levels) == 0):
+            raise ValueError(f"Резервуар {tank_id}: уровни таблицы повторяются")
+        entries[key] = ordered
+
+    keys = sorted(entries)
+    index = np.zeros(len(keys), dtype=INDEX_DTYPE)
+    offset = _align(HEADER.size + index.nbytes)
+    for i, key in enumerate(keys):
+        rows = len(entries[key])
+        index[i] = (key, offset, rows, 0)
+        offset = _align(_align(offset + rows * 4) + rows * 8)
+
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.fleet_store_', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            f.write(index.tobytes())
+            for entry, key in zip(index, keys):
+                table = entries[key]
+                f.seek(int(entry['offset']))
+                f.write(table.levels.astype('<i4').tobytes())
+                f.seek(_align(int(entry['offset']) + len(table) * 4))
+                f.write(table.volumes.astype('<f8').tobytes())
+            f.truncate(offset)
+        try:
+            os.replace(temp_path, path)
+        except PermissionError as e:
+            raise PermissionError(f"{path}: хранилище открыто другим процессом, "
+                                  f"закройте его и повторите сборку") from e
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(keys)
+
+
+class FleetStore:
+    """
+    Хранилище таблиц парка, открытое только для чтения через mmap.
+
+    Таблицы возвращаются как представления над файлом без копирования.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path}: не является хранилищем таблиц")
+        if version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path}: неподдерживаемая версия хранилища {version}")
+        self._index = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=count, offset=HEADER.size)
+
+    def _find(self, tank_id: str) -> int:
+        key = str(tank_id).encode('utf-8')
+        position = int(np.searchsorted(self._index['tank_id'], key))
+        if position >= len(self._index) or self._index['tank_id'][position] != key:
+            raise KeyError(tank_id)
+        return position
+
+    def get(self, tank_id: str) -> StoredTable:
+        """
+        Таблица резервуара (представления над файлом).
+
+        Raises:
+            KeyError: Резервуара нет в хранилище.
+        """
+        entry = self._index[self._find(tank_id)]
+        offset, rows = int(entry['offset']), int(entry['rows'])
+        levels = np.frombuffer(self._mmap, dtype='<i4', count=rows, offset=offset)
+        volumes = np.frombuffer(self._mmap, dtype='<f8', count=rows, offset=_align(offset + rows * 4))
+        return StoredTable(str(tank_id), levels, volumes)
+
+    def volume(self, tank_id: str, level):
+        """Вместимость резервуара при уровне (или массиве уровней)."""
+        return self.get(tank_id).volume_at(level)
+
+    def tank_ids(self) -> Iterator[str]:
+        for key in self._index['tank_id'].tolist():
+            yield key.decode('utf-8')
+
+    def __contains__(self, tank_id):
+        try:
+            self._find(tank_id)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Закрывает отображение; если ещё живы выданные таблицы, оно закроется вместе с ними."""
+        self._index = self._index[:0].copy()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
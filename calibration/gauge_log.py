@@ -0,0 +1,187 @@
+"""
+Потоковый пересчёт журналов замеров (CSV: станция, резервуар, время, уровень, температура)
+из уровня во вместимость по градуировочным таблицам.
+
+Журнал читается блоками фиксированного числа строк: внутри блока строки группируются
+по резервуару и пересчитываются одной интерполяцией на резервуар, результат сразу
+дописывается в выходной файл. Потребление памяти определяется размером блока,
+а не размером журнала.
+"""
+
+import csv
+import time
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from calibration.numeric import parse_numbers
+from calibration.thermal import correct_volumes
+
+# Число строк журнала, обрабатываемых за один раз
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Имена столбцов журнала по умолчанию
+COLUMNS = ('station', 'tank', 'timestamp', 'level', 'temperature')
+
+# Столбцы, добавляемые в выходной файл
+VOLUME_COLUMN = 'volume'
+CORRECTION_COLUMNS = ('volume15', 'mass')
+
+
+def _sniff_delimiter(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+    except csv.Error:
+        return ','
+
+
+def _column_index(header, name):
+    lowered = [column.strip().lower() for column in header]
+    try:
+        return lowered.index(name.lower())
+    except ValueError:
+        raise ValueError(f"В журнале нет столбца '{name}'") from None
+
+
+def _column_values(rows, index):
+    return [row[index] if len(row) > index else '' for row in rows]
+
+
+def convert_chunk(rows, tables, key_columns, level_column) -> Dict[str, np.ndarray]:
+    """
+    Пересчитывает блок строк журнала.
+
+    Args:
+        rows: Список строк (списков значений) журнала.
+        tables: Источник таблиц с методами volume(tank_id, levels) и `in`
+            (FleetStore или TableRegistry).
+        key_columns: Индексы столбцов, образующих номер резервуара (соединяются через '-').
+        level_column: Индекс столбца уровня.
+
+    Returns:
+        dict: 'volumes' (NaN, где пересчёт невозможен) и маски 'invalid_level',
+        'unknown_tank', 'out_of_range'.
+    """
+    count = len(rows)
+    width = max(max(key_columns), level_column) + 1
+    if any(len(row) < width for row in rows):
+        # Неполные строки дополняются пустыми значениями
+        rows = [row + [''] * (width - len(row)) if len(row) < width else row for row in rows]
+    keys = list(map(itemgetter(*key_columns), rows))
+    levels, level_valid = parse_numbers(list(map(itemgetter(level_column), rows)))
+
+    volumes = np.full(count, np.nan)
+    unknown = np.zeros(count, dtype=bool)
+    out_of_range = np.zeros(count, dtype=bool)
+
+    # Номера групп строк по резервуару (словарь быстрее np.unique по строкам)
+    codes = {}
+    inverse = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.intp, count=count)
+    if len(key_columns) == 1:
+        tank_ids = [key.strip() for key in codes]
+    else:
+        tank_ids = ['-'.join(part.strip() for part in key) for key in codes]
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(tank_ids) + 1))
+    for position, tank_id in enumerate(tank_ids):
+        indices = order[bounds[position]:bounds[position + 1]]
+        if tank_id not in tables:
+            unknown[indices] = True
+            continue
+        indices = indices[level_valid[indices]]
+        table = tables.get(tank_id)
+        if not len(table.levels):
+            out_of_range[indices] = True
+            continue
+        tank_levels = levels[indices]
+        inside = (tank_levels >= table.levels[0]) & (tank_levels <= table.levels[-1])
+        volumes[indices[inside]] = np.interp(tank_levels[inside], table.levels, table.volumes)
+        out_of_range[indices[~inside]] = True
+
+    return {'volumes': volumes, 'invalid_level': ~level_valid & ~unknown,
+            'unknown_tank': unknown, 'out_of_range': out_of_range}
+
+
+def process_gauge_log(input_path: str, output_path: str, tables, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      key_columns=('tank',), level_column: str = 'level', delimiter: Optional[str] = None,
+                      decimals: int = 3, progress: Optional[Callable[[int, float], None]] = None,
+                      density: Optional[float] = None, density_column: Optional[str] = None,
+                      product: str = 'auto', temperature_column: str = 'temperature') -> Dict[str, float]:
+    """
+    Дописывает к журналу замеров столбец вместимости.
+
+    Args:
+        input_path: CSV журнала с заголовком.
+        output_path: CSV результата (столбцы журнала и 'volume').
+        tables: FleetStore или TableRegistry.
+        chunk_rows: Размер блока в строках.
+        key_columns: Столбцы, образующие номер резервуара в хранилище, например ('station', 'tank').
+        level_column: Столбец уровня.
+        delimiter: Разделитель CSV; по умолчанию определяется по заголовку.
+        decimals: Знаков после запятой у вместимости.
+        progress: Вызывается после каждого блока с (строк обработано, секунд прошло).
+        density: Плотность продукта при 15 °C, кг/м3, одна для всего журнала.
+        density_column: Столбец плотности при 15 °C (вместо density).
+        product: Группа продуктов для приведения объёма (см. calibration.thermal).
+        temperature_column: Столбец температуры продукта.
+
+    Если задана плотность, добавляются столбцы объёма при 15 °C ('volume15', м3)
+    и массы ('mass', т).
+
+    Returns:
+        dict: rows, converted, invalid_level, unknown_tank, out_of_range, seconds, rows_per_second.
+    """
+    stats = {'rows': 0, 'converted': 0, 'invalid_level': 0, 'unknown_tank': 0, 'out_of_range': 0}
+    start = time.perf_counter()
+
+    with open(input_path, 'r', encoding='utf-8-sig', newline='') as infile, \
+            open(output_path, 'w', encoding='utf-8', newline='') as outfile:
+        header_line = infile.readline()
+        if delimiter is None:
+            delimiter = _sniff_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter))
+        key_indices = [_column_index(header, name) for name in key_columns]
+        level_index = _column_index(header, level_column)
+        correct = density is not None or density_column is not None
+        if correct:
+            temperature_index = _column_index(header, temperature_column)
+            density_index = _column_index(header, density_column) if density_column else None
+
+        reader = csv.reader(infile, delimiter=delimiter)
+        writer = csv.writer(outfile, delimiter=delimiter)
+        writer.writerow(header + [VOLUME_COLUMN] + (list(CORRECTION_COLUMNS) if correct else []))
+        # Короткие строки дополняются пустыми ячейками, чтобы результат попал под свои заголовки
+        padding = [''] * len(header)
+
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+            result = convert_chunk(rows, tables, key_indices, level_index)
+            volumes = result['volumes']
+            template = f'{{:.{decimals}f}}'.format
+            if correct:
+                temperatures, _ = parse_numbers(_column_values(rows, temperature_index))
+                densities = parse_numbers(_column_values(rows, density_index))[0] if density_index is not None \
+                    else density
+                corrected = correct_volumes(volumes, temperatures, densities, product)
+                writer.writerows(
+                    row + padding[len(row):] + ['' if value != value else template(value) for value in values]
+                    for row, *values in zip(rows, volumes.tolist(), corrected['standard_volume'].tolist(),
+                                            corrected['mass'].tolist()))
+            else:
+                writer.writerows(row + padding[len(row):] + ['' if volume != volume else template(volume)]
+                                 for row, volume in zip(rows, volumes.tolist()))
+
+            stats['rows'] += len(rows)
+            stats['converted'] += int((~np.isnan(volumes)).sum())
+            for name in ('invalid_level', 'unknown_tank', 'out_of_range'):
+                stats[name] += int(result[name].sum())
+            if progress is not None:
+                progress(stats['rows'], time.perf_counter() - start)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
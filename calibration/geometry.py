@@ -0,0 +1,190 @@
+"""
+Сверка градуировочной таблицы с теоретической формой резервуара.
+
+Вместимость горизонтального цилиндра с эллиптическими днищами при уровне h:
+
+    V(h) = L * S(h) + b * E(h) + V0,
+
+где S - площадь сегмента круга радиуса R, E - объём эллипсоида с полуосями R, R, 1
+ниже уровня h (два днища глубиной b/2 вместе образуют эллипсоид), V0 - объём
+ниже нуля уровня. При заданном R модель линейна по (L, b, V0), поэтому для сетки
+радиусов все задачи наименьших квадратов решаются одной пакетной операцией.
+Вертикальный цилиндр - прямая V(h) = A * h + V0.
+
+Сами таблицы отличаются от идеальной формы плавно (деформация стенок, внутренние
+детали), а ошибки распознавания и переписывания - резкими выбросами в отдельных
+строках, поэтому строки отмечаются по отклонению остатка от его скользящей медианы.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from calibration.table import CalibrationTable
+
+# Диапазон поиска диаметра относительно наибольшего уровня таблицы и число узлов сетки
+DIAMETER_RANGE = (0.9, 1.3)
+DIAMETER_STEPS = 161
+
+# Окно скользящей медианы остатков
+RESIDUAL_WINDOW = 9
+
+# Строка отмечается, если её остаток отклоняется от скользящей медианы больше, чем
+# на столько типичных отклонений (MAD) и больше абсолютного допуска
+RESIDUAL_FACTOR = 8.0
+
+# Абсолютный допуск по умолчанию - доля полной вместимости. Подобран по образцу
+# excel_extractor/49.txt: деформация стенок и округление до 0.001 м3 дают там
+# отклонения остатка от скользящей медианы до 1.2e-4 полной вместимости, допуск
+# взят с запасом в 4 раза. Сверка с формой - справочная и не является проверкой таблицы
+DEFAULT_TOLERANCE = 5e-4
+
+SHAPES = ('horizontal', 'vertical')
+
+
+class GeometryFit(NamedTuple):
+    shape: str                      # 'horizontal' или 'vertical'
+    params: Dict[str, float]        # диаметр в единицах уровня и коэффициенты модели (см. описание модуля)
+    levels: np.ndarray
+    fitted: np.ndarray              # теоретические вместимости
+    residuals: np.ndarray           # таблица минус теория
+    flagged: np.ndarray             # уровни с резким отклонением от формы
+    rms: float                      # среднеквадратичный остаток
+
+    def messages(self, limit: int = 10) -> List[str]:
+        """Описание результата сверки для журнала."""
+        params = ', '.join(f"{name}={value:.4g}" for name, value in self.params.items())
+        shape = 'горизонтальный цилиндр' if self.shape == 'horizontal' else 'вертикальный цилиндр'
+        messages = [f"Форма: {shape} ({params}), СКО остатка {self.rms:.4g} м3"]
+        if len(self.flagged):
+            listed = ', '.join(str(level) for level in self.flagged[:limit].tolist())
+            if len(self.flagged) > limit:
+                listed += f" ... (всего {len(self.flagged)})"
+            messages.append(f"Отклонение от формы резервуара на уровнях: {listed}")
+        return messages
+
+
+def segment_area(levels: np.ndarray, radius) -> np.ndarray:
+    """Площадь сегмента круга радиуса radius, заполненного до высоты levels (оба аргумента транслируются)."""
+    h = np.clip(levels, 0, 2 * radius)
+    return radius ** 2 * np.arccos((radius - h) / radius) - (radius - h) * np.sqrt(np.maximum(2 * radius * h - h ** 2, 0))
+
+
+def ellipsoid_volume(levels: np.ndarray, radius) -> np.ndarray:
+    """Объём эллипсоида с полуосями radius, radius, 1 ниже уровня levels."""
+    h = np.clip(levels, 0, 2 * radius)
+    return np.pi * h ** 2 * (3 * radius - h) / (3 * radius)
+
+
+def _solve_batched(design: np.ndarray, volumes: np.ndarray):
+    """
+    Решает пакет задач наименьших квадратов через нормальные уравнения.
+
+    Args:
+        design: Массив (K, N, P) матриц плана.
+        volumes: Массив (N,) наблюдений.
+
+    Returns:
+        tuple: коэффициенты (K, P) и суммы квадратов остатков (K,).
+    """
+    gram = np.einsum('knp,knq->kpq', design, design)
+    rhs = np.einsum('knp,n->kp', design, volumes)
+    # Небольшая регуляризация для вырожденных сочетаний (например, без днищ)
+    gram += np.eye(gram.shape[-1]) * 1e-12 * np.trace(gram, axis1=1, axis2=2)[:, None, None]
+    coefs = np.linalg.solve(gram, rhs[..., None])[..., 0]
+    residuals = volumes - np.einsum('knp,kp->kn', design, coefs)
+    return coefs, np.einsum('kn,kn->k', residuals, residuals)
+
+
+def _horizontal_design(levels, radii):
+    columns = (segment_area(levels[None, :], radii[:, None]),
+               ellipsoid_volume(levels[None, :], radii[:, None]),
+               np.ones((len(radii), len(levels))))
+    return np.stack(columns, axis=-1)
+
+
+def _fit_horizontal(levels, volumes, diameter=None):
+    if diameter is not None:
+        radii = np.array([diameter / 2.0])
+    else:
+        top = float(levels.max())
+        radii = np.linspace(*DIAMETER_RANGE, DIAMETER_STEPS) * top / 2
+        # Уточнение вокруг лучшего узла грубой сетки
+        _, sse = _solve_batched(_horizontal_design(levels, radii), volumes)
+        best = int(np.argmin(sse))
+        spacing = radii[1] - radii[0]
+        radii = np.linspace(radii[best] - spacing, radii[best] + spacing, 41)
+
+    coefs, sse = _solve_batched(_horizontal_design(levels, radii), volumes)
+    best = int(np.argmin(sse))
+    radius = radii[best]
+    length, heads, offset = coefs[best]
+    fitted = _horizontal_design(levels, radii[best:best + 1])[0] @ coefs[best]
+    params = {'diameter': 2 * radius, 'section_factor': length, 'heads_factor': heads, 'offset': offset}
+    return params, fitted
+
+
+def _fit_vertical(levels, volumes):
+    design = np.stack((levels, np.ones_like(levels)), axis=-1)[None]
+    coefs, _ = _solve_batched(design, volumes)
+    area, offset = coefs[0]
+    return {'area_factor': area, 'offset': offset}, design[0] @ coefs[0]
+
+
+def _flag_rows(levels, residuals, tolerance):
+    """Уровни, на которых остаток резко отличается от скользящей медианы остатков."""
+    if len(residuals) < RESIDUAL_WINDOW:
+        return levels[np.abs(residuals) > tolerance]
+    half = RESIDUAL_WINDOW // 2
+    padded = np.pad(residuals, half, mode='edge')
+    local = residuals - np.median(sliding_window_view(padded, RESIDUAL_WINDOW), axis=1)
+    scale = 1.4826 * np.median(np.abs(local))
+    return levels[np.abs(local) > max(RESIDUAL_FACTOR * scale, tolerance)]
+
+
+def fit_geometry(table: CalibrationTable, shape: str = 'auto', diameter: Optional[float] = None,
+                 tolerance: Optional[float] = None) -> GeometryFit:
+    """
+    Подбирает форму резервуара к таблице и отмечает строки, выпадающие из неё.
+
+    Args:
+        table: Градуировочная таблица.
+        shape: 'horizontal', 'vertical' или 'auto' (форма с меньшим остатком).
+        diameter: Номинальный диаметр горизонтального резервуара в единицах уровня;
+            если не задан, подбирается по таблице.
+        tolerance: Абсолютный допуск отклонения, м3; по умолчанию DEFAULT_TOLERANCE
+            от полной вместимости.
+
+    Returns:
+        GeometryFit: Параметры формы, теоретические вместимости и отмеченные уровни.
+    """
+    if shape not in SHAPES + ('auto',):
+        raise ValueError(f"Неизвестная форма резервуара: {shape}")
+    ordered = table.sorted()
+    levels = ordered.levels.astype(np.float64)
+    volumes = ordered.volumes
+    if len(levels) < 4:
+        raise ValueError("Для сверки с формой резервуара нужно не менее 4 строк")
+
+    candidates = {}
+    if shape in ('vertical', 'auto'):
+        candidates['vertical'] = _fit_vertical(levels, volumes)
+    if shape in ('horizontal', 'auto'):
+        candidates['horizontal'] = _fit_horizontal(levels, volumes, diameter)
+
+    best_shape = min(candidates, key=lambda name: np.sum((volumes - candidates[name][1]) ** 2))
+    params, fitted = candidates[best_shape]
+    residuals = volumes - fitted
+    if tolerance is None:
+        tolerance = DEFAULT_TOLERANCE * float(np.abs(volumes).max())
+
+    return GeometryFit(
+        shape=best_shape,
+        params={name: float(value) for name, value in params.items()},
+        levels=ordered.levels,
+        fitted=fitted,
+        residuals=residuals,
+        flagged=_flag_rows(ordered.levels, residuals, tolerance),
+        rms=float(np.sqrt(np.mean(residuals ** 2))),
+    )
@@ -0,0 +1,207 @@
+"""
+Общий разбор чисел из ячеек таблиц для всех извлекателей.
+
+Ячейки разбираются пакетом: строки склеиваются через разделитель, нормализуются
+и проверяются одним регулярным выражением по всему тексту, а в числа переводятся
+одним преобразованием массива NumPy. Поддерживаются десятичная запятая,
+разделители разрядов (пробел, неразрывный и узкий пробелы) и типичный шум OCR.
+"""
+
+import re
+import time
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+# Разделитель ячеек в склеенном тексте - символ, которого не бывает в документах
+SEPARATOR = '\x1f'
+
+# Разделители разрядов; \s не используется, т.к. он совпадает и с SEPARATOR
+_THOUSANDS = '[ \u00a0\u2009\u202f]'
+
+# Число: целая часть (возможно, с разделителями разрядов), дробная часть через точку
+# или запятую, необязательный порядок. Группа после разделителя - ровно 3 цифры,
+# иначе '123 4567' читалось бы как 123456
+_NUMBER = (
+    r'-?(?:\d{1,3}(?:' + _THOUSANDS + r'\d{3}(?!\d))+|\d+)(?:[.,]\d*)?(?:[eE][-+]?\d+)?'
+    r'|-?[.,]\d+'
+)
+# Шум вокруг числа в распознанных ячейках: рамки таблицы, кавычки, подчёркивания
+_NOISE = '[ \t\r\n\u00a0\u2009\u202f|\'"*_~]*'
+
+# Шаблоны применяются к тексту с разделителем после каждой ячейки; findall даёт
+# по одной группе на ячейку - число или '' для ячейки без числа.
+# Ячейка целиком является числом
+_FULL_PATTERN = re.compile(
+    '(?:' + _NOISE + '(' + _NUMBER + ')' + _NOISE + SEPARATOR + '|[^' + SEPARATOR + ']*' + SEPARATOR + ')'
+)
+# Первое число внутри ячейки ("300 см", "V=258,217")
+_SEARCH_PATTERN = re.compile(
+    '(?:[^' + SEPARATOR + ']*?(' + _NUMBER + ')[^' + SEPARATOR + ']*' + SEPARATOR
+    + '|[^' + SEPARATOR + ']*' + SEPARATOR + ')'
+)
+
+# Удаление разделителей разрядов и замена десятичной запятой
+_CLEAN_TABLE = str.maketrans({' ': None, '\u00a0': None, '\u2009': None, '\u202f': None,
+                              '\t': None, '\r': None, '\n': None, ',': '.'})
+
+# Только замена десятичной запятой - для быстрого пути
+_COMMA_TABLE = str.maketrans(',', '.')
+
+# Максимальное число знаков после запятой, которое пытаемся определить у вместимостей
+MAX_DECIMALS = 6
+
+# Буквы, которые OCR путает с цифрами (латиница и кириллица)
+_OCR_TABLE = str.maketrans({'O': '0', 'o': '0', 'О': '0', 'о': '0',
+                            'l': '1', 'I': '1', 'З': '3', 'Б': '6'})
+
+
+def infer_decimals(values: np.ndarray) -> int:
+    """Определяет наименьшее число знаков после запятой, которым записаны все значения."""
+    if not len(values):
+        return 0
+    scales = 10.0 ** np.arange(MAX_DECIMALS + 1)
+    scaled = np.abs(values)[None, :] * scales[:, None]
+    exact = np.all(np.abs(scaled - np.round(scaled)) < 1e-6 * np.maximum(scaled, 1), axis=1)
+    return int(np.argmax(exact)) if exact.any() else MAX_DECIMALS
+
+
+def normalize_numbers(cells: List[str], ocr: bool = False, search: bool = False) -> List[str]:
+    """
+    Выделяет числа из строковых ячеек.
+
+    Args:
+        cells: Строки ячеек.
+        ocr: Заменять буквы, похожие на цифры (O -> 0, l -> 1 ...), - для распознанного текста.
+        search: Брать первое число внутри ячейки, а не требовать, чтобы ячейка была числом целиком.
+
+    Returns:
+        list: Для каждой ячейки - число в виде '1234.567' или '' для ячеек без числа.
+    """
+    if not cells:
+        return []
+
+    text = SEPARATOR.join(cells)
+    if text.count(SEPARATOR) != len(cells) - 1:
+        # Разделитель встретился внутри ячейки
+        text = SEPARATOR.join(cell.replace(SEPARATOR, ' ') for cell in cells)
+    if ocr:
+        text = text.translate(_OCR_TABLE)
+
+    pattern = _SEARCH_PATTERN if search else _FULL_PATTERN
+    found = pattern.findall(text + SEPARATOR)
+    return SEPARATOR.join(found).translate(_CLEAN_TABLE).split(SEPARATOR)
+
+
+def parse_numbers(cells: Iterable, integer: bool = False, ocr: bool = False,
+                  search: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Разбирает пакет ячеек в массив чисел.
+
+    Ячейки могут быть строками или уже числами (xlrd, pandas); пустые значения и NaN
+    считаются невалидными.
+
+    Args:
+        cells: Значения ячеек.
+        integer: Требовать целые значения (для уровней) и вернуть массив int64.
+        ocr: Заменять буквы, похожие на цифры.
+        search: Брать первое число внутри ячейки.
+
+    Returns:
+        tuple: (массив значений float64 или int64, булева маска валидных ячеек).
+    """
+    cells = cells if isinstance(cells, list) else list(cells)
+    if not cells:
+        values = np.empty(0, dtype=np.int64 if integer else np.float64)
+        return values, np.empty(0, dtype=bool)
+
+    values = None
+    if not isinstance(cells[0], str):
+        try:
+            # Ячейки уже числа (xlrd, pandas) - разбор строк не нужен
+            values = np.asarray(cells, dtype=np.float64)
+        except (ValueError, TypeError):
+            values = None
+
+    if values is None and not search:
+        # Быстрый путь: все ячейки - числа с десятичной запятой. float() допускает
+        # подчёркивания в числах, поэтому такие пакеты разбираются регулярным выражением.
+        try:
+            text = SEPARATOR.join(cells)
+            if '_' not in text and text.count(SEPARATOR) == len(cells) - 1:
+                values = np.asarray(text.translate(_COMMA_TABLE).split(SEPARATOR), dtype=np.float64)
+        except (ValueError, TypeError):
+            values = None
+
+    if values is None:
+        try:
+            tokens = normalize_numbers(cells, ocr=ocr, search=search)
+        except TypeError:
+            tokens = normalize_numbers([str(cell) for cell in cells], ocr=ocr, search=search)
+        values = np.asarray([token or 'nan' for token in tokens], dtype=np.float64)
+
+    mask = np.isfinite(values)
+    if integer:
+        mask &= values == np.floor(values)
+        values = np.where(mask, values, 0).astype(np.int64)
+    return values, mask
+
+
+def _process_cell_regex(cell):
+    """Прежний разбор ячейки RTF: регулярное выражение на каждую ячейку."""
+    if re.match(r'^-?\d*\.?\d+$|^-?\d+\.?\d*$', cell):
+        return float(cell)
+    return None
+
+
+def _replace_float(cell):
+    """Прежний разбор в pdf.py: замена запятой и float()."""
+    try:
+        return float(cell.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _search_float(cell):
+    """Прежний разбор в pdf_cloudi.py: поиск первого десятичного числа."""
+    match = re.search(r'\d+\.\d+', cell.replace(' ', '').replace(',', '.'))
+    return float(match.group()) if match else None
+
+
+def benchmark(rows=200_000, repeat=3):
+    """
+    Сравнивает пакетный разбор с прежним разбором по одной ячейке.
+
+    Returns:
+        dict: название способа -> лучшее время в секундах.
+    """
+    samples = ['258.217', '1 234,567', '12', '0,0853', 'Уровень, см', '', '3 051,2', '-4.5']
+    cells = [samples[i % len(samples)] for i in range(rows)]
+
+    clean = [sample for sample in samples if _replace_float(sample) is not None]
+    clean_cells = [clean[i % len(clean)] for i in range(rows)]
+
+    approaches = {
+        'parse_numbers': lambda: parse_numbers(cells),
+        'parse_numbers(clean)': lambda: parse_numbers(clean_cells),
+        'float(replace)(clean)': lambda: [_replace_float(cell) for cell in clean_cells],
+        'parse_numbers(search)': lambda: parse_numbers(cells, search=True),
+        'regex per cell': lambda: [_process_cell_regex(cell) for cell in cells],
+        'float(replace) per cell': lambda: [_replace_float(cell) for cell in cells],
+        're.search per cell': lambda: [_search_float(cell) for cell in cells],
+    }
+    results = {}
+    for name, run in approaches.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+    return results
+
+
+if __name__ == "__main__":
+    rows = 200_000
+    for name, seconds in benchmark(rows).items():
+        print(f"{name:>24}: {seconds * 1000:8.1f} ms ({rows / seconds / 1e6:.2f} M cells/s)")
@@ -0,0 +1,178 @@
+"""
+Реестр градуировочных таблиц парка резервуаров по номеру резервуара.
+
+Таблицы читаются из файлов при первом обращении и хранятся в памяти в виде
+массивов; при превышении бюджета памяти вытесняются таблицы, к которым дольше
+всего не обращались (LRU). Реестр можно использовать из нескольких потоков.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from calibration.compress import compress_table
+from calibration.table import CalibrationTable
+
+# Бюджет памяти загруженных таблиц по умолчанию
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+def table_nbytes(table) -> int:
+    """Объём массивов таблицы (обычной или сжатой) в байтах."""
+    return table.levels.nbytes + table.volumes.nbytes
+
+
+class TableRegistry:
+    """
+    Отображение номер резервуара -> таблица с ленивой загрузкой и вытеснением LRU.
+
+    Источником может быть файл 'уровень~вместимость' или уже готовая таблица;
+    готовые таблицы не вытесняются, т.к. их негде перечитать.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, Union[str, os.PathLike, CalibrationTable]]] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, compress_tolerance: Optional[float] = None):
+        """
+        Args:
+            sources: Номер резервуара -> путь к файлу таблицы или таблица.
+            memory_budget: Наибольший объём загруженных таблиц в байтах.
+            compress_tolerance: Если задан, таблицы хранятся сжатыми (см. calibration.compress)
+                с этой погрешностью, м3.
+        """
+        self.memory_budget = memory_budget
+        self.compress_tolerance = compress_tolerance
+        self._lock = threading.RLock()
+        self._sources: Dict[str, Union[str, CalibrationTable]] = {}
+        self._loaded: "OrderedDict[str, object]" = OrderedDict()
+        self._pinned = set()
+        self._nbytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        for tank_id, source in (sources or {}).items():
+            self.register(tank_id, source)
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, os.PathLike], pattern: str = '*.txt', **kwargs) -> 'TableRegistry':
+        """Реестр из каталога таблиц; номер резервуара - имя файла без расширения."""
+        sources = {path.stem: path for path in sorted(Path(directory).glob(pattern))}
+        return cls(sources, **kwargs)
+
+    @classmethod
+    def from_index(cls, index_path: Union[str, os.PathLike], **kwargs) -> 'TableRegistry':
+        """
+        Реестр из JSON-файла {"номер резервуара": "путь к таблице", ...}.
+
+        Относительные пути отсчитываются от каталога индекса.
+        """
+        index_path = Path(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return cls({str(tank_id): index_path.parent / path for tank_id, path in index.items()}, **kwargs)
+
+    def register(self, tank_id: str, source: Union[str, os.PathLike, CalibrationTable]):
+        """Добавляет или заменяет источник таблицы резервуара; загруженная прежняя таблица выгружается."""
+        with self._lock:
+            self._unload(tank_id)
+            if isinstance(source, CalibrationTable):
+                self._sources[tank_id] = source
+                self._store(tank_id, self._prepare(source), pinned=True)
+            else:
+                self._sources[tank_id] = os.fspath(source)
+
+    def get(self, tank_id: str):
+        """
+        Возвращает таблицу резервуара, при необходимости загружая её.
+
+        Returns:
+            CalibrationTable, упорядоченная по уровню, или CompressedTable (если задан compress_tolerance).
+
+        Raises:
+            KeyError: Резервуар не зарегистрирован.
+        """
+        with self._lock:
+            table = self._loaded.get(tank_id)
+            if table is not None:
+                self._loaded.move_to_end(tank_id)
+                self.stats['hits'] += 1
+                return table
+            source = self._sources[tank_id]
+            self.stats['misses'] += 1
+
+        # Файл читается без блокировки, чтобы не задерживать обращения к другим резервуарам
+        loaded = CalibrationTable.read(source)
+        loaded.name = tank_id
+        table = self._prepare(loaded)
+
+        with self._lock:
+            if self._sources.get(tank_id) != source:
+                # Источник заменили, пока файл читался
+                return self.get(tank_id)
+            existing = self._loaded.get(tank_id)
+            if existing is not None:
+                # Другой поток успел загрузить ту же таблицу
+                self._loaded.move_to_end(tank_id)
+                return existing
+            self._store(tank_id, table)
+            return table
+
+    def volume(self, tank_id: str, level):
+        """Вместимость резервуара при уровне (или массиве уровней) линейной интерполяцией."""
+        table = self.get(tank_id)
+        if self.compress_tolerance is not None:
+            return table.volume_at(level)
+        result = np.interp(level, table.levels, table.volumes)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def _prepare(self, table: CalibrationTable):
+        """Приводит таблицу к виду для хранения: упорядоченной по уровню или сжатой."""
+        if self.compress_tolerance is None:
+            return table.sorted()
+        return compress_table(table, self.compress_tolerance)
+
+    def _store(self, tank_id, table, pinned=False):
+        self._loaded[tank_id] = table
+        self._nbytes += table_nbytes(table)
+        if pinned:
+            self._pinned.add(tank_id)
+        self._evict(keep=tank_id)
+
+    def _unload(self, tank_id):
+        table = self._loaded.pop(tank_id, None)
+        if table is not None:
+            self._nbytes -= table_nbytes(table)
+        self._pinned.discard(tank_id)
+
+    def _evict(self, keep):
+        """Вытесняет давно не использованные таблицы, пока объём не уложится в бюджет."""
+        for tank_id in list(self._loaded):
+            if self._nbytes <= self.memory_budget:
+                break
+            if tank_id == keep or tank_id in self._pinned:
+                continue
+            self._unload(tank_id)
+            self.stats['evictions'] += 1
+
+    @property
+    def nbytes(self) -> int:
+        """Объём загруженных таблиц в байтах."""
+        return self._nbytes
+
+    def loaded(self):
+        """Номера резервуаров, таблицы которых сейчас в памяти (от давних к недавним)."""
+        with self._lock:
+            return list(self._loaded)
+
+    def tank_ids(self):
+        """Номера всех зарегистрированных резервуаров."""
+        with self._lock:
+            return list(self._sources)
+
+    def __contains__(self, tank_id):
+        return tank_id in self._sources
+
+    def __len__(self):
+        return len(self._sources)
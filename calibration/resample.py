@@ -0,0 +1,108 @@
+"""
+Пересчёт градуировочной таблицы на другой шаг уровня (например, из сантиметров в миллиметры).
+
+Промежуточные вместимости вычисляются кусочно-линейной или монотонной кубической
+интерполяцией (PCHIP, Fritsch-Carlson): при возрастающих исходных вместимостях
+результат тоже не убывает, без выбросов между узлами, какие даёт обычный сплайн.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from calibration.table import CalibrationTable
+
+METHODS = ('linear', 'pchip')
+
+
+def pchip_slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Производные в узлах монотонного кубического интерполянта."""
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    slopes = np.zeros_like(y)
+    if len(x) == 2:
+        slopes[:] = delta[0]
+        return slopes
+
+    # Внутренние узлы: взвешенное гармоническое среднее наклонов, 0 в экстремумах
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = delta[:-1] * delta[1:] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    # Концы: трёхточечная формула с ограничением, сохраняющим монотонность
+    for end, (h0, h1, d0, d1) in ((0, (h[0], h[1], delta[0], delta[1])),
+                                  (-1, (h[-1], h[-2], delta[-1], delta[-2]))):
+        slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+        if np.sign(slope) != np.sign(d0):
+            slope = 0.0
+        elif np.sign(d0) != np.sign(d1) and abs(slope) > abs(3 * d0):
+            slope = 3 * d0
+        slopes[end] = slope
+    return slopes
+
+
+def interpolate(x: np.ndarray, y: np.ndarray, targets: np.ndarray, method: str = 'pchip') -> np.ndarray:
+    """
+    Интерполирует значения y(x) в точках targets (внутри [x[0], x[-1]]).
+
+    Args:
+        x: Строго возрастающие узлы.
+        y: Значения в узлах.
+        targets: Точки интерполяции.
+        method: 'linear' или 'pchip'.
+    """
+    if method == 'linear' or len(x) < 3:
+        return np.interp(targets, x, y)
+
+    slopes = pchip_slopes(x, y)
+    index = np.clip(np.searchsorted(x, targets, side='right') - 1, 0, len(x) - 2)
+    h = x[index + 1] - x[index]
+    t = targets - x[index]
+    delta = (y[index + 1] - y[index]) / h
+    d0, d1 = slopes[index], slopes[index + 1]
+    c2 = (3 * delta - 2 * d0 - d1) / h
+    c3 = (d0 + d1 - 2 * delta) / h ** 2
+    return y[index] + t * (d0 + t * (c2 + t * c3))
+
+
+def resample_table(table: CalibrationTable, step: int = 1, scale: int = 1, method: str = 'pchip',
+                   decimals: Optional[int] = None) -> CalibrationTable:
+    """
+    Пересчитывает таблицу на равномерную сетку уровней.
+
+    Args:
+        table: Исходная таблица.
+        step: Шаг новой сетки в новых единицах уровня.
+        scale: Во сколько раз новые единицы уровня мельче исходных (10 - из см в мм).
+        method: 'linear' или 'pchip'.
+        decimals: Округлить вместимости до стольких знаков после запятой.
+
+    Returns:
+        CalibrationTable: Таблица на новой сетке от нижнего до верхнего уровня исходной.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Неизвестный способ интерполяции: {method}")
+    if step <= 0 or scale <= 0:
+        raise ValueError("Шаг и масштаб уровня должны быть положительными")
+
+    ordered = table.sorted()
+    levels = ordered.levels * scale
+    volumes = ordered.volumes
+    if len(levels) < 2:
+        raise ValueError("Для пересчёта нужно не менее 2 уровней")
+    if np.any(np.diff(levels) <= 0):
+        raise ValueError("Уровни таблицы повторяются - сначала устраните дубликаты")
+    if np.any(np.diff(volumes) < 0):
+        raise ValueError("Вместимость убывает с уровнем - пересчёт сохранил бы ошибку")
+
+    first = -(-levels[0] // step) * step
+    targets = np.arange(first, levels[-1] + 1, step, dtype=np.int64)
+    result = interpolate(levels.astype(np.float64), volumes, targets.astype(np.float64), method)
+    # Округление при вычислениях с плавающей точкой не должно нарушать монотонность
+    result = np.maximum.accumulate(result)
+    if decimals is not None:
+        result = np.round(result, decimals)
+    return CalibrationTable(targets, result, table.name)
@@ -0,0 +1,109 @@
+"""
+Градуировочная таблица в виде массивов NumPy и её текстовый формат для 1С.
+
+Формат файла - строки вида 'уровень~вместимость', например '300~258.217'.
+"""
+
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from calibration.numeric import parse_numbers
+
+# Разделитель уровня и вместимости в текстовом формате
+FIELD_SEPARATOR = '~'
+
+
+def format_volume(volume: float, decimals: Optional[int] = None) -> str:
+    """
+    Форматирует вместимость для текстового файла.
+
+    Args:
+        volume: Вместимость.
+        decimals: Число знаков после запятой; по умолчанию - без лишних нулей.
+    """
+    if decimals is not None:
+        return f"{volume:.{decimals}f}"
+    return f"{volume:.15f}".rstrip('0').rstrip('.')
+
+
+class CalibrationTable:
+    """
+    Градуировочная таблица: уровни (int64) и вместимости (float64) в порядке строк документа.
+
+    Порядок строк не меняется при создании, поэтому проверки видят таблицу такой,
+    какой её извлекли; отсортированная копия - sorted().
+    """
+
+    __slots__ = ('levels', 'volumes', 'name')
+
+    def __init__(self, levels, volumes, name: str = ''):
+        self.levels = np.asarray(levels, dtype=np.int64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+        if self.levels.shape != self.volumes.shape or self.levels.ndim != 1:
+            raise ValueError("Уровни и вместимости должны быть одномерными массивами одной длины")
+        self.name = name
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[object, object]], name: str = '') -> 'CalibrationTable':
+        """
+        Создаёт таблицу из пар (уровень, вместимость); значения могут быть строками.
+
+        Пары с нецелым уровнем или нечисловой вместимостью пропускаются.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0), name)
+        levels, level_valid = parse_numbers([level for level, _ in pairs], integer=True)
+        volumes, volume_valid = parse_numbers([volume for _, volume in pairs])
+        valid = level_valid & volume_valid
+        return cls(levels[valid], volumes[valid], name)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], name: str = '') -> 'CalibrationTable':
+        """Создаёт таблицу из строк 'уровень~вместимость'; пустые строки пропускаются."""
+        pairs = []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(FIELD_SEPARATOR)
+            if len(parts) != 2:
+                raise ValueError(f"{name or 'таблица'}, строка {number}: ожидается 'уровень~вместимость': {line!r}")
+            pairs.append(parts)
+
+        table = cls.from_pairs(pairs, name)
+        if len(table) != len(pairs):
+            raise ValueError(f"{name or 'таблица'}: {len(pairs) - len(table)} строк с нечисловыми значениями")
+        return table
+
+    @classmethod
+    def read(cls, path: str) -> 'CalibrationTable':
+        """Читает таблицу из текстового файла в формате для 1С."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_lines(f, name=str(path))
+
+    def write(self, path: str, decimals: Optional[int] = None):
+        """Записывает таблицу в текстовый файл в формате для 1С."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.lines(decimals):
+                f.write(line + '\n')
+
+    def lines(self, decimals: Optional[int] = None) -> Iterator[str]:
+        """Строки 'уровень~вместимость' в порядке таблицы."""
+        for level, volume in zip(self.levels.tolist(), self.volumes.tolist()):
+            yield f"{level}{FIELD_SEPARATOR}{format_volume(volume, decimals)}"
+
+    def sorted(self) -> 'CalibrationTable':
+        """Копия таблицы, упорядоченная по уровню (строки с равным уровнем сохраняют порядок)."""
+        order = np.argsort(self.levels, kind='stable')
+        return CalibrationTable(self.levels[order], self.volumes[order], self.name)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.levels.tolist(), self.volumes.tolist())
+
+    def __repr__(self):
+        return f"CalibrationTable(name={self.name!r}, rows={len(self)})"
@@ -0,0 +1,142 @@
+"""
+Приведение объёма нефтепродукта к 15 °C и пересчёт в массу.
+
+Коэффициент приведения объёма (VCF) - по таблицам API MPMS 11.1 / ASTM D1250
+(таблицы 54A, 54B, 54D) для плотности при 15 °C:
+
+    alpha15 = K0 / rho15^2 + K1 / rho15 + K2
+    VCF = exp(-alpha15 * dt * (1 + 0.8 * alpha15 * dt)),  dt = t - 15
+
+Поправка на тепловое расширение стенки резервуара (CTSh, API MPMS 12.1) учитывает,
+что градуировочная таблица составлена при температуре градуировки:
+
+    CTSh = 1 + 2 * a * dts + a^2 * dts^2,  dts = t_стенки - t_градуировки
+
+Стандартный объём V15 = V * CTSh * VCF, масса = V15 * rho15.
+Все функции принимают как числа, так и массивы NumPy (значения транслируются).
+"""
+
+from typing import NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+# Базовая температура, °C
+BASE_TEMPERATURE = 15.0
+
+# Температура градуировки резервуара по умолчанию, °C
+CALIBRATION_TEMPERATURE = 20.0
+
+# Коэффициент линейного расширения стали стенки, 1/°C
+STEEL_EXPANSION = 12.5e-6
+
+# Группы продуктов: (K0, K1, K2) и диапазон плотности при 15 °C, кг/м3
+PRODUCTS = {
+    'crude': ((613.9723, 0.0, 0.0), (610.5, 1075.0)),          # 54A, нефть
+    'gasoline': ((346.4228, 0.4388, 0.0), (653.0, 770.5)),     # 54B, бензины
+    'transition': ((2680.3206, 0.0, -0.00336312), (770.5, 787.5)),  # 54B, переходная зона
+    'jet': ((594.5418, 0.0, 0.0), (787.5, 838.5)),             # 54B, керосины, дизельное топливо
+    'fuel_oil': ((186.9696, 0.4862, 0.0), (838.5, 1075.0)),    # 54B, мазуты, печное топливо
+    'lube': ((0.0, 0.34878, 0.0), (800.0, 1164.0)),            # 54D, масла
+}
+
+# Группы светлых нефтепродуктов (54B), выбираемые по плотности при product='auto'
+_REFINED = ('gasoline', 'transition', 'jet', 'fuel_oil')
+_REFINED_BOUNDS = np.array([PRODUCTS[name][1][1] for name in _REFINED[:-1]])
+_REFINED_CONSTANTS = np.array([PRODUCTS[name][0] for name in _REFINED])
+
+ArrayLike = Union[float, np.ndarray, Sequence[float]]
+
+
+class CorrectedReading(NamedTuple):
+    volume: float             # объём по таблице, м3
+    standard_volume: float    # объём при 15 °C, м3
+    mass: float               # масса, т
+    vcf: float
+    ctsh: float
+
+
+def _constants(density15: np.ndarray, product) -> np.ndarray:
+    """Константы (K0, K1, K2) для каждого значения плотности; форма (..., 3)."""
+    if isinstance(product, str):
+        if product == 'auto':
+            return _REFINED_CONSTANTS[np.searchsorted(_REFINED_BOUNDS, density15, side='right')]
+        if product not in PRODUCTS:
+            raise ValueError(f"Неизвестная группа продуктов: {product}")
+        return np.broadcast_to(np.array(PRODUCTS[product][0]), np.shape(density15) + (3,))
+
+    # Группа продукта для каждого замера
+    product = np.asarray(product)
+    constants = np.empty(np.broadcast_shapes(np.shape(density15), product.shape) + (3,))
+    density15 = np.broadcast_to(density15, constants.shape[:-1])
+    product = np.broadcast_to(product, constants.shape[:-1])
+    for name in np.unique(product).tolist():
+        selected = product == name
+        constants[selected] = _constants(density15[selected], name)
+    return constants
+
+
+def thermal_expansion(density15: ArrayLike, product='auto') -> np.ndarray:
+    """Коэффициент объёмного расширения продукта при 15 °C, 1/°C."""
+    density15 = np.asarray(density15, dtype=np.float64)
+    k = _constants(density15, product)
+    return k[..., 0] / density15 ** 2 + k[..., 1] / density15 + k[..., 2]
+
+
+def vcf(temperature: ArrayLike, density15: ArrayLike, product='auto') -> np.ndarray:
+    """
+    Коэффициент приведения объёма продукта к 15 °C.
+
+    Args:
+        temperature: Температура продукта, °C.
+        density15: Плотность при 15 °C, кг/м3.
+        product: Группа продуктов (ключ PRODUCTS), 'auto' - светлые нефтепродукты
+            с выбором группы по плотности, или массив групп для каждого замера.
+    """
+    alpha = thermal_expansion(density15, product)
+    dt = np.asarray(temperature, dtype=np.float64) - BASE_TEMPERATURE
+    return np.exp(-alpha * dt * (1.0 + 0.8 * alpha * dt))
+
+
+def ctsh(shell_temperature: ArrayLike, calibration_temperature: float = CALIBRATION_TEMPERATURE,
+         expansion: float = STEEL_EXPANSION) -> np.ndarray:
+    """Поправка на тепловое расширение стенки резервуара."""
+    dts = np.asarray(shell_temperature, dtype=np.float64) - calibration_temperature
+    return 1.0 + 2.0 * expansion * dts + expansion ** 2 * dts ** 2
+
+
+def correct_volumes(volumes: ArrayLike, temperature: ArrayLike, density15: ArrayLike, product='auto',
+                    shell_temperature: Optional[ArrayLike] = None,
+                    calibration_temperature: float = CALIBRATION_TEMPERATURE) -> dict:
+    """
+    Приводит массив объёмов к 15 °C и пересчитывает в массу.
+
+    Args:
+        volumes: Объёмы по градуировочной таблице, м3.
+        temperature: Температура продукта, °C.
+        density15: Плотность при 15 °C, кг/м3.
+        product: Группа продуктов (см. vcf).
+        shell_temperature: Температура стенки; по умолчанию равна температуре продукта.
+        calibration_temperature: Температура, при которой градуирован резервуар.
+
+    Returns:
+        dict: массивы 'standard_volume' (м3), 'mass' (т), 'vcf', 'ctsh'.
+    """
+    volumes = np.asarray(volumes, dtype=np.float64)
+    factors = vcf(temperature, density15, product)
+    shell = ctsh(temperature if shell_temperature is None else shell_temperature, calibration_temperature)
+    standard = volumes * shell * factors
+    return {
+        'standard_volume': standard,
+        'mass': standard * np.asarray(density15, dtype=np.float64) / 1000.0,
+        'vcf': factors,
+        'ctsh': shell,
+    }
+
+
+def correct_reading(volume: float, temperature: float, density15: float, product: str = 'auto',
+                    shell_temperature: Optional[float] = None,
+                    calibration_temperature: float = CALIBRATION_TEMPERATURE) -> CorrectedReading:
+    """Приведение одного замера (см. correct_volumes)."""
+    result = correct_volumes(volume, temperature, density15, product, shell_temperature, calibration_temperature)
+    return CorrectedReading(float(volume), float(result['standard_volume']), float(result['mass']),
+                            float(result['vcf']), float(result['ctsh']))
@@ -0,0 +1,200 @@
+"""
+Проверка градуировочных таблиц перед загрузкой в 1С.
+
+Все проверки выполняются векторными операциями над массивами таблицы, поэтому
+проверка тысяч таблиц в пакетном режиме занимает доли секунды.
+"""
+
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from calibration.numeric import infer_decimals
+from calibration.table import CalibrationTable
+
+# Окно скользящей медианы для поиска выбросов приращения вместимости
+OUTLIER_WINDOW = 5
+
+# Приращение считается выбросом, если отклоняется от скользящей медианы больше,
+# чем на столько типичных отклонений, на OUTLIER_RELATIVE от самой медианы и на
+# OUTLIER_ROUNDING единиц последнего знака вместимости (округление каждой вместимости
+# сдвигает приращение до одной единицы последнего знака)
+OUTLIER_FACTOR = 8.0
+OUTLIER_RELATIVE = 0.05
+OUTLIER_ROUNDING = 2
+
+# Допуск расхождения вместимостей для одного уровня, м3
+DUPLICATE_TOLERANCE = 1e-9
+
+# Допустимое относительное расхождение полной вместимости с ожидаемой
+CAPACITY_TOLERANCE = 0.01
+
+
+class ValidationReport(NamedTuple):
+    name: str
+    rows: int
+    duplicates: np.ndarray      # уровни, для которых указаны разные вместимости
+    non_monotonic: np.ndarray   # уровни, на которых вместимость не возрастает
+    gaps: np.ndarray            # (N, 2) пропуски уровней [предыдущий уровень, следующий уровень]
+    outliers: np.ndarray        # уровни, на которых приращение вместимости выпадает из ряда
+    step: int                   # основной шаг уровней
+    capacity: float             # полная вместимость (на верхнем уровне)
+    expected_capacity: Optional[float]
+
+    @property
+    def capacity_ok(self) -> bool:
+        if self.expected_capacity is None or not self.rows:
+            return True
+        return abs(self.capacity - self.expected_capacity) <= CAPACITY_TOLERANCE * abs(self.expected_capacity)
+
+    @property
+    def ok(self) -> bool:
+        return not (len(self.duplicates) or len(self.non_monotonic) or len(self.gaps)
+                    or len(self.outliers)) and self.capacity_ok
+
+    def messages(self, limit: int = 10) -> List[str]:
+        """
+        Описание найденных нарушений для журнала.
+
+        Args:
+            limit: Сколько уровней перечислять для каждого вида нарушений.
+        """
+        def listed(values):
+            text = ', '.join(str(v) for v in values[:limit].tolist())
+            return text + (f" ... (всего {len(values)})" if len(values) > limit else '')
+
+        messages = []
+        if len(self.duplicates):
+            messages.append(f"Разные вместимости для одного уровня: {listed(self.duplicates)}")
+        if len(self.non_monotonic):
+            messages.append(f"Вместимость не возрастает на уровнях: {listed(self.non_monotonic)}")
+        if len(self.gaps):
+            gaps = [f"{start}-{end}" for start, end in self.gaps.tolist()]
+            messages.append(f"Пропуски уровней (шаг {self.step}): {listed(np.array(gaps))}")
+        if len(self.outliers):
+            messages.append(f"Выбросы приращения вместимости на уровнях: {listed(self.outliers)}")
+        if not self.capacity_ok:
+            messages.append(f"Полная вместимость {self.capacity:g} м3 отличается от ожидаемой "
+                            f"{self.expected_capacity:g} м3")
+        return messages
+
+
+def _collapse_duplicates(levels, volumes):
+    """
+    Оставляет одну строку на уровень (таблица упорядочена по уровню).
+
+    Returns:
+        tuple: уровни, вместимости и массив уровней с противоречивыми вместимостями.
+    """
+    first = np.ones(len(levels), dtype=bool)
+    first[1:] = levels[1:] != levels[:-1]
+    starts = np.flatnonzero(first)
+
+    low = np.minimum.reduceat(volumes, starts)
+    high = np.maximum.reduceat(volumes, starts)
+    conflicts = levels[starts][high - low > DUPLICATE_TOLERANCE]
+    return levels[first], volumes[first], conflicts
+
+
+def _increment_outliers(levels, volumes):
+    """Уровни, на которых приращение вместимости на единицу уровня выпадает из скользящей медианы."""
+    if len(levels) < OUTLIER_WINDOW + 1:
+        return np.empty(0, dtype=np.int64)
+
+    rates = np.diff(volumes) / np.diff(levels)
+    half = OUTLIER_WINDOW // 2
+    padded = np.pad(rates, half, mode='edge')
+    local = np.median(sliding_window_view(padded, OUTLIER_WINDOW), axis=1)
+
+    residual = np.abs(rates - local)
+    rounding = OUTLIER_ROUNDING * 10.0 ** -infer_decimals(volumes) / np.diff(levels)
+    limit = OUTLIER_FACTOR * np.median(residual) + OUTLIER_RELATIVE * np.abs(local) + rounding
+    return levels[1:][residual > limit]
+
+
+def validate_table(table: CalibrationTable, expected_capacity: Optional[float] = None,
+                   max_step: Optional[int] = None) -> ValidationReport:
+    """
+    Проверяет градуировочную таблицу.
+
+    Проверки: противоречивые дубликаты уровней, строгое возрастание вместимости,
+    пропуски уровней, выбросы приращения вместимости и полная вместимость.
+
+    Args:
+        table: Таблица в порядке строк документа.
+        expected_capacity: Номинальная вместимость резервуара, м3, если известна.
+        max_step: Наибольший допустимый шаг уровней; по умолчанию - самый частый шаг таблицы.
+
+    Returns:
+        ValidationReport: Результаты всех проверок.
+    """
+    ordered = table.sorted()
+    levels, volumes, duplicates = _collapse_duplicates(ordered.levels, ordered.volumes)
+
+    steps = np.diff(levels)
+    if len(steps):
+        values, counts = np.unique(steps, return_counts=True)
+        step = int(values[counts.argmax()])
+    else:
+        step = 0
+    limit = max_step if max_step is not None else step
+    gap_index = np.flatnonzero(steps > limit)
+    gaps = np.stack((levels[gap_index], levels[gap_index + 1]), axis=1)
+
+    increments = np.diff(volumes)
+    # Равные соседние вместимости допустимы там, где приращение меньше единицы последнего
+    # знака (начало и конец таблицы горизонтального резервуара с мелким шагом)
+    unit = 10.0 ** -infer_decimals(volumes)
+    neighbours = np.maximum(np.concatenate(([0.0], increments[:-1])), np.concatenate((increments[1:], [0.0])))
+    flat = (increments == 0) & (neighbours > OUTLIER_ROUNDING * unit)
+    non_monotonic = levels[1:][(increments < 0) | flat]
+
+    return ValidationReport(
+        name=table.name,
+        rows=len(table),
+        duplicates=duplicates,
+        non_monotonic=non_monotonic,
+        gaps=gaps,
+        outliers=_increment_outliers(levels, volumes),
+        step=step,
+        capacity=float(volumes.max()) if len(volumes) else 0.0,
+        expected_capacity=expected_capacity,
+    )
+
+
+def validate_tables(tables: Iterable[CalibrationTable],
+                    expected_capacity: Optional[float] = None) -> List[ValidationReport]:
+    """Проверяет пакет таблиц; возвращает отчёты в том же порядке."""
+    return [validate_table(table, expected_capacity) for table in tables]
+
+
+def check_rounded_table(diameter: float = 2.5, length: float = 5.0, decimals: int = 3) -> List[str]:
+    """
+    Проверка на ложные нарушения: таблица горизонтального цилиндра с шагом 1 мм
+    и вместимостями, округлёнными до decimals знаков, должна проходить без замечаний,
+    а искажённая строка - находиться.
+
+    Returns:
+        list: Описание несоответствий; пустой список - проверка пройдена.
+    """
+    from calibration.geometry import segment_area
+
+    levels = np.arange(int(diameter * 1000) + 1)
+    volumes = np.round(segment_area(levels / 1000, diameter / 2) * length, decimals)
+    problems = [f"Правильная таблица: {message}"
+                for message in validate_table(CalibrationTable(levels, volumes)).messages()]
+
+    broken = volumes.copy()
+    broken[len(broken) // 2] += 10.0 ** -(decimals - 2)
+    if not len(validate_table(CalibrationTable(levels, broken)).outliers):
+        problems.append("Искажённая строка не найдена")
+    return problems
+
+
+if __name__ == "__main__":
+    problems = check_rounded_table()
+    for problem in problems:
+        print(problem)
+    print("Проверка округлённой таблицы:", "ошибки" if problems else "пройдена")
+    raise SystemExit(1 if problems else 0)
@@ -1,6 +1,9 @@
 # Copyright (c) 2025 Шмерко Евгений Леонидович
 # SPDX-License-Identifier: MIT
 
+import os
+
+
 class AppConfig:
     PROGRAM_SLUG = "contab"
     # Версия приложения
@@ -21,6 +24,13 @@ copies of the Software..."""
 
     # Настройки обновлений
     UPDATE_CHECK_URL = "https://eshmerko.com/api/check-update/"
+    # Переменная окружения для подмены адреса проверки (например, локальный тестовый сервер)
+    UPDATE_CHECK_URL_ENV = "CONTAB_UPDATE_CHECK_URL"
+    # Результат проверки хранится в QSettings и повторно запрашивается не чаще раза в сутки
+    UPDATE_CHECK_TTL = 24 * 60 * 60
+    UPDATE_CHECK_TIMEOUT = 10
+    # Сколько секунд ждать остановки обработки после отмены, прежде чем вернуть управление окну
+    CANCEL_WAIT_TIMEOUT = 5
     BASE_DOWNLOAD_URL = "https://eshmerko.com/downloads/"
 
     
@@ -29,10 +39,17 @@ copies of the Software..."""
     DEVELOPER_NAME = "Шмерко Евгений Леонидович"
     DEVELOPER_EMAIL = "e.shmerko@beloil.by"
     DEVELOPER_PHONE = "+375 44 7777710"
+    DEVELOPER_PHOTO_URL = "https://eshmerko.com/developer_photo.jpg"
     
     # Текст для UI
     APP_NAME = "Извлечение данных из градуировочных таблиц для импорта в 1С"
     
+    @classmethod
+    def update_check_endpoint(cls, version=None):
+        """Адрес проверки обновлений для версии программы с учётом переменной окружения"""
+        base_url = os.environ.get(cls.UPDATE_CHECK_URL_ENV) or cls.UPDATE_CHECK_URL
+        return f"{base_url.rstrip('/')}/{cls.PROGRAM_SLUG}/{version or cls.VERSION}/"
+
     @classmethod
     def license_header(cls):
         return (
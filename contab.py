@@ -0,0 +1,240 @@
+# Copyright (c) 2025 Шмерко Евгений Леонидович
+# SPDX-License-Identifier: MIT
+
+"""
+Командная строка для работы с готовыми градуировочными таблицами (файлы 'уровень~вместимость').
+
+Примеры:
+    python contab.py validate table.txt --capacity 24.66
+    python contab.py diff old.txt new.txt
+    python contab.py diff old.txt new.txt --output changes.txt
+    python contab.py resample table_cm.txt table_mm.txt --scale 10 --decimals 3
+    python contab.py compress table.txt breakpoints.txt --tolerance 0.0005
+    python contab.py store build tables/ fleet.bin
+    python contab.py store info fleet.bin
+    python contab.py volumes shift_log.csv shift_volumes.csv --tables fleet.bin --key station --key tank
+    python contab.py volumes shift_log.csv shift_mass.csv --tables fleet.bin --density 835 --product jet
+"""
+
+import argparse
+import os
+import sys
+
+from calibration.table import CalibrationTable
+
+
+def command_validate(args):
+    """Проверка таблиц перед загрузкой в 1С."""
+    from calibration.validation import validate_table
+
+    failed = 0
+    for path in args.tables:
+        report = validate_table(CalibrationTable.read(path), expected_capacity=args.capacity)
+        if report.ok:
+            print(f"{path}: нарушений нет ({report.rows} строк, {report.capacity:g} м3)")
+            continue
+        failed += 1
+        print(f"{path}:")
+        for message in report.messages():
+            print(f"  {message}")
+    return 1 if failed else 0
+
+
+def command_diff(args):
+    """Сравнение двух версий таблицы."""
+    from calibration.diff import diff_tables
+
+    result = diff_tables(CalibrationTable.read(args.old), CalibrationTable.read(args.new))
+    for line in result.summary():
+        print(line)
+    if args.output:
+        result.write(args.output, changed_only=args.changed_only)
+        print(f"Список изменений сохранён: {args.output}")
+    return 1 if args.fail_on_change and (result.changed.any() or len(result.inserted) or len(result.removed)) else 0
+
+
+def command_resample(args):
+    """Пересчёт таблицы на другой шаг уровня."""
+    from calibration.resample import resample_table
+
+    table = CalibrationTable.read(args.input)
+    result = resample_table(table, step=args.step, scale=args.scale, method=args.method, decimals=args.decimals)
+    result.write(args.output, decimals=args.decimals)
+    print(f"Уровней: {len(table)} -> {len(result)}, результат сохранён: {args.output}")
+    return 0
+
+
+def command_compress(args):
+    """Сжатие таблицы до точек излома с заданной погрешностью."""
+    from calibration.compress import compress_table
+
+    table = CalibrationTable.read(args.input)
+    compressed = compress_table(table, args.tolerance)
+    compressed.to_table().write(args.output)
+    print(f"Строк: {compressed.source_rows} -> {len(compressed.levels)} (в {compressed.ratio:.1f} раз), "
+          f"погрешность не более {compressed.tolerance:g} м3")
+    print(f"Результат сохранён: {args.output}")
+    return 0
+
+
+def open_registry(source):
+    """Реестр таблиц из каталога файлов 'уровень~вместимость' или из JSON-индекса."""
+    from calibration.registry import TableRegistry
+
+    if os.path.isdir(source):
+        return TableRegistry.from_directory(source)
+    return TableRegistry.from_index(source)
+
+
+def open_tables(source):
+    """Источник таблиц: двоичное хранилище, каталог таблиц или JSON-индекс."""
+    from calibration.fleet_store import MAGIC, FleetStore
+
+    if os.path.isfile(source):
+        with open(source, 'rb') as f:
+            if f.read(len(MAGIC)) == MAGIC:
+                return FleetStore(source)
+    return open_registry(source)
+
+
+def command_store_build(args):
+    """Сборка двоичного хранилища таблиц парка."""
+    from calibration.fleet_store import build_store
+
+    registry = open_registry(args.source)
+    count = build_store(args.store, ((tank_id, registry.get(tank_id)) for tank_id in registry.tank_ids()))
+    print(f"Таблиц: {count}, хранилище сохранено: {args.store} ({os.path.getsize(args.store)} байт)")
+    return 0
+
+
+def command_store_info(args):
+    """Сведения о хранилище таблиц парка."""
+    from calibration.fleet_store import FleetStore
+
+    with FleetStore(args.store) as store:
+        print(f"Таблиц: {len(store)}")
+        if args.list:
+            for tank_id in store.tank_ids():
+                table = store.get(tank_id)
+                print(f"{tank_id}: {len(table.levels)} уровней, "
+                      f"до {table.volumes[-1] if len(table.volumes) else 0:g} м3")
+    return 0
+
+
+def command_volumes(args):
+    """Пересчёт журнала замеров из уровня во вместимость."""
+    from calibration.gauge_log import process_gauge_log
+
+    def progress(rows, seconds):
+        print(f"\rОбработано строк: {rows} ({rows / max(seconds, 1e-9):,.0f} строк/с)", end='', file=sys.stderr)
+
+    tables = open_tables(args.tables)
+    try:
+        stats = process_gauge_log(args.log, args.output, tables, chunk_rows=args.chunk_rows,
+                                  key_columns=args.key or ['tank'], level_column=args.level_column,
+                                  delimiter=args.delimiter, decimals=args.decimals,
+                                  progress=None if args.quiet else progress,
+                                  density=args.density, density_column=args.density_column,
+                                  product=args.product, temperature_column=args.temperature_column)
+    finally:
+        # Хранилище держит отображение файла; у реестра таблиц закрывать нечего
+        close = getattr(tables, 'close', None)
+        if close is not None:
+            close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Строк: {stats['rows']}, пересчитано: {stats['converted']} "
+          f"за {stats['seconds']:.2f} с ({stats['rows_per_second']:,.0f} строк/с)")
+    for name, title in (('unknown_tank', 'нет таблицы резервуара'), ('invalid_level', 'уровень не число'),
+                        ('out_of_range', 'уровень вне таблицы')):
+        if stats[name]:
+            print(f"Пропущено строк ({title}): {stats[name]}")
+    print(f"Результат сохранён: {args.output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='contab', description='Работа с градуировочными таблицами резервуаров')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate = commands.add_parser('validate', help='Проверить таблицы перед загрузкой')
+    validate.add_argument('tables', nargs='+', help='Файлы таблиц')
+    validate.add_argument('--capacity', type=float,
+                          help='Номинальная вместимость резервуара по паспорту, м3 (сверяется с верхней строкой)')
+    validate.set_defaults(handler=command_validate)
+
+    diff = commands.add_parser('diff', help='Сравнить две версии таблицы')
+    diff.add_argument('old', help='Прежняя таблица')
+    diff.add_argument('new', help='Новая таблица')
+    diff.add_argument('--output', '-o', help='Файл для полного списка изменений')
+    diff.add_argument('--changed-only', action='store_true', help='Записывать только изменившиеся уровни')
+    diff.add_argument('--fail-on-change', action='store_true',
+                      help='Завершиться с кодом 1, если таблицы различаются')
+    diff.set_defaults(handler=command_diff)
+
+    resample = commands.add_parser('resample', help='Пересчитать таблицу на другой шаг уровня')
+    resample.add_argument('input', help='Исходная таблица')
+    resample.add_argument('output', help='Файл результата')
+    resample.add_argument('--step', type=int, default=1, help='Шаг уровня в новых единицах (по умолчанию 1)')
+    resample.add_argument('--scale', type=int, default=1,
+                          help='Во сколько раз новые единицы уровня мельче исходных (10 - из см в мм)')
+    resample.add_argument('--method', choices=('pchip', 'linear'), default='pchip',
+                          help='Интерполяция: монотонная кубическая или линейная')
+    resample.add_argument('--decimals', type=int, default=None, help='Знаков после запятой у вместимости')
+    resample.set_defaults(handler=command_resample)
+
+    compress = commands.add_parser('compress', help='Сжать таблицу до точек излома кусочно-линейной функции')
+    compress.add_argument('input', help='Исходная таблица')
+    compress.add_argument('output', help='Файл точек излома (тот же формат уровень~вместимость)')
+    compress.add_argument('--tolerance', type=float, default=0.0005,
+                          help='Наибольшее отклонение вместимости, м3 (по умолчанию 0.0005)')
+    compress.set_defaults(handler=command_compress)
+
+    store = commands.add_parser('store', help='Двоичное хранилище таблиц парка для рабочих процессов')
+    store_commands = store.add_subparsers(dest='store_command', required=True)
+    store_build = store_commands.add_parser('build', help='Собрать хранилище из таблиц')
+    store_build.add_argument('source', help='Каталог таблиц (номер резервуара - имя файла) или JSON-индекс')
+    store_build.add_argument('store', help='Файл хранилища')
+    store_build.set_defaults(handler=command_store_build)
+    store_info = store_commands.add_parser('info', help='Показать содержимое хранилища')
+    store_info.add_argument('store', help='Файл хранилища')
+    store_info.add_argument('--list', action='store_true', help='Перечислить резервуары')
+    store_info.set_defaults(handler=command_store_info)
+
+    volumes = commands.add_parser('volumes', help='Пересчитать журнал замеров (CSV) из уровня во вместимость')
+    volumes.add_argument('log', help='CSV журнала: станция, резервуар, время, уровень, температура')
+    volumes.add_argument('output', help='CSV результата со столбцом volume')
+    volumes.add_argument('--tables', required=True,
+                         help='Хранилище таблиц (store build), каталог таблиц или JSON-индекс')
+    volumes.add_argument('--key', action='append',
+                         help='Столбец номера резервуара; несколько --key соединяются через "-" '
+                              '(по умолчанию tank)')
+    volumes.add_argument('--level-column', default='level', help='Столбец уровня (по умолчанию level)')
+    volumes.add_argument('--delimiter', help='Разделитель CSV (по умолчанию определяется по заголовку)')
+    volumes.add_argument('--chunk-rows', type=int, default=100_000, help='Строк в блоке обработки')
+    volumes.add_argument('--decimals', type=int, default=3, help='Знаков после запятой у вместимости')
+    volumes.add_argument('--quiet', action='store_true', help='Не выводить ход обработки')
+    correction = volumes.add_argument_group('приведение к 15 °C и масса')
+    correction.add_argument('--density', type=float, help='Плотность продукта при 15 °C, кг/м3')
+    correction.add_argument('--density-column', help='Столбец плотности при 15 °C')
+    correction.add_argument('--product', default='auto',
+                            choices=('auto', 'crude', 'gasoline', 'transition', 'jet', 'fuel_oil', 'lube'),
+                            help='Группа продуктов (auto - светлые нефтепродукты по плотности)')
+    correction.add_argument('--temperature-column', default='temperature',
+                            help='Столбец температуры продукта (по умолчанию temperature)')
+    volumes.set_defaults(handler=command_volumes)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
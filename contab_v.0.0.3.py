@@ -5,31 +5,55 @@ import sys
 import os
 import re
 import time
+
+# Отсчёт времени запуска (см. startup_timing.py)
+STARTUP_START = time.perf_counter()
+
 import tempfile
-import pythoncom
-import requests
+import shutil
+import threading
 import json
+import getpass
+from contextlib import contextmanager
 from datetime import datetime
 from PySide6.QtCore import (
     Qt, QPropertyAnimation, QEasingCurve, QThread, Signal, 
-    QUrl, QSettings, QTimer, QDateTime
+    QUrl, QSettings, QTimer, QDateTime, QStandardPaths,
+    QAbstractListModel, QSortFilterProxyModel, QModelIndex,
+    QObject, QRunnable, QThreadPool, QAbstractTableModel
 )
 from PySide6.QtGui import (
     QFont, QPixmap, QColor, QLinearGradient, QBrush, 
-    QIcon, QPainter, QAction, QDesktopServices
+    QIcon, QPainter, QAction, QDesktopServices, QImage
 )
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QFileDialog, QLabel, QLineEdit, QPushButton, QTextEdit, QStatusBar,
-    QMessageBox, QDialog, QScrollArea, QScrollBar
+    QMessageBox, QDialog, QScrollArea, QScrollBar, QProgressBar,
+    QListView, QComboBox, QAbstractItemView, QTableWidget, QTableWidgetItem,
+    QHeaderView, QSplitter, QTableView
 )
-from striprtf.striprtf import rtf_to_text
-import win32com.client as win32
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
 
 from config import AppConfig
 
-import xlrd
-from xlrd import open_workbook
+# Тяжёлые модули (requests, xlrd, striprtf, pywin32, NumPy и пакет calibration)
+# импортируются при первом использовании, чтобы не задерживать появление окна
+
+
+def report_startup(stage):
+    """
+    Записывает время от запуска до этапа в файл из переменной CONTAB_STARTUP_TIMING.
+
+    Используется startup_timing.py; без переменной ничего не делает.
+    """
+    timing_path = os.environ.get("CONTAB_STARTUP_TIMING")
+    if not timing_path:
+        return
+    elapsed = (time.perf_counter() - STARTUP_START) * 1000
+    with open(timing_path, 'a', encoding='utf-8') as f:
+        f.write(f"{stage} {elapsed:.1f}\n")
+
 
 class StartupScreen(QDialog):
     def __init__(self, parent=None):
@@ -106,30 +130,136 @@ class AboutDialog(QDialog):
         layout.addWidget(developer_widget)
 
 
-# Загрузчик изображений
+def resource_path(name):
+    """Путь к файлу, поставляемому с программой (в том числе внутри сборки PyInstaller)"""
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, name)
+
+
+def cache_path(name):
+    """Путь к файлу в каталоге кэша программы"""
+    cache_dir = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or tempfile.gettempdir()
+    return os.path.join(cache_dir, AppConfig.PROGRAM_SLUG, name)
+
+
+# Загрузчик изображений: сверяет копию в кэше с сервером и скачивает только изменившееся изображение
 class ImageLoader(QThread):
-    image_loaded = Signal(QPixmap)
+    image_loaded = Signal(bytes)
     load_failed = Signal()
 
+    # Запущенные загрузчики живут до завершения, даже если окно уже закрыто
+    _running = set()
+
+    def __init__(self, url, path, parent=None):
+        """
+        Args:
+            url (str): Адрес изображения.
+            path (str): Файл кэша; рядом хранятся ETag и Last-Modified ('.json').
+        """
+        super().__init__(parent)
+        self.url = url
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + '.json'
+
+    def start(self):
+        ImageLoader._running.add(self)
+        self.finished.connect(lambda: ImageLoader._running.discard(self))
+        super().start()
+
+    def read_meta(self):
+        # Без читаемой копии в кэше валидаторы не отправляются, чтобы получить изображение целиком
+        if not os.path.exists(self.path) or QImage(self.path).isNull():
+            return {}
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
     def run(self):
+        import requests
+
+        meta = self.read_meta()
+        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
         try:
-            response = requests.get(
-                "https://eshmerko.com/developer_photo.jpg",
-                timeout=10,
-                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Cache-Control': 'no-cache'},
-                verify=False
-            )
-            if response.status_code == 200:
-                pixmap = QPixmap()
-                pixmap.loadFromData(response.content)
-                self.image_loaded.emit(pixmap)
-            else:
+            response = requests.get(self.url, timeout=10, headers=headers, verify=False)
+            if response.status_code == 304:
+                return
+            if response.status_code != 200 or QImage.fromData(response.content).isNull():
                 self.load_failed.emit()
+                return
+            self.save(response)
+            self.image_loaded.emit(response.content)
         except Exception:
             self.load_failed.emit()
 
+    def save(self, response):
+        """
+        Сохраняет изображение и его валидаторы; ошибка записи в кэш не мешает показу.
+
+        В Windows файл, открытый другим экземпляром приложения, подменить нельзя:
+        тогда копия в кэше и её валидаторы остаются прежними до следующего запуска.
+        """
+        temp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(temp_path, self.path)
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': response.headers.get('ETag'),
+                           'last_modified': response.headers.get('Last-Modified')}, f)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+# Проверка обновлений в фоновом потоке
+class UpdateChecker(QThread):
+    checked = Signal(int, object, str)  # HTTP-статус, данные ответа (None при 304), ETag
+    check_failed = Signal(str)
+
+    # Запрос может ждать сервер до таймаута: поток без родителя живёт до завершения,
+    # даже если окно уже закрыто
+    _running = set()
+
+    def __init__(self, url, version, etag=None, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.version = version
+        self.etag = etag
+
+    def start(self):
+        UpdateChecker._running.add(self)
+        self.finished.connect(lambda: UpdateChecker._running.discard(self))
+        super().start()
+
+    def run(self):
+        import requests
+
+        headers = {
+            'User-Agent': f'FileConverterPro/{self.version}',
+            'Accept': 'application/json'
+        }
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        try:
+            response = requests.get(self.url, headers=headers,
+                                    timeout=AppConfig.UPDATE_CHECK_TIMEOUT, verify=False)
+            if response.status_code == 304:
+                self.checked.emit(304, None, self.etag or "")
+            elif response.status_code == 200:
+                self.checked.emit(200, response.json(), response.headers.get('ETag', ""))
+            else:
+                self.check_failed.emit(f"Ошибка проверки обновлений: {response.status_code}")
+        except Exception as e:
+            self.check_failed.emit(f"Ошибка при проверке обновлений: {str(e)}")
+
 # Виджет разработчика
 class DeveloperWidget(QWidget):
     def __init__(self, parent=None):
@@ -257,12 +387,27 @@ class DeveloperWidget(QWidget):
         self.animation.setEasingCurve(QEasingCurve.OutQuad)
 
     def init_photo_loading(self):
-        self.loader = ImageLoader()
+        """Сразу показывает фото из кэша или поставляемое с программой, затем сверяет его с сервером"""
+        cached_photo = cache_path("developer_photo.jpg")
+        self.photo_shown = False
+        for path in (cached_photo, resource_path("developer_photo.jpg")):
+            pixmap = QPixmap(path) if os.path.exists(path) else QPixmap()
+            if not pixmap.isNull():
+                self.show_photo(pixmap)
+                break
+
+        self.loader = ImageLoader(AppConfig.DEVELOPER_PHOTO_URL, cached_photo)
         self.loader.image_loaded.connect(self.handle_image_loaded)
         self.loader.load_failed.connect(self.handle_image_load_failed)
         self.loader.start()
 
-    def handle_image_loaded(self, pixmap):
+    def handle_image_loaded(self, data):
+        pixmap = QPixmap()
+        if pixmap.loadFromData(data):
+            self.show_photo(pixmap)
+
+    def show_photo(self, pixmap):
+        self.photo_shown = True
         scaled_pixmap = pixmap.scaled(
             160, 160,
             Qt.AspectRatioMode.KeepAspectRatio,
@@ -279,6 +424,8 @@ class DeveloperWidget(QWidget):
         """)
 
     def handle_image_load_failed(self):
+        if self.photo_shown:
+            return
         self.photo_label.setText("Фото\nнедоступно")
         self.photo_label.setStyleSheet("""
             QLabel {
@@ -397,79 +544,285 @@ class StartupScreen(QDialog):
         </ul>
         <p>Используя данное программное обеспечение, вы соглашаетесь с этими условиями.</p>
         """
-# Основной класс приложения
-class FileConverterApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.current_version = AppConfig.VERSION  # Замените на вашу версию
-        self.update_check_url = "https://eshmerko.com/api/check-update/"
-        self.update_info = None
-        self.settings = QSettings("YourCompany", "YourApp")
-        # Проверка соглашения при запуске
-        self.check_agreement()
-        # Добавим константы для настройки столбцов
-        self.LEFT_COLS = (1, 2)   # B и C (0-based)
-        self.RIGHT_COLS = (5, 6)  # F и G
+def sanitize_filename(filename):
+    """Очищает имя файла от запрещенных символов и нормализует пробелы."""
+    forbidden_chars = r'[\\/*?:"<>|]'
+    sanitized = re.sub(forbidden_chars, '_', filename)
+    sanitized = sanitized.strip()
+    sanitized = re.sub(r'[\s_]+', '_', sanitized)
+    return sanitized
 
-    def check_agreement(self):
-        """Проверка принятия пользовательского соглашения"""
-        settings = QSettings()
-        if not settings.value("agreement_accepted", False, type=bool):
-            self.show_agreement_dialog()
+
+class ConversionCanceled(Exception):
+    """Обработка остановлена пользователем"""
+
+
+# Конвертация одного файла без обращения к интерфейсу
+class ConversionJob:
+    """
+    Конвертация Excel/Word/RTF в текстовый файл 'уровень~вместимость'.
+
+    Не обращается к виджетам: сообщения и ход обработки передаются через обратные
+    вызовы, поэтому задание выполняется в рабочем потоке. Отмена проверяется
+    на границах строк, ячеек и попыток открытия документа.
+    """
+
+    # Константы для настройки столбцов Excel
+    LEFT_COLS = (1, 2)   # B и C (0-based)
+    RIGHT_COLS = (5, 6)  # F и G
+
+    EXCEL_EXTENSIONS = ('.xls', '.xlsx')
+    WORD_EXTENSIONS = ('.docx', '.doc', '.rtf')
+
+    # Предпросмотр: первый блок строк показывается сразу, остальные дочитываются блоками
+    PREVIEW_FIRST_ROWS = 200
+    PREVIEW_CHUNK_ROWS = 5000
+
+    def __init__(self, input_path, output_path, log=None, progress=None, stages=None):
+        """
+        Args:
+            input_path (str): Исходный файл.
+            output_path (str): Результирующий текстовый файл.
+            log (callable | None): log(message, status) - сообщение в журнал.
+            progress (callable | None): progress(done, total, unit) - ход обработки.
+            stages (dict | None): Ограничители этапов 'io' (чтение файла, Word) и 'cpu'
+                (разбор таблиц) - семафоры, общие для заданий очереди.
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.log = log or (lambda message, status=False: None)
+        self._progress = progress or (lambda done, total, unit: None)
+        self.stages = stages or {}
+        self._cancel_event = threading.Event()
+        self._last_percent = None
+
+    def cancel(self):
+        """Запрос остановки; задание остановится на ближайшей границе строки или ячейки"""
+        self._cancel_event.set()
+
+    @property
+    def canceled(self):
+        return self._cancel_event.is_set()
+
+    def check_canceled(self):
+        if self._cancel_event.is_set():
+            raise ConversionCanceled()
+
+    @contextmanager
+    def stage(self, name):
+        """Занимает место на этапе; пока места нет, продолжает проверять отмену"""
+        slots = self.stages.get(name)
+        if slots is None:
+            yield
+            return
+        while not slots.acquire(timeout=0.2):
+            self.check_canceled()
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def report_progress(self, done, total, unit):
+        """Передаёт ход обработки не чаще одного раза на процент"""
+        percent = done * 100 // total if total else 100
+        if percent != self._last_percent or done == total:
+            self._last_percent = percent
+            self._progress(done, total, unit)
+
+    def run(self):
+        """
+        Выполняет конвертацию.
+
+        Returns:
+            tuple: (число записей, итоговое сообщение); 0 записей - данных в файле не найдено.
+
+        Raises:
+            ConversionCanceled: Обработка остановлена пользователем.
+        """
+        self.check_canceled()
+        file_ext = os.path.splitext(self.input_path)[1].lower()
+        if file_ext in self.EXCEL_EXTENSIONS:
+            return self.process_excel_data(self.input_path, self.output_path)
+        return self.process_document(self.input_path, self.output_path)
 
     def process_excel_data(self, input_path, output_path):
         """Основной метод обработки Excel файлов"""
         try:
-            self.log_message("Начало обработки Excel файла...", status=True)
+            self.log("Начало обработки Excel файла...", status=True)
             
-            wb = open_workbook(input_path)
+            from xlrd import open_workbook
+
+            with self.stage('io'):
+                wb = open_workbook(input_path)
             all_data = []
+            sheets = wb.sheets()
+            total_rows = sum(sheet.nrows for sheet in sheets)
+            done_rows = 0
             
-            for sheet in wb.sheets():
-                self.log_message(f"Обработка листа: {sheet.name}")
-                self.process_excel_sheet(sheet, all_data)
-            
-            self.export_excel_data(all_data, output_path)
-            return True
+            with self.stage('cpu'):
+                for sheet in sheets:
+                    self.log(f"Обработка листа: {sheet.name}")
+                    self.process_excel_sheet(sheet, all_data, done_rows, total_rows)
+                    done_rows += sheet.nrows
+                
+                return self.export_excel_data(all_data, output_path)
             
+        except ConversionCanceled:
+            raise
         except Exception as e:
-            self.log_message(f"Ошибка обработки Excel: {str(e)}", status=True)
-            return False
+            self.log(f"Ошибка обработки Excel: {str(e)}", status=True)
+            raise
 
-    def is_valid_excel_row(self, sheet, row, cols):
-        """Проверка валидности данных в строке"""
-        try:
-            # Проверка целого числа в первом столбце
-            int(sheet.cell_value(row, cols[0]))
-            
-            # Проверка числа с плавающей точкой во втором столбце
-            float(sheet.cell_value(row, cols[1]))
-            
-            return True
-        except (ValueError, TypeError):
-            return False
+    def parse_excel_columns(self, sheet, cols, start=0, end=None):
+        """Разбор пары столбцов (уровень, вместимость) листа целиком или строк start..end"""
+        import numpy as np
+        from calibration.numeric import parse_numbers
 
-    def process_excel_sheet(self, sheet, all_data):
-        """Обработка данных из листа Excel"""
-        for row_idx in range(sheet.nrows):
-            # Обработка левых столбцов
-            if self.is_valid_excel_row(sheet, row_idx, self.LEFT_COLS):
-                level = int(sheet.cell_value(row_idx, self.LEFT_COLS[0]))
-                capacity = float(sheet.cell_value(row_idx, self.LEFT_COLS[1]))
-                formatted = f"{capacity:.15f}".rstrip('0').rstrip('.')
-                all_data.append((level, formatted))
-                self.log_message(f"Обработана строка {row_idx+1} (левые столбцы): {level} ~ {formatted}")
+        if sheet.ncols <= max(cols):
+            empty = np.zeros(len(range(sheet.nrows)[start:end]), dtype=bool)
+            return None, None, empty
+
+        levels, level_ok = parse_numbers(sheet.col_values(cols[0], start, end), integer=True)
+        capacities, capacity_ok = parse_numbers(sheet.col_values(cols[1], start, end))
+        return levels, capacities, level_ok & capacity_ok
+
+    def iter_pairs(self, first_rows=PREVIEW_FIRST_ROWS, chunk_rows=PREVIEW_CHUNK_ROWS):
+        """
+        Постепенный разбор файла для предпросмотра; ничего не записывает.
+
+        Первый блок небольшой, чтобы его можно было показать сразу, остальные крупнее.
+
+        Yields:
+            dict: массивы 'levels', 'volumes', 'rows' (номер строки листа или документа с 1),
+            'sides' (0 - левые столбцы или ячейка документа, 1 - правые столбцы)
+            и 'source' - имя листа ('' для документов).
+        """
+        self.check_canceled()
+        if os.path.splitext(self.input_path)[1].lower() in self.EXCEL_EXTENSIONS:
+            return self.iter_excel_pairs(first_rows, chunk_rows)
+        return self.iter_document_pairs(first_rows, chunk_rows)
+
+    def iter_excel_pairs(self, first_rows, chunk_rows):
+        from xlrd import open_workbook
 
-            # Обработка правых столбцов
-            if self.is_valid_excel_row(sheet, row_idx, self.RIGHT_COLS):
-                level = int(sheet.cell_value(row_idx, self.RIGHT_COLS[0]))
-                capacity = float(sheet.cell_value(row_idx, self.RIGHT_COLS[1]))
-                formatted = f"{capacity:.15f}".rstrip('0').rstrip('.')
+        # Листы загружаются по мере обращения, первый блок не ждёт остальные листы
+        with self.stage('io'):
+            wb = open_workbook(self.input_path, on_demand=True)
+        try:
+            size = first_rows
+            for sheet_index in range(wb.nsheets):
+                with self.stage('io'):
+                    sheet = wb.sheet_by_index(sheet_index)
+                start = 0
+                while start < sheet.nrows:
+                    self.check_canceled()
+                    end = min(start + size, sheet.nrows)
+                    chunk = self.excel_chunk(sheet, start, end)
+                    if chunk is not None:
+                        yield chunk
+                    self.report_progress(end, sheet.nrows, f"строк листа {sheet.name}")
+                    start = end
+                    size = chunk_rows
+                wb.unload_sheet(sheet_index)
+        finally:
+            wb.release_resources()
+
+    def excel_chunk(self, sheet, start, end):
+        """Пары строк start..end листа в порядке конвертации: по строкам, в строке сначала левые столбцы"""
+        import numpy as np
+
+        parts = []
+        for side, cols in enumerate((self.LEFT_COLS, self.RIGHT_COLS)):
+            levels, capacities, valid = self.parse_excel_columns(sheet, cols, start, end)
+            rows = np.flatnonzero(valid)
+            if len(rows):
+                parts.append((levels[rows], capacities[rows], rows, np.full(len(rows), side, dtype=np.uint8)))
+        if not parts:
+            return None
+        levels, volumes, rows, sides = (np.concatenate(column) for column in zip(*parts))
+        order = np.lexsort((sides, rows))
+        return {'levels': levels[order].astype(np.float64), 'volumes': volumes[order],
+                'rows': rows[order] + start + 1, 'sides': sides[order], 'source': sheet.name}
+
+    def iter_document_pairs(self, first_rows, chunk_rows):
+        import numpy as np
+
+        plain_text = self.document_text(self.input_path)
+
+        # Строки таблиц с номерами строк документа
+        table_lines = [(number, line) for number, line in enumerate(plain_text.split('\n'), 1) if '|' in line]
+        start = 0
+        size = first_rows
+        while start < len(table_lines):
+            self.check_canceled()
+            end = min(start + size, len(table_lines))
+            cells = []
+            numbers = []
+            for number, line in table_lines[start:end]:
+                for cell in line.split('|'):
+                    if cell.strip():
+                        cells.append(cell.split())
+                        numbers.append(number)
+            pairs = list(self.cell_pairs(cells))
+            if pairs:
+                yield {'levels': np.array([float(level) for _, level, _ in pairs]),
+                       'volumes': np.array([float(capacity) for _, _, capacity in pairs]),
+                       'rows': np.array([numbers[index] for index, _, _ in pairs], dtype=np.int64),
+                       'sides': np.zeros(len(pairs), dtype=np.uint8), 'source': ''}
+            self.report_progress(end, len(table_lines), "строк таблиц")
+            start = end
+            size = chunk_rows
+
+    def process_excel_sheet(self, sheet, all_data, done_rows=0, total_rows=0):
+        """Обработка данных из листа Excel"""
+        import numpy as np
+
+        left = self.parse_excel_columns(sheet, self.LEFT_COLS)
+        right = self.parse_excel_columns(sheet, self.RIGHT_COLS)
+
+        # Порядок строк сохраняется: в каждой строке сначала левые, затем правые столбцы
+        for row_idx in np.flatnonzero(left[2] | right[2]):
+            self.check_canceled()
+            for (levels, capacities, valid), side in ((left, "левые"), (right, "правые")):
+                if not valid[row_idx]:
+                    continue
+                level = int(levels[row_idx])
+                formatted = f"{capacities[row_idx]:.15f}".rstrip('0').rstrip('.')
                 all_data.append((level, formatted))
-                self.log_message(f"Обработана строка {row_idx+1} (правые столбцы): {level} ~ {formatted}")
+                self.log(f"Обработана строка {row_idx+1} ({side} столбцы): {level} ~ {formatted}")
+            self.report_progress(done_rows + int(row_idx) + 1, total_rows, "строк")
+        self.report_progress(done_rows + sheet.nrows, total_rows, "строк")
+
+    def log_validation(self, pairs):
+        """Проверка извлечённой таблицы и сверка с формой резервуара с выводом нарушений в журнал"""
+        from calibration.geometry import fit_geometry
+        from calibration.table import CalibrationTable
+        from calibration.validation import validate_table
+
+        table = CalibrationTable.from_pairs(pairs)
+        messages = [f"[ПРОВЕРКА] {message}" for message in validate_table(table).messages()]
+        try:
+            geometry = fit_geometry(table)
+        except ValueError:
+            geometry = None
+        if geometry is not None:
+            # Сверка с формой справочная: плавные отклонения (деформация стенок) нормальны,
+            # поэтому она не входит в вывод о нарушениях
+            for message in geometry.messages():
+                self.log(f"Сверка с формой: {message}")
+
+        if not messages:
+            self.log("Проверка таблицы: нарушений не найдено")
+            return
+        for message in messages:
+            self.log(message)
+        self.log("Таблица содержит нарушения, проверьте журнал", status=True)
 
     def export_excel_data(self, data, filename):
         """Экспорт данных с сортировкой и удалением дубликатов"""
+        # Проверка до удаления дубликатов, чтобы противоречивые уровни попали в журнал
+        self.log_validation(data)
+
         unique_data = {}
         for level, cap in data:
             unique_data[level] = cap
@@ -482,136 +835,1239 @@ class FileConverterApp(QMainWindow):
         
         success_msg = (f"Успешно обработано записей: {len(sorted_data)}!\n"
                       f"Результат сохранен: {os.path.abspath(filename)}")
-        self.log_message(success_msg, status=True)
-        QMessageBox.information(self, "Успех", success_msg)
+        self.log(success_msg, status=True)
+        return len(sorted_data), success_msg
+
+    def process_document(self, input_path, output_path):
+        """Обработка Word/RTF: конвертация в RTF (при необходимости), разбор таблиц и сохранение"""
+        plain_text = self.document_text(input_path)
+        with self.stage('cpu'):
+            data = self.process_text(plain_text)
+        
+        if not data:
+            self.log("Не найдено подходящих данных!", status=True)
+            return 0, "В файле не найдено подходящих данных!"
+        
+        # Сортировка, проверка и сохранение
+        data.sort(key=lambda x: float(x.split('~')[0]))
+        self.log_validation(line.split('~') for line in data)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(data))
+        
+        success_msg = (f"Успешно обработано записей: {len(data)}!\n"
+                    f"Результат сохранен: {os.path.abspath(output_path)}")
+        self.log(success_msg, status=True)
+        return len(data), success_msg
 
-            
-    def show_agreement_dialog(self):
-        """Показ диалога с соглашением"""
-        dialog = StartupScreen(self)
-        if dialog.exec() == QDialog.Accepted:
-            QSettings().setValue("agreement_accepted", True)
-        else:
-            # Если пользователь не принял соглашение
-            QMessageBox.warning(
-                self,
-                "Требуется согласие",
-                "Для использования программы необходимо принять условия соглашения",
-            )
-            QTimer.singleShot(0, self.close)
+    def document_text(self, input_path):
+        """
+        Текст документа Word/RTF. Документ Word конвертируется во временный RTF,
+        который удаляется после чтения.
 
-        # Настройка главного окна
-        self.setWindowTitle("File Converter Pro")
-        self.setGeometry(100, 100, 800, 600)
-        self.setMinimumSize(700, 500)
-        
-        # Инициализация интерфейса
-        self.setup_ui()
-        self.setup_connections()
-        self.setup_menu()
+        Raises:
+            ValueError: Документ не удалось конвертировать в RTF.
+        """
+        from striprtf.striprtf import rtf_to_text
 
-        # Запуск проверки обновлений
-        QTimer.singleShot(2000, self.check_for_updates)
+        if input_path.lower().endswith('.rtf'):
+            rtf_path = input_path
+        else:
+            self.log("Конвертация в RTF...", status=True)
+            with self.stage('io'):
+                rtf_path = self.convert_to_rtf(input_path)
+            if not rtf_path:
+                self.check_canceled()
+                raise ValueError("Не удалось конвертировать файл в RTF")
 
-    def setup_ui(self):
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-        main_layout.setContentsMargins(15, 15, 15, 15)
-        main_layout.setSpacing(15)
+        try:
+            with open(rtf_path, 'r', encoding='utf-8') as f:
+                rtf_text = f.read()
+            with self.stage('cpu'):
+                return rtf_to_text(rtf_text)
+        finally:
+            # Удаление временного файла
+            if rtf_path != input_path:
+                try:
+                    os.remove(rtf_path)
+                except OSError as e:
+                    self.log(f"[ВНИМАНИЕ] Не удалось удалить временный файл: {str(e)}")
 
-        # Верхняя панель
-        header_layout = QHBoxLayout()
-        header_layout.setContentsMargins(0, 0, 0, 10)
-        
-        # Кнопка обновления
-        self.update_btn = QPushButton()
-        self.update_btn.setVisible(False)
-        self.update_btn.setIcon(QIcon(":/icons/update.svg"))
-        self.update_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-size: 11pt;
-                border: none;
-                min-width: 180px;
-            }
-            QPushButton:hover { background-color: #45a049; }
-            QPushButton:pressed { background-color: #3d8b40; }
-        """)
-        self.update_btn.clicked.connect(self.open_update_page)
+    def convert_to_rtf(self, input_path):
+        try:
+            if not os.path.exists(input_path):
+                self.log(f"[ОШИБКА] Файл не найден: {input_path}", status=True)
+                return None
 
-        # Кнопка "О программе"
-        self.about_btn = QPushButton("Разработчик")
-        self.about_btn.setStyleSheet("""
-            QPushButton {
-                padding: 5px 12px;
-                font-weight: 500;
-                background-color: #f8f9fa;
-                color: #212529;
-                border-radius: 4px;
-                font-size: 11pt;
-                border: 1px solid #dee2e6;
-            }
-            QPushButton:hover { background-color: #e9ecef; }
-            QPushButton:pressed { background-color: #dee2e6; }
-        """)
-        self.about_btn.setFixedSize(120, 30)
+            # pywin32 нужен только для документов Word
+            import pythoncom
+            import win32com.client as win32
 
-        # Правая часть шапки
-        header_right = QHBoxLayout()
-        header_right.setSpacing(15)
-        header_right.addWidget(self.update_btn)
-        header_right.addWidget(self.about_btn)
-        
-        header_layout.addStretch()
-        header_layout.addLayout(header_right)
+            pythoncom.CoInitialize()
+            word = None
+            doc = None
+            temp_path = None
+            file_created = False  # Флаг успешного создания файла
 
-        # Область выбора файлов
-        file_layout = QVBoxLayout()
-        file_layout.addLayout(self.create_file_row("Исходный файл:", "Выбрать...", True))
-        file_layout.addLayout(self.create_file_row("Результирующий файл:", "Сохранить как...", False))
+            try:
+                # Инициализация Word
+                try:
+                    # Отдельный экземпляр Word: задания очереди не должны закрывать документы друг друга
+                    word = win32.DispatchEx("Word.Application")
+                    word.Visible = False
+                    word.DisplayAlerts = False
+                except Exception as e:
+                    self.log("[ОШИБКА] Не удалось инициализировать Microsoft Word", status=True)
+                    raise RuntimeError("Ошибка инициализации Word") from e
 
-        # Лог-панель
-        self.log_area = QTextEdit()
-        self.log_area.setReadOnly(True)
-        self.log_area.setStyleSheet("""
-            QTextEdit {
-                font-family: 'Segoe UI';
-                font-size: 11pt;
-                background-color: #ffffff;
-                border: 1px solid #dee2e6;
-                border-radius: 4px;
-                padding: 8px;
-            }
-        """)
+                # Попытки открытия документа
+                for attempt in range(1, 4):
+                    self.check_canceled()
+                    try:
+                        doc = word.Documents.Open(
+                            FileName=os.path.abspath(input_path),
+                            ConfirmConversions=False,
+                            ReadOnly=True,
+                            AddToRecentFiles=False,
+                            PasswordDocument=""
+                        )
+                        if doc:
+                            break
+                    except Exception as e:
+                        if attempt == 3:
+                            error_msg = f"Не удалось открыть документ после 3 попыток: {str(e)}"
+                            if "The document is locked" in str(e):
+                                error_msg += "\nФайл заблокирован для редактирования!"
+                            raise RuntimeError(error_msg) from e
+                        time.sleep(1.5)
 
-        # Кнопка конвертации
-        self.convert_btn = QPushButton("Конвертировать файл")
-        self.convert_btn.setStyleSheet("""
-            QPushButton {
-                padding: 12px 24px;
-                font-weight: 600;
-                background-color: #4CAF50;
-                color: white;
-                border-radius: 6px;
-                font-size: 12pt;
-                margin: 10px 0;
-                border: none;
-            }
-            QPushButton:hover { background-color: #45a049; }
-            QPushButton:pressed { background-color: #3d8b40; }
-        """)
+                # Проверка успешности открытия
+                if not doc:
+                    raise RuntimeError("Документ не был открыт")
 
-        # Сборка интерфейса
-        main_layout.addLayout(header_layout)
-        main_layout.addLayout(file_layout)
-        main_layout.addWidget(self.log_area, 1)
-        main_layout.addWidget(self.convert_btn)
+                self.check_canceled()
 
-    def create_file_row(self, label_text, button_text, is_input):
+                # Создание временного файла
+                sanitized_name = sanitize_filename(os.path.basename(input_path))
+                fd, temp_path = tempfile.mkstemp(prefix=f"temp_{sanitized_name}_", suffix=".rtf")
+                os.close(fd)
+
+                # Сохранение документа
+                try:
+                    doc.SaveAs(temp_path, FileFormat=6)
+                    file_created = True
+                    self.log(f"Успешно создан временный файл: {temp_path}")
+                except Exception as e:
+                    raise RuntimeError(f"Ошибка сохранения RTF: {str(e)}") from e
+
+                return temp_path
+
+            except ConversionCanceled:
+                raise
+            except Exception as e:
+                error_msg = f"[ОШИБКА] Конвертация: {str(e)}"
+                self.log(error_msg, status=True)
+                return None
+
+            finally:
+                try:
+                    # Закрытие документа и Word
+                    if doc:
+                        doc.Close(SaveChanges=False)
+                    if word:
+                        word.Quit()
+                    
+                    # Удаление временного файла только при ошибке
+                    if temp_path and os.path.exists(temp_path) and not file_created:
+                        try:
+                            os.remove(temp_path)
+                        except Exception as remove_error:
+                            self.log(f"[WARNING] Ошибка удаления файла: {str(remove_error)}")
+                    
+                    pythoncom.CoUninitialize()
+                    
+                except Exception as cleanup_error:
+                    self.log(f"[ОШИБКА] Очистка ресурсов: {str(cleanup_error)}")
+                    if "RPC_E_CALL_REJECTED" in str(cleanup_error):
+                        self.log("[WARNING] Попробуйте перезапустить приложение", status=True)
+
+        except ConversionCanceled:
+            raise
+        except Exception as outer_error:
+            self.log(f"[ОШИБКА] Внешняя ошибка: {str(outer_error)}", status=True)
+            return None
+
+    @staticmethod
+    def cell_pairs(cells):
+        """
+        Пары (номер ячейки, уровень, вместимость) из ячеек таблицы RTF.
+
+        Все части всех ячеек разбираются одним пакетом; ячейка подходит,
+        если состоит из 2 или 3 чисел (уровень, вместимость, коэффициент).
+        """
+        from calibration.numeric import normalize_numbers
+
+        tokens = normalize_numbers([part for parts in cells for part in parts])
+        offset = 0
+        for index, parts in enumerate(cells):
+            numbers = tokens[offset:offset + len(parts)]
+            offset += len(parts)
+            if len(numbers) in (2, 3) and all(numbers):
+                yield index, numbers[0], numbers[1]
+
+    def process_text(self, plain_text):
+        """Пары 'уровень~вместимость' из ячеек таблиц текста документа"""
+        try:
+            cells = []
+            lines = plain_text.split('\n')
+            for line_number, line in enumerate(lines, 1):
+                if '|' in line:
+                    cells.extend(cell.split() for cell in line.split('|') if cell.strip())
+                if line_number % 1000 == 0:
+                    self.check_canceled()
+                    self.report_progress(line_number, len(lines), "строк документа")
+            self.report_progress(len(lines), len(lines), "строк документа")
+
+            data = []
+            for _, level, capacity in self.cell_pairs(cells):
+                result = f"{level}~{capacity}"
+                data.append(result)
+                self.log(f"[RTF] Найдено: {result}")
+            return data
+        except ConversionCanceled:
+            raise
+        except Exception as e:
+            self.log(f"[ОШИБКА] Обработка таблиц документа: {str(e)}", status=True)
+            return None
+
+
+# Выполнение ConversionJob в отдельном потоке
+class ConversionWorker(QThread):
+    log = Signal(str, bool)
+    progress = Signal(int, int, str)   # обработано, всего, единица ("строк", ...)
+    succeeded = Signal(int, str)       # число записей, итоговое сообщение
+    failed = Signal(str)
+    canceled = Signal()
+
+    def __init__(self, input_path, output_path, parent=None):
+        super().__init__(parent)
+        self.job = ConversionJob(input_path, output_path,
+                                 log=lambda message, status=False: self.log.emit(message, status),
+                                 progress=self.progress.emit)
+
+    def cancel(self):
+        self.job.cancel()
+
+    def run(self):
+        try:
+            count, message = self.job.run()
+        except ConversionCanceled:
+            self.canceled.emit()
+        except Exception as e:
+            self.failed.emit(f"Критическая ошибка: {str(e)}")
+        else:
+            self.succeeded.emit(count, message)
+
+# Предпросмотр извлечённых пар до конвертации
+class PreviewModel(QAbstractTableModel):
+    """
+    Пары (уровень, вместимость) предпросмотра в массивах NumPy.
+
+    Массивы растут удвоением, блоки от рабочего потока дописываются целиком;
+    data() читает значения видимых ячеек прямо из массивов.
+    """
+
+    COLUMNS = ("Источник", "Столбцы", "Уровень", "Вместимость")
+    FIELDS = ('levels', 'volumes', 'rows', 'sides', 'sources')
+
+    def __init__(self, side_names, parent=None):
+        """
+        Args:
+            side_names (tuple): Подписи пар столбцов по номеру стороны, например ("B-C", "F-G").
+        """
+        import numpy as np
+
+        super().__init__(parent)
+        self.side_names = side_names
+        self.source_names = []
+        self.size = 0
+        self.arrays = {
+            'levels': np.empty(1024, dtype=np.float64),
+            'volumes': np.empty(1024, dtype=np.float64),
+            'rows': np.empty(1024, dtype=np.int64),
+            'sides': np.empty(1024, dtype=np.uint8),
+            'sources': np.empty(1024, dtype=np.int32),
+        }
+
+    def append_chunk(self, chunk):
+        import numpy as np
+
+        count = len(chunk['levels'])
+        if not count:
+            return
+        if not self.source_names or self.source_names[-1] != chunk['source']:
+            self.source_names.append(chunk['source'])
+        capacity = len(self.arrays['levels'])
+        if self.size + count > capacity:
+            while self.size + count > capacity:
+                capacity *= 2
+            for name, array in self.arrays.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                self.arrays[name] = grown
+
+        self.beginInsertRows(QModelIndex(), self.size, self.size + count - 1)
+        for name in ('levels', 'volumes', 'rows', 'sides'):
+            self.arrays[name][self.size:self.size + count] = chunk[name]
+        self.arrays['sources'][self.size:self.size + count] = len(self.source_names) - 1
+        self.size += count
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.size
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.size:
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.TextAlignmentRole and column >= 2:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if column == 0:
+            source = self.source_names[self.arrays['sources'][row]]
+            line = int(self.arrays['rows'][row])
+            return f"{source}, строка {line}" if source else f"строка {line}"
+        if column == 1:
+            return self.side_names[self.arrays['sides'][row]]
+        value = float(self.arrays['levels' if column == 2 else 'volumes'][row])
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.15f}".rstrip('0').rstrip('.')
+
+
+class PreviewWorker(QThread):
+    chunk = Signal(object)
+    progress = Signal(int, int, str)
+    failed = Signal(str)
+
+    def __init__(self, input_path, parent=None):
+        super().__init__(parent)
+        self.job = ConversionJob(input_path, "", progress=self.progress.emit)
+
+    def cancel(self):
+        self.job.cancel()
+
+    def run(self):
+        try:
+            for chunk in self.job.iter_pairs():
+                self.chunk.emit(chunk)
+        except ConversionCanceled:
+            pass
+        except Exception as e:
+            self.failed.emit(f"Ошибка предпросмотра: {str(e)}")
+
+
+class PreviewDialog(QDialog):
+    """Предпросмотр пар из файла: первые строки показываются сразу, остальные дочитываются в фоне"""
+
+    def __init__(self, input_path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Предпросмотр: {os.path.basename(input_path)}")
+        self.resize(640, 560)
+        self.started = time.perf_counter()
+        self.first_chunk_ms = None
+        self.failed = False
+        self.closing = False
+
+        if input_path.lower().endswith(ConversionJob.EXCEL_EXTENSIONS):
+            side_names = tuple("{}-{}".format(*(chr(ord('A') + col) for col in cols))
+                               for cols in (ConversionJob.LEFT_COLS, ConversionJob.RIGHT_COLS))
+            columns_text = f"Уровень и вместимость берутся из столбцов {side_names[0]} и {side_names[1]}"
+        else:
+            side_names = ("ячейка",)
+            columns_text = "Уровень и вместимость берутся из ячеек таблиц документа"
+        self.model = PreviewModel(side_names, self)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(columns_text))
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        # Строки одной высоты: представлению не нужно измерять каждую строку
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, 1)
+        self.status_label = QLabel("Чтение файла...")
+        layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        convert_btn = QPushButton("Конвертировать")
+        convert_btn.clicked.connect(self.accept)
+        close_btn = QPushButton("Закрыть")
+        close_btn.clicked.connect(self.reject)
+        buttons.addWidget(convert_btn)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.worker = PreviewWorker(input_path, self)
+        self.worker.chunk.connect(self.handle_chunk)
+        self.worker.progress.connect(self.handle_progress)
+        self.worker.failed.connect(self.handle_failed)
+        self.worker.finished.connect(self.handle_finished)
+        self.worker.start()
+
+    def handle_chunk(self, chunk):
+        if self.first_chunk_ms is None:
+            self.first_chunk_ms = (time.perf_counter() - self.started) * 1000
+        self.model.append_chunk(chunk)
+
+    def handle_progress(self, done, total, unit):
+        self.status_label.setText(f"Найдено пар: {self.model.size}; обработано {done} из {total} {unit}...")
+
+    def handle_failed(self, message):
+        self.failed = True
+        self.status_label.setText(message)
+
+    def handle_finished(self):
+        if self.worker.job.canceled or self.failed:
+            return
+        text = f"Найдено пар: {self.model.size}"
+        if self.first_chunk_ms is not None:
+            text += f" (первые строки - через {self.first_chunk_ms:.0f} мс)"
+        self.status_label.setText(text)
+
+    def done(self, result):
+        # Закрытие диалога останавливает разбор на ближайшей границе блока; диалог
+        # закрывается по завершении потока, не блокируя интерфейс ожиданием
+        if self.worker.isFinished():
+            super().done(result)
+            return
+        if not self.closing:
+            self.closing = True
+            self.status_label.setText("Остановка разбора...")
+            self.worker.finished.connect(lambda: self.done(result))
+            self.worker.cancel()
+            # Поток мог завершиться до подключения к finished
+            if self.worker.isFinished():
+                super().done(result)
+
+
+# Очередь пакетной конвертации
+class JobSignals(QObject):
+    started = Signal(int)
+    progress = Signal(int, int, int, str)  # номер задания, обработано, всего, единица
+    log = Signal(str, bool)
+    succeeded = Signal(int, int, str)      # номер задания, число записей, итоговое сообщение
+    failed = Signal(int, str)
+    canceled = Signal(int)
+
+
+class ConversionTask(QRunnable):
+    """Задание очереди, выполняемое в пуле потоков"""
+
+    def __init__(self, job_id, job, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.job = job
+        self.signals = signals
+
+    def run(self):
+        self.signals.started.emit(self.job_id)
+        try:
+            count, message = self.job.run()
+        except ConversionCanceled:
+            self.signals.canceled.emit(self.job_id)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, f"Критическая ошибка: {str(e)}")
+        else:
+            self.signals.succeeded.emit(self.job_id, count, message)
+
+
+class JobQueuePanel(QWidget):
+    """
+    Панель очереди: файлы и папки перетаскиваются в таблицу и конвертируются
+    в пуле потоков. Чтение файлов и работа Word ('io') ограничиваются отдельно
+    от разбора таблиц ('cpu').
+    """
+
+    log = Signal(str, bool)
+    idle = Signal()  # все задания очереди завершены
+
+    QUEUED, RUNNING, DONE, EMPTY, FAILED, CANCELED = range(6)
+    STATE_NAMES = {
+        QUEUED: "В очереди",
+        RUNNING: "Выполняется",
+        DONE: "Готово",
+        EMPTY: "Нет данных",
+        FAILED: "Ошибка",
+        CANCELED: "Отменено",
+    }
+    STATE_COLORS = {DONE: QColor("#2e7d32"), EMPTY: QColor("#b26a00"), FAILED: QColor("#c62828")}
+    COLUMNS = ("Файл", "Состояние", "Записей", "Время, с", "Результат")
+
+    SUPPORTED_EXTENSIONS = ConversionJob.EXCEL_EXTENSIONS + ConversionJob.WORD_EXTENSIONS
+
+    # Одновременно открытых документов (каждый - отдельный экземпляр Word)
+    IO_SLOTS = 2
+    # Одновременно разбираемых таблиц
+    CPU_SLOTS = max(1, (os.cpu_count() or 2) - 1)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = {}
+        self.order = []
+        self.next_id = 0
+        self.stages = {'io': threading.Semaphore(self.IO_SLOTS), 'cpu': threading.Semaphore(self.CPU_SLOTS)}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.IO_SLOTS + self.CPU_SLOTS)
+        self.signals = JobSignals(self)
+        self.signals.started.connect(self.handle_started)
+        self.signals.progress.connect(self.handle_progress)
+        self.signals.log.connect(self.log)
+        self.signals.succeeded.connect(self.handle_succeeded)
+        self.signals.failed.connect(self.handle_failed)
+        self.signals.canceled.connect(self.handle_canceled)
+        # Обновление времени выполняющихся заданий
+        self.clock = QTimer(self)
+        self.clock.setInterval(1000)
+        self.clock.timeout.connect(self.update_running_rows)
+        self.setAcceptDrops(True)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        hint = QLabel("Очередь: перетащите сюда файлы или папки (.doc, .docx, .rtf, .xls, .xlsx)")
+        hint.setStyleSheet("color: #6c757d;")
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        self.table.doubleClicked.connect(self.open_selected)
+
+        # Папка результатов; если не указана, результат сохраняется рядом с исходным файлом
+        self.output_dir_entry = QLineEdit()
+        self.output_dir_entry.setPlaceholderText("Папка результатов (по умолчанию - рядом с исходным файлом)")
+        output_dir_btn = QPushButton("Папка...")
+        output_dir_btn.setFixedSize(100, 30)
+        output_dir_btn.clicked.connect(self.select_output_dir)
+        output_row = QHBoxLayout()
+        output_row.addWidget(self.output_dir_entry, 1)
+        output_row.addWidget(output_dir_btn)
+
+        buttons = QHBoxLayout()
+        for text, slot in (("Добавить файлы...", self.select_files),
+                           ("Добавить папку...", self.select_folder),
+                           ("Повторить", self.retry_selected),
+                           ("Открыть результат", self.open_selected),
+                           ("Отменить все", self.cancel_all),
+                           ("Очистить завершенные", self.clear_finished)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        buttons.addStretch()
+
+        layout.addWidget(hint)
+        layout.addWidget(self.table, 1)
+        layout.addLayout(output_row)
+        layout.addLayout(buttons)
+
+    # Добавление файлов
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            self.add_paths(paths)
+            event.acceptProposedAction()
+
+    def select_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Выберите файлы", "",
+            "Документы (*.docx *.doc *.rtf *.xls *.xlsx);;Все файлы (*)")
+        self.add_paths(paths)
+
+    def select_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку")
+        if folder:
+            self.add_paths([folder])
+
+    def select_output_dir(self):
+        folder = QFileDialog.getExistingDirectory(self, "Папка результатов")
+        if folder:
+            self.output_dir_entry.setText(folder)
+
+    def collect_files(self, path):
+        """Поддерживаемые файлы по пути к файлу или папке (с вложенными папками)"""
+        if os.path.isfile(path):
+            return [path] if path.lower().endswith(self.SUPPORTED_EXTENSIONS) else []
+        found = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                # Временные файлы Word ("~$имя.docx") пропускаются
+                if name.lower().endswith(self.SUPPORTED_EXTENSIONS) and not name.startswith('~$'):
+                    found.append(os.path.join(root, name))
+        return found
+
+    def add_paths(self, paths):
+        active = {job['input'] for job in self.jobs.values() if job['state'] in (self.QUEUED, self.RUNNING)}
+        added = 0
+        for path in paths:
+            for input_path in self.collect_files(os.path.normpath(path)):
+                if input_path in active:
+                    continue
+                active.add(input_path)
+                job_id = self.next_id
+                self.next_id += 1
+                self.jobs[job_id] = {
+                    'input': input_path,
+                    'output': self.output_path_for(input_path),
+                    'state': self.QUEUED,
+                    'job': None,
+                    'started': None,
+                    'seconds': None,
+                    'count': None,
+                    'message': "",
+                    'percent': None,
+                }
+                self.order.append(job_id)
+                self.table.insertRow(self.table.rowCount())
+                self.update_row(job_id)
+                self.enqueue(job_id)
+                added += 1
+        if added:
+            self.log.emit(f"В очередь добавлено файлов: {added}", True)
+        elif paths:
+            self.log.emit("Подходящих файлов не найдено", True)
+
+    def output_path_for(self, input_path):
+        """Имя результата: очищенное имя исходного файла с .txt, без совпадений внутри очереди"""
+        output_dir = self.output_dir_entry.text().strip() or os.path.dirname(input_path)
+        base_name = sanitize_filename(os.path.splitext(os.path.basename(input_path))[0])
+        taken = {job['output'] for job in self.jobs.values()}
+        output_path = os.path.join(output_dir, f"{base_name}.txt")
+        suffix = 2
+        while output_path in taken:
+            output_path = os.path.join(output_dir, f"{base_name}_{suffix}.txt")
+            suffix += 1
+        return output_path
+
+    # Выполнение
+    def enqueue(self, job_id):
+        record = self.jobs[job_id]
+        name = os.path.basename(record['input'])
+        signals = self.signals
+        record['job'] = ConversionJob(
+            record['input'], record['output'],
+            log=lambda message, status=False: signals.log.emit(f"[{name}] {message}", status),
+            progress=lambda done, total, unit: signals.progress.emit(job_id, done, total, unit),
+            stages=self.stages)
+        record.update(state=self.QUEUED, started=None, seconds=None, count=None, message="", percent=None)
+        self.update_row(job_id)
+        self.pool.start(ConversionTask(job_id, record['job'], self.signals))
+
+    def handle_started(self, job_id):
+        record = self.jobs.get(job_id)
+        if record is None:
+            return
+        record['state'] = self.RUNNING
+        record['started'] = time.perf_counter()
+        if not self.clock.isActive():
+            self.clock.start()
+        self.update_row(job_id)
+
+    def handle_progress(self, job_id, done, total, unit):
+        record = self.jobs.get(job_id)
+        if record is not None and total > 0:
+            record['percent'] = done * 100 // total
+            self.update_row(job_id)
+
+    def handle_succeeded(self, job_id, count, message):
+        self.finish(job_id, self.DONE if count else self.EMPTY, message, count)
+
+    def handle_failed(self, job_id, message):
+        self.log.emit(f"[{os.path.basename(self.jobs[job_id]['input'])}] {message}", True)
+        self.finish(job_id, self.FAILED, message)
+
+    def handle_canceled(self, job_id):
+        self.finish(job_id, self.CANCELED, "Обработка остановлена пользователем")
+
+    def finish(self, job_id, state, message, count=None):
+        record = self.jobs[job_id]
+        record.update(state=state, message=message, count=count, job=None)
+        if record['started'] is not None:
+            record['seconds'] = time.perf_counter() - record['started']
+        self.update_row(job_id)
+        if not self.has_active_jobs():
+            self.clock.stop()
+            self.report_summary()
+            self.idle.emit()
+
+    def has_active_jobs(self):
+        return any(job['state'] in (self.QUEUED, self.RUNNING) for job in self.jobs.values())
+
+    def report_summary(self):
+        counts = {}
+        for job in self.jobs.values():
+            counts[job['state']] = counts.get(job['state'], 0) + 1
+        summary = ", ".join(f"{self.STATE_NAMES[state].lower()}: {count}"
+                            for state, count in sorted(counts.items()))
+        self.log.emit(f"Очередь обработана ({summary})", True)
+
+    def update_running_rows(self):
+        for job_id, record in self.jobs.items():
+            if record['state'] == self.RUNNING:
+                self.update_row(job_id)
+
+    def update_row(self, job_id):
+        record = self.jobs[job_id]
+        row = self.order.index(job_id)
+        state = self.STATE_NAMES[record['state']]
+        if record['state'] == self.RUNNING and record['percent'] is not None:
+            state = f"{state} {record['percent']}%"
+        seconds = record['seconds']
+        if seconds is None and record['started'] is not None:
+            seconds = time.perf_counter() - record['started']
+        values = (
+            os.path.basename(record['input']),
+            state,
+            "" if record['count'] is None else str(record['count']),
+            "" if seconds is None else f"{seconds:.1f}",
+            record['output'] if record['state'] in (self.DONE, self.EMPTY) else "",
+        )
+        tooltips = (record['input'], record['message'], "", "", record['output'])
+        for column, (value, tooltip) in enumerate(zip(values, tooltips)):
+            item = self.table.item(row, column)
+            if item is None:
+                item = QTableWidgetItem()
+                self.table.setItem(row, column, item)
+            item.setText(value)
+            item.setToolTip(tooltip)
+        color = self.STATE_COLORS.get(record['state'])
+        self.table.item(row, 1).setForeground(color if color is not None else self.table.palette().text())
+
+    # Действия с выбранными заданиями
+    def selected_job_ids(self):
+        return [self.order[index.row()] for index in self.table.selectionModel().selectedRows()]
+
+    def retry_selected(self):
+        retried = [job_id for job_id in self.selected_job_ids()
+                   if self.jobs[job_id]['state'] in (self.FAILED, self.CANCELED, self.EMPTY)]
+        for job_id in retried:
+            self.enqueue(job_id)
+
+    def open_selected(self):
+        for job_id in self.selected_job_ids():
+            record = self.jobs[job_id]
+            if record['state'] == self.DONE and os.path.exists(record['output']):
+                QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(record['output'])))
+            elif record['state'] == self.FAILED:
+                QMessageBox.warning(self, "Ошибка", record['message'])
+
+    def cancel_all(self):
+        for record in self.jobs.values():
+            if record['job'] is not None:
+                record['job'].cancel()
+
+    def clear_finished(self):
+        for job_id in list(self.order):
+            if self.jobs[job_id]['state'] not in (self.QUEUED, self.RUNNING):
+                self.table.removeRow(self.order.index(job_id))
+                self.order.remove(job_id)
+                del self.jobs[job_id]
+
+    def shutdown(self, timeout=-1):
+        """
+        Отменяет задания и дожидается их завершения (перед закрытием окна).
+
+        Args:
+            timeout (int): Наибольшее время ожидания в мс; -1 - без ограничения.
+
+        Returns:
+            bool: Все задания завершены.
+        """
+        self.cancel_all()
+        return self.pool.waitForDone(timeout)
+
+
+# Журнал: последние записи в кольцевом буфере, полная копия - во временном файле
+class LogModel(QAbstractListModel):
+    """
+    Модель журнала фиксированного объёма.
+
+    В памяти хранятся последние capacity записей; каждая запись также дописывается
+    во временный файл, из которого журнал сохраняется целиком. Записи, поступающие
+    подряд, добавляются в модель пачкой по таймеру, поэтому представление
+    перерисовывается не чаще одного раза за интервал.
+    """
+
+    DETAIL, INFO, WARNING, ERROR = range(4)
+    LEVEL_NAMES = ("Подробно", "Сообщения", "Предупреждения", "Ошибки")
+    LEVEL_COLORS = {WARNING: QColor("#b26a00"), ERROR: QColor("#c62828")}
+    LevelRole = Qt.ItemDataRole.UserRole + 1
+
+    DEFAULT_CAPACITY = 10000
+    FLUSH_INTERVAL = 100  # мс
+
+    WARNING_MARKERS = ('[внимание]', '[warning]', '[проверка]', 'нарушения')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self._pending = []
+        self._spill = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush)
+
+    @classmethod
+    def classify(cls, message, status=False):
+        """Уровень записи по тексту сообщения"""
+        lowered = message.lower()
+        if 'ошибк' in lowered or '[error]' in lowered:
+            return cls.ERROR
+        if any(marker in lowered for marker in cls.WARNING_MARKERS):
+            return cls.WARNING
+        return cls.INFO if status else cls.DETAIL
+
+    def append(self, message, status=False):
+        timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
+        self._spill.write(f"[{timestamp}] {message}\n")
+        self._pending.append((timestamp, self.classify(message, status), message))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Переносит накопленные записи в модель"""
+        pending, self._pending = self._pending[-self.capacity:], []
+        if not pending:
+            return
+        if len(pending) == self.capacity:
+            self.beginResetModel()
+            self._ring[:] = pending
+            self._start, self._count = 0, self.capacity
+            self.endResetModel()
+            return
+
+        # Вытеснение самых старых записей
+        overflow = self._count + len(pending) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self.capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), self._count, self._count + len(pending) - 1)
+        for entry in pending:
+            self._ring[(self._start + self._count) % self.capacity] = entry
+            self._count += 1
+        self.endInsertRows()
+
+    def entry(self, row):
+        return self._ring[(self._start + row) % self.capacity]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._count:
+            return None
+        timestamp, level, message = self.entry(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"[{timestamp}] " + message.replace('\n', ' ')
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return message
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.LEVEL_COLORS.get(level)
+        if role == self.LevelRole:
+            return level
+        return None
+
+    def clear(self):
+        self._flush_timer.stop()
+        self._pending = []
+        self.beginResetModel()
+        self._ring = [None] * self.capacity
+        self._start = self._count = 0
+        self.endResetModel()
+        self._spill.seek(0)
+        self._spill.truncate()
+
+    def export(self, path):
+        """Сохраняет полный журнал, включая вытесненные из памяти записи"""
+        self._spill.flush()
+        self._spill.seek(0)
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                shutil.copyfileobj(self._spill, f)
+        finally:
+            self._spill.seek(0, os.SEEK_END)
+
+
+class LogFilterModel(QSortFilterProxyModel):
+    """Записи журнала не ниже выбранного уровня"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_level = LogModel.DETAIL
+
+    def set_min_level(self, level):
+        self.min_level = level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.min_level == LogModel.DETAIL:
+            return True
+        return self.sourceModel().entry(source_row)[1] >= self.min_level
+
+
+# Единственный экземпляр: повторный запуск передаёт файлы уже открытому окну
+class InstanceServer(QObject):
+    """
+    Локальный сервер (именованный канал в Windows) запущенного экземпляра.
+
+    Повторный запуск подключается к нему, передаёт пути к файлам из командной
+    строки одной строкой JSON и завершается, не создавая окна.
+    """
+
+    paths_received = Signal(list)
+
+    CONNECT_TIMEOUT = 500  # мс
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.handle_connection)
+        self.buffers = {}
+
+    @staticmethod
+    def server_name():
+        """Имя сервера для текущего пользователя (у каждого пользователя свой экземпляр)"""
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "user"
+        return f"{AppConfig.PROGRAM_SLUG}-{sanitize_filename(user)}"
+
+    @classmethod
+    def forward(cls, paths):
+        """
+        Передаёт пути запущенному экземпляру.
+
+        Returns:
+            bool: True, если экземпляр найден и пути переданы.
+        """
+        socket = QLocalSocket()
+        socket.connectToServer(cls.server_name())
+        if not socket.waitForConnected(cls.CONNECT_TIMEOUT):
+            return False
+        socket.write(json.dumps(paths, ensure_ascii=False).encode('utf-8') + b'\n')
+        delivered = socket.waitForBytesWritten(cls.CONNECT_TIMEOUT)
+        socket.disconnectFromServer()
+        return delivered
+
+    def listen(self, paths):
+        """
+        Занимает имя сервера. Если его уже занял другой экземпляр (например, запущенный
+        одновременно с этим), пути передаются ему.
+
+        Returns:
+            bool: True, если этот экземпляр стал основным; False, если пути переданы другому.
+        """
+        name = self.server_name()
+        if self.server.listen(name):
+            return True
+        if self.forward(paths):
+            return False
+        # Никто не отвечает: сокет остался от аварийно завершённого экземпляра
+        QLocalServer.removeServer(name)
+        self.server.listen(name)
+        return True
+
+    def handle_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = bytearray()
+            socket.readyRead.connect(lambda socket=socket: self.read_socket(socket))
+            socket.disconnected.connect(lambda socket=socket: self.close_socket(socket))
+
+    def read_socket(self, socket):
+        buffer = self.buffers.get(socket)
+        if buffer is None:
+            return
+        buffer.extend(socket.readAll().data())
+        if b'\n' not in buffer:
+            return
+        message = bytes(buffer.split(b'\n', 1)[0])
+        buffer.clear()
+        try:
+            paths = json.loads(message.decode('utf-8'))
+        except ValueError:
+            paths = None
+        if isinstance(paths, list):
+            self.paths_received.emit([str(path) for path in paths])
+
+    def close_socket(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+
+# Основной класс приложения
+class FileConverterApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.current_version = AppConfig.VERSION  # Замените на вашу версию
+        self.update_check_url = AppConfig.update_check_endpoint(self.current_version)
+        self.update_info = None
+        self.update_checker = None
+        self.settings = QSettings("YourCompany", "YourApp")
+        self.worker = None
+        self.close_pending = False
+        self.queue_panel = None
+        self.pending_paths = []
+        self.startup_finished = False
+
+        # Настройка главного окна
+        self.setWindowTitle("File Converter Pro")
+        self.setGeometry(100, 100, 800, 600)
+        self.setMinimumSize(700, 500)
+        
+        # Инициализация интерфейса
+        self.setup_ui()
+        self.setup_connections()
+        self.setup_menu()
+        report_startup("window")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_finished:
+            self.startup_finished = True
+            report_startup("first_paint")
+            # Необязательные части достраиваются, когда окно уже на экране
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        self.setup_queue_panel()
+        report_startup("ready")
+        if os.environ.get("CONTAB_STARTUP_EXIT"):
+            QTimer.singleShot(0, self.close)
+            return
+
+        # Проверка соглашения при запуске
+        self.check_agreement()
+
+        # Запуск проверки обновлений
+        QTimer.singleShot(2000, self.check_for_updates)
+
+    def setup_queue_panel(self):
+        self.queue_panel = JobQueuePanel()
+        self.queue_panel.log.connect(self.log_message)
+        self.splitter.insertWidget(0, self.queue_panel)
+        if self.pending_paths:
+            self.queue_panel.add_paths(self.pending_paths)
+            self.pending_paths = []
+
+    def open_paths(self, paths):
+        """Добавляет файлы из командной строки или от повторного запуска в очередь и показывает окно"""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        if not paths:
+            return
+        if self.queue_panel is None:
+            # Очередь ещё не построена (см. finish_startup)
+            self.pending_paths.extend(paths)
+        else:
+            self.queue_panel.add_paths(paths)
+
+    def check_agreement(self):
+        """Проверка принятия пользовательского соглашения"""
+        settings = QSettings()
+        if not settings.value("agreement_accepted", False, type=bool):
+            self.show_agreement_dialog()
+
+    def show_agreement_dialog(self):
+        """Показ диалога с соглашением"""
+        dialog = StartupScreen(self)
+        if dialog.exec() == QDialog.Accepted:
+            QSettings().setValue("agreement_accepted", True)
+        else:
+            # Если пользователь не принял соглашение
+            QMessageBox.warning(
+                self,
+                "Требуется согласие",
+                "Для использования программы необходимо принять условия соглашения",
+            )
+            QTimer.singleShot(0, self.close)
+
+    def setup_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setContentsMargins(15, 15, 15, 15)
+        main_layout.setSpacing(15)
+
+        # Верхняя панель
+        header_layout = QHBoxLayout()
+        header_layout.setContentsMargins(0, 0, 0, 10)
+        
+        # Кнопка обновления
+        self.update_btn = QPushButton()
+        self.update_btn.setVisible(False)
+        self.update_btn.setIcon(QIcon(":/icons/update.svg"))
+        self.update_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #4CAF50;
+                color: white;
+                padding: 8px 16px;
+                border-radius: 4px;
+                font-size: 11pt;
+                border: none;
+                min-width: 180px;
+            }
+            QPushButton:hover { background-color: #45a049; }
+            QPushButton:pressed { background-color: #3d8b40; }
+        """)
+        self.update_btn.clicked.connect(self.open_update_page)
+
+        # Кнопка "О программе"
+        self.about_btn = QPushButton("Разработчик")
+        self.about_btn.setStyleSheet("""
+            QPushButton {
+                padding: 5px 12px;
+                font-weight: 500;
+                background-color: #f8f9fa;
+                color: #212529;
+                border-radius: 4px;
+                font-size: 11pt;
+                border: 1px solid #dee2e6;
+            }
+            QPushButton:hover { background-color: #e9ecef; }
+            QPushButton:pressed { background-color: #dee2e6; }
+        """)
+        self.about_btn.setFixedSize(120, 30)
+
+        # Правая часть шапки
+        header_right = QHBoxLayout()
+        header_right.setSpacing(15)
+        header_right.addWidget(self.update_btn)
+        header_right.addWidget(self.about_btn)
+        
+        header_layout.addStretch()
+        header_layout.addLayout(header_right)
+
+        # Область выбора файлов
+        file_layout = QVBoxLayout()
+        file_layout.addLayout(self.create_file_row("Исходный файл:", "Выбрать...", True))
+        file_layout.addLayout(self.create_file_row("Результирующий файл:", "Сохранить как...", False))
+
+        # Лог-панель: модель с ограниченным числом записей и фильтром по уровню
+        self.log_model = LogModel(parent=self)
+        self.log_filter = LogFilterModel(self)
+        self.log_filter.setSourceModel(self.log_model)
+        self.log_area = QListView()
+        self.log_area.setModel(self.log_filter)
+        self.log_area.setUniformItemSizes(True)
+        self.log_area.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.log_area.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.log_area.setStyleSheet("""
+            QListView {
+                font-family: 'Segoe UI';
+                font-size: 11pt;
+                background-color: #ffffff;
+                border: 1px solid #dee2e6;
+                border-radius: 4px;
+                padding: 8px;
+            }
+        """)
+        self.log_filter.rowsAboutToBeInserted.connect(self.remember_log_scroll)
+        self.log_filter.rowsInserted.connect(self.follow_log)
+
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(LogModel.LEVEL_NAMES)
+        self.export_log_btn = QPushButton("Сохранить журнал...")
+        log_header = QHBoxLayout()
+        log_header.addWidget(QLabel("Журнал:"))
+        log_header.addWidget(self.log_level_combo)
+        log_header.addStretch()
+        log_header.addWidget(self.export_log_btn)
+
+        # Предпросмотр извлечённых пар
+        self.preview_btn = QPushButton("Предпросмотр")
+        self.preview_btn.setFixedHeight(48)
+
+        # Кнопка конвертации
+        self.convert_btn = QPushButton("Конвертировать файл")
+        self.convert_btn.setStyleSheet("""
+            QPushButton {
+                padding: 12px 24px;
+                font-weight: 600;
+                background-color: #4CAF50;
+                color: white;
+                border-radius: 6px;
+                font-size: 12pt;
+                margin: 10px 0;
+                border: none;
+            }
+            QPushButton:hover { background-color: #45a049; }
+            QPushButton:pressed { background-color: #3d8b40; }
+        """)
+
+        # Ход обработки и отмена (видны только во время конвертации)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.setFixedSize(100, 30)
+        self.cancel_btn.setVisible(False)
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.cancel_btn)
+
+        # Сборка интерфейса
+        main_layout.addLayout(header_layout)
+        main_layout.addLayout(file_layout)
+        log_widget = QWidget()
+        log_layout = QVBoxLayout(log_widget)
+        log_layout.setContentsMargins(0, 0, 0, 0)
+        log_layout.addLayout(log_header)
+        log_layout.addWidget(self.log_area, 1)
+        # Очередь пакетной конвертации добавляется после первого показа окна (setup_queue_panel)
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.splitter.addWidget(log_widget)
+        main_layout.addWidget(self.splitter, 1)
+        main_layout.addLayout(progress_layout)
+        convert_layout = QHBoxLayout()
+        convert_layout.addWidget(self.preview_btn)
+        convert_layout.addWidget(self.convert_btn, 1)
+        main_layout.addLayout(convert_layout)
+
+    def create_file_row(self, label_text, button_text, is_input):
         layout = QHBoxLayout()
         label = QLabel(label_text)
         entry = QLineEdit()
@@ -649,36 +2105,81 @@ class FileConverterApp(QMainWindow):
         self.browse_input_btn.clicked.connect(self.select_input_file)
         self.browse_output_btn.clicked.connect(self.select_output_file)
         self.convert_btn.clicked.connect(self.process_file)
+        self.preview_btn.clicked.connect(self.show_preview)
+        self.cancel_btn.clicked.connect(self.cancel_conversion)
+        self.log_level_combo.currentIndexChanged.connect(self.log_filter.set_min_level)
+        self.export_log_btn.clicked.connect(self.export_log)
         self.about_btn.clicked.connect(self.show_about_dialog)
 
-    def check_for_updates(self):
+    def check_for_updates(self, force=False):
+        """
+        Проверка обновлений без блокировки интерфейса.
+
+        Результат последней проверки хранится в настройках: пока он моложе
+        AppConfig.UPDATE_CHECK_TTL, сервер не запрашивается. Повторный запрос
+        отправляется с If-None-Match, и при ответе 304 используется сохранённый результат.
+        """
+        if self.update_checker is not None and self.update_checker.isRunning():
+            return
+
+        cached = self.load_update_cache()
+        if cached and not force and time.time() - cached['checked_at'] < AppConfig.UPDATE_CHECK_TTL:
+            self.apply_update_data(cached['data'])
+            return
+
+        self.start_update_check(cached['etag'] if cached else None)
+
+    def start_update_check(self, etag=None):
+        self.update_checker = UpdateChecker(self.update_check_url, self.current_version, etag)
+        self.update_checker.checked.connect(self.handle_update_checked)
+        self.update_checker.check_failed.connect(self.log_message)
+        self.update_checker.start()
+
+    def load_update_cache(self):
+        """Сохранённый результат проверки для текущего адреса, иначе None"""
+        self.settings.beginGroup("update_check")
         try:
-            headers = {
-                'User-Agent': f'FileConverterPro/{self.current_version}',
-                'Accept': 'application/json'
+            if self.settings.value("url", "") != self.update_check_url:
+                return None
+            data = json.loads(self.settings.value("data", "") or "null")
+            if not isinstance(data, dict):
+                return None
+            return {
+                'data': data,
+                'etag': self.settings.value("etag", "") or None,
+                'checked_at': float(self.settings.value("checked_at", 0) or 0),
             }
-            
-            # Исправленный URL запроса
-            response = requests.get(
-                f"https://eshmerko.com/api/check-update/contab/{self.current_version}/",
-                headers=headers,
-                timeout=10,
-                verify=False
-            )
-                
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('update_available', False):
-                    self.handle_update_available(data)
-                else:
-                    self.handle_no_updates()
-            else:
-                self.log_message(f"Ошибка проверки обновлений: {response.status_code}")
-                
-        except Exception as e:
-            self.log_message(f"Ошибка при проверке обновлений: {str(e)}")
-            if "Excel" in str(e):
-                self.log_message("Проверьте установку Microsoft Excel", status=True)
+        except (TypeError, ValueError):
+            return None
+        finally:
+            self.settings.endGroup()
+
+    def handle_update_checked(self, status, data, etag):
+        if status == 304:
+            cached = self.load_update_cache()
+            if cached is None:
+                # Сохранённый результат утерян: запрашиваем заново без ETag
+                self.settings.remove("update_check")
+                self.start_update_check()
+                return
+            data = cached['data']
+        elif not isinstance(data, dict):
+            self.log_message("Ошибка проверки обновлений: некорректный ответ сервера")
+            return
+
+        self.settings.beginGroup("update_check")
+        self.settings.setValue("url", self.update_check_url)
+        self.settings.setValue("data", json.dumps(data, ensure_ascii=False))
+        self.settings.setValue("etag", etag)
+        self.settings.setValue("checked_at", time.time())
+        self.settings.endGroup()
+        self.apply_update_data(data)
+
+    def apply_update_data(self, data):
+        if data.get('update_available', False):
+            self.handle_update_available(data)
+        else:
+            self.handle_no_updates()
 
     def handle_update_available(self, data):
         self.update_info = data
@@ -737,36 +2238,30 @@ class FileConverterApp(QMainWindow):
             self.output_entry.setText(filename)
 
     def log_message(self, message, status=False):
-        timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-        self.log_area.append(f"[{timestamp}] {message}")
+        self.log_model.append(message, status)
         if status:
             self.statusBar().showMessage(message, 5000)
-        QApplication.processEvents()
 
-    def process_cell(self, cell_text):
-        cell_text = cell_text.strip()
-        if not cell_text:
-            return None
+    def remember_log_scroll(self):
+        scroll_bar = self.log_area.verticalScrollBar()
+        self.log_at_bottom = scroll_bar.value() == scroll_bar.maximum()
 
-        parts = cell_text.split()
-        numbers = []
-        for part in parts:
-            if re.match(r'^-?\d*\.?\d+$|^-?\d+\.?\d*$', part):
-                numbers.append(part)
-            else:
-                return None
-        
-        if len(numbers) in (2, 3):
-            return f"{numbers[0]}~{numbers[1]}"
-        return None
-    
-    def sanitize_filename(self, filename):
-        """Очищает имя файла от запрещенных символов и нормализует пробелы."""
-        forbidden_chars = r'[\\/*?:"<>|]'
-        sanitized = re.sub(forbidden_chars, '_', filename)
-        sanitized = sanitized.strip()
-        sanitized = re.sub(r'[\s_]+', '_', sanitized)
-        return sanitized
+    def follow_log(self):
+        # Прокрутка за новыми записями, только если пользователь не листает журнал
+        if getattr(self, 'log_at_bottom', True):
+            self.log_area.scrollToBottom()
+
+    def export_log(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить журнал", "журнал.txt", "Текстовые файлы (*.txt)")
+        if not filename:
+            return
+        try:
+            self.log_model.export(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить журнал: {str(e)}")
+            return
+        self.statusBar().showMessage(f"Журнал сохранен: {filename}", 5000)
 
     def process_file(self):
         input_path = self.input_entry.text().strip()
@@ -802,19 +2297,9 @@ class FileConverterApp(QMainWindow):
                     return
             
             # Очистка лога и начало обработки
-            self.log_area.clear()
+            self.log_model.clear()
             self.log_message("=== Начало обработки Excel файла ===", status=True)
-            
-            try:
-                # Основная обработка Excel
-                success = self.process_excel_data(input_path, output_path)
-                if not success:
-                    QMessageBox.critical(self, "Ошибка", "Ошибка обработки Excel файла!")
-            
-            except Exception as e:
-                error_msg = f"Критическая ошибка: {str(e)}"
-                self.log_message(error_msg, status=True)
-                QMessageBox.critical(self, "Ошибка", error_msg)
+            self.start_conversion(input_path, output_path)
         
         # Обработка Word/RTF файлов
         else:
@@ -835,7 +2320,7 @@ class FileConverterApp(QMainWindow):
                 dirname = os.path.dirname(output_path)
                 filename = os.path.basename(output_path)
                 filename_part, ext = os.path.splitext(filename)
-                sanitized_filename = self.sanitize_filename(filename_part)
+                sanitized_filename = sanitize_filename(filename_part)
                 if not ext:
                     ext = '.txt'
                 ext = ext.lower()
@@ -856,161 +2341,114 @@ class FileConverterApp(QMainWindow):
                     return
             
             self.output_entry.setText(output_path)
-            self.log_area.clear()
+            self.log_model.clear()
             self.log_message("=== Начало обработки ===", status=True)
-            
-            try:
-                # Конвертация в RTF (если нужно)
-                if input_path.lower().endswith('.rtf'):
-                    rtf_path = input_path
-                else:
-                    self.log_message("Конвертация в RTF...", status=True)
-                    rtf_path = self.convert_to_rtf(input_path)
-                    if not rtf_path:
-                        raise ValueError("Не удалось конвертировать файл в RTF")
-                
-                # Обработка RTF
-                data = self.process_rtf(rtf_path)
-                
-                # Удаление временного файла
-                if rtf_path != input_path:
-                    try:
-                        os.remove(rtf_path)
-                    except Exception as e:
-                        self.log_message(f"[ВНИМАНИЕ] Не удалось удалить временный файл: {str(e)}")
-                
-                if not data:
-                    self.log_message("Не найдено подходящих данных!", status=True)
-                    QMessageBox.warning(self, "Предупреждение", "В файле не найдено подходящих данных!")
-                    return
-                
-                # Сортировка и сохранение
-                data.sort(key=lambda x: float(x.split('~')[0]))
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(data))
-                
-                success_msg = (f"Успешно обработано записей: {len(data)}!\n"
-                            f"Результат сохранен: {os.path.abspath(output_path)}")
-                self.log_message(success_msg, status=True)
-                QMessageBox.information(self, "Успех", success_msg)
-            
-            except Exception as e:
-                error_msg = f"Критическая ошибка: {str(e)}"
-                self.log_message(error_msg, status=True)
-                QMessageBox.critical(self, "Ошибка", error_msg)
-
-    def convert_to_rtf(self, input_path):
-        try:
-            if not os.path.exists(input_path):
-                self.log_message(f"[ОШИБКА] Файл не найден: {input_path}", status=True)
-                return None
-
-            pythoncom.CoInitialize()
-            word = None
-            doc = None
-            temp_path = None
-            file_created = False  # Флаг успешного создания файла
+            self.start_conversion(input_path, output_path)
 
-            try:
-                # Инициализация Word
-                try:
-                    word = win32.Dispatch("Word.Application")
-                    word.Visible = False
-                    word.DisplayAlerts = False
-                except Exception as e:
-                    self.log_message("[ОШИБКА] Не удалось инициализировать Microsoft Word", status=True)
-                    raise RuntimeError("Ошибка инициализации Word") from e
-
-                # Попытки открытия документа
-                for attempt in range(1, 4):
-                    try:
-                        doc = word.Documents.Open(
-                            FileName=os.path.abspath(input_path),
-                            ConfirmConversions=False,
-                            ReadOnly=True,
-                            AddToRecentFiles=False,
-                            PasswordDocument=""
-                        )
-                        if doc:
-                            break
-                    except Exception as e:
-                        if attempt == 3:
-                            error_msg = f"Не удалось открыть документ после 3 попыток: {str(e)}"
-                            if "The document is locked" in str(e):
-                                error_msg += "\nФайл заблокирован для редактирования!"
-                            raise RuntimeError(error_msg) from e
-                        time.sleep(1.5)
-
-                # Проверка успешности открытия
-                if not doc:
-                    raise RuntimeError("Документ не был открыт")
-
-                # Создание временного файла
-                temp_dir = tempfile.gettempdir()
-                sanitized_name = self.sanitize_filename(os.path.basename(input_path))
-                temp_path = os.path.join(temp_dir, f"temp_{sanitized_name}.rtf")
-
-                # Сохранение документа
-                try:
-                    doc.SaveAs(temp_path, FileFormat=6)
-                    file_created = True
-                    self.log_message(f"Успешно создан временный файл: {temp_path}")
-                except Exception as e:
-                    raise RuntimeError(f"Ошибка сохранения RTF: {str(e)}") from e
+    def show_preview(self):
+        input_path = self.input_entry.text().strip()
+        if not input_path or not os.path.isfile(input_path):
+            QMessageBox.critical(self, "Ошибка", "Пожалуйста, выберите исходный файл!")
+            return
+        if not input_path.lower().endswith(ConversionJob.EXCEL_EXTENSIONS + ConversionJob.WORD_EXTENSIONS):
+            QMessageBox.critical(
+                self,
+                "Ошибка",
+                "Неподдерживаемый формат файла. Выберите файл с расширением .docx, .doc, .rtf, .xls или .xlsx."
+            )
+            return
+        dialog = PreviewDialog(input_path, self)
+        if dialog.exec() == QDialog.Accepted:
+            self.process_file()
+
+    def start_conversion(self, input_path, output_path):
+        """Запуск конвертации в рабочем потоке; интерфейс остаётся доступным"""
+        self.worker = ConversionWorker(input_path, output_path, self)
+        self.worker.log.connect(self.log_message)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.succeeded.connect(self.handle_conversion_succeeded)
+        self.worker.failed.connect(self.handle_conversion_failed)
+        self.worker.canceled.connect(self.handle_conversion_canceled)
+        self.worker.finished.connect(self.handle_conversion_finished)
+        self.set_running(True)
+        self.worker.start()
+
+    def cancel_conversion(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.cancel_btn.setEnabled(False)
+            self.log_message("Остановка обработки...", status=True)
+            self.worker.cancel()
+
+    def set_running(self, running):
+        """Переключение интерфейса между ожиданием и выполнением конвертации"""
+        self.convert_btn.setEnabled(not running)
+        self.preview_btn.setEnabled(not running)
+        self.browse_input_btn.setEnabled(not running)
+        self.browse_output_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.cancel_btn.setVisible(running)
+        self.progress_bar.setVisible(running)
+        if running:
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setFormat("")
+
+    def update_progress(self, done, total, unit):
+        if total <= 0:
+            return
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"%p% ({done} из {total} {unit})")
 
-                return temp_path
+    def handle_conversion_succeeded(self, count, message):
+        if count:
+            QMessageBox.information(self, "Успех", message)
+        else:
+            QMessageBox.warning(self, "Предупреждение", message)
 
-            except Exception as e:
-                error_msg = f"[ОШИБКА] Конвертация: {str(e)}"
-                self.log_message(error_msg, status=True)
-                return None
+    def handle_conversion_failed(self, message):
+        self.log_message(message, status=True)
+        QMessageBox.critical(self, "Ошибка", message)
 
-            finally:
-                try:
-                    # Закрытие документа и Word
-                    if doc:
-                        doc.Close(SaveChanges=False)
-                    if word:
-                        word.Quit()
-                    
-                    # Удаление временного файла только при ошибке
-                    if temp_path and os.path.exists(temp_path) and not file_created:
-                        try:
-                            os.remove(temp_path)
-                        except Exception as remove_error:
-                            self.log_message(f"[WARNING] Ошибка удаления файла: {str(remove_error)}")
-                    
-                    pythoncom.CoUninitialize()
-                    
-                except Exception as cleanup_error:
-                    self.log_message(f"[ОШИБКА] Очистка ресурсов: {str(cleanup_error)}")
-                    if "RPC_E_CALL_REJECTED" in str(cleanup_error):
-                        self.log_message("[WARNING] Попробуйте перезапустить приложение", status=True)
+    def handle_conversion_canceled(self):
+        self.log_message("Обработка остановлена пользователем", status=True)
 
-        except Exception as outer_error:
-            self.log_message(f"[ОШИБКА] Внешняя ошибка: {str(outer_error)}", status=True)
-            return None
+    def handle_conversion_finished(self):
+        self.set_running(False)
+        self.worker.deleteLater()
+        self.worker = None
 
-    def process_rtf(self, rtf_path):
-        try:
-            with open(rtf_path, 'r', encoding='utf-8') as f:
-                rtf_text = f.read()
-            plain_text = rtf_to_text(rtf_text)
-            data = []
-            for line in plain_text.split('\n'):
-                if '|' in line:
-                    cells = [cell.strip() for cell in line.split('|') if cell.strip()]
-                    for cell in cells:
-                        result = self.process_cell(cell)
-                        if result:
-                            data.append(result)
-                            self.log_message(f"[RTF] Найдено: {result}")
-            return data
-        except Exception as e:
-            self.log_message(f"[ОШИБКА] Обработка RTF: {str(e)}", status=True)
-            return None
+    def closeEvent(self, event):
+        # Word открыт в рабочих потоках: дожидаемся его закрытия, чтобы не оставить процесс.
+        # Если Word не отвечает, окно остаётся открытым и закрывается по завершении потоков
+        if self.close_pending:
+            event.ignore()
+            return
+        timeout = AppConfig.CANCEL_WAIT_TIMEOUT * 1000
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            if not self.worker.wait(timeout):
+                self.postpone_close(event, self.worker.finished)
+                return
+        if self.queue_panel is not None and not self.queue_panel.shutdown(timeout):
+            self.postpone_close(event, self.queue_panel.idle)
+            return
+        super().closeEvent(event)
+
+    def postpone_close(self, event, done_signal):
+        """Оставляет окно открытым до сигнала done_signal о завершении обработки"""
+        event.ignore()
+        self.close_pending = True
+        done_signal.connect(self.resume_close, Qt.ConnectionType.SingleShotConnection)
+        self.log_message("Ожидание остановки обработки: Word не отвечает", status=True)
+        QMessageBox.information(
+            self, "Закрытие",
+            "Обработка ещё не остановилась (Word не отвечает).\n"
+            "Окно закроется автоматически после её завершения."
+        )
 
+    def resume_close(self):
+        self.close_pending = False
+        self.close()
 
     def show_about_dialog(self):
         dialog = QDialog(self)
@@ -1031,8 +2469,27 @@ class FileConverterApp(QMainWindow):
         dialog.exec()
 
 if __name__ == "__main__":
+    report_startup("imports")
     app = QApplication(sys.argv)
+    paths = [os.path.abspath(path) for path in app.arguments()[1:] if os.path.exists(path)]
+
+    # Замер запуска (startup_timing.py) всегда запускает отдельный экземпляр
+    single_instance = not os.environ.get("CONTAB_STARTUP_TIMING")
+    instance_server = None
+    if single_instance:
+        if InstanceServer.forward(paths):
+            sys.exit(0)
+        # Имя занимается до построения окна: экземпляры, запущенные одновременно
+        # (открытие нескольких файлов из проводника), передают пути этому, а пути,
+        # пришедшие до показа окна, обрабатываются после запуска цикла событий
+        instance_server = InstanceServer(app)
+        if not instance_server.listen(paths):
+            sys.exit(0)
+
     app.setStyle("Fusion")
     window = FileConverterApp()
+    if instance_server is not None:
+        instance_server.paths_received.connect(window.open_paths)
     window.show()
+    window.open_paths(paths)
     sys.exit(app.exec())
\ No newline at end of file
@@ -5,7 +5,7 @@ a = Analysis(
     ['contab_v.0.0.3.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('developer_photo.jpg', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -1,39 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
 import xlrd
 from xlrd import open_workbook
 
-def is_valid_data(sheet, row, cols):
-    """Проверяет валидность данных в указанных столбцах"""
-    try:
-        # Проверка целого числа в первом столбце
-        int(sheet.cell_value(row, cols[0]))
-        
-        # Проверка числа с плавающей точкой во втором столбце
-        float(sheet.cell_value(row, cols[1]))
-        
-        return True
-    except (ValueError, TypeError):
-        return False
+# Общие модули проекта (calibration) лежат в корне репозитория
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calibration.numeric import parse_numbers
+
+def parse_columns(sheet, cols):
+    """Разбирает пару столбцов (уровень, вместимость) листа целиком"""
+    if sheet.ncols <= max(cols):
+        return None, None, np.zeros(sheet.nrows, dtype=bool)
+    
+    levels, level_valid = parse_numbers(sheet.col_values(cols[0]), integer=True)
+    capacities, capacity_valid = parse_numbers(sheet.col_values(cols[1]))
+    return levels, capacities, level_valid & capacity_valid
 
 def process_columns(sheet, all_data, left_cols, right_cols):
     """Обрабатывает все строки в указанных столбцах"""
     print(f"\n● Начало обработки столбцов: {left_cols} и {right_cols}")
     
-    for row_idx in range(sheet.nrows):
-        # Обработка левых столбцов (B=1, C=2)
-        if is_valid_data(sheet, row_idx, left_cols):
-            level = int(sheet.cell_value(row_idx, left_cols[0]))
-            capacity = float(sheet.cell_value(row_idx, left_cols[1]))
-            formatted = f"{capacity:.15f}".rstrip('0').rstrip('.')
-            all_data.append((level, formatted))
-            print(f"Обработана строка {row_idx+1} (левые столбцы): {level} ~ {formatted}")
-        
-        # Обработка правых столбцов (F=5, G=6)
-        if is_valid_data(sheet, row_idx, right_cols):
-            level = int(sheet.cell_value(row_idx, right_cols[0]))
-            capacity = float(sheet.cell_value(row_idx, right_cols[1]))
-            formatted = f"{capacity:.15f}".rstrip('0').rstrip('.')
+    left = parse_columns(sheet, left_cols)     # B=1, C=2
+    right = parse_columns(sheet, right_cols)   # F=5, G=6
+    
+    # В каждой строке сначала левые, затем правые столбцы
+    for row_idx in np.flatnonzero(left[2] | right[2]):
+        for (levels, capacities, valid), side in ((left, "левые"), (right, "правые")):
+            if not valid[row_idx]:
+                continue
+            level = int(levels[row_idx])
+            formatted = f"{capacities[row_idx]:.15f}".rstrip('0').rstrip('.')
             all_data.append((level, formatted))
-            print(f"Обработана строка {row_idx+1} (правые столбцы): {level} ~ {formatted}")
+            print(f"Обработана строка {row_idx+1} ({side} столбцы): {level} ~ {formatted}")
 
 def export_data(data, filename):
     """Экспорт данных с удалением дубликатов"""
@@ -0,0 +1,300 @@
+import numpy as np
+import pytesseract
+
+# Размер нормализованного изображения символа (высота, ширина)
+GLYPH_HEIGHT = 24
+GLYPH_WIDTH = 16
+
+# Ширина ячейки символа относительно высоты строки: узкие символы (1, точка)
+# не растягиваются на всю ячейку и остаются отличимыми
+CELL_ASPECT = 0.8
+
+# Символы, для которых строятся шаблоны
+TEMPLATE_CHARS = '0123456789.,'
+
+# Минимальная уверенность Tesseract в слове, чтобы взять его символы как образцы
+MIN_WORD_CONFIDENCE = 90
+
+# Минимальное число образцов каждой цифры для построения шаблона
+MIN_SAMPLES = 3
+
+# Минимальная нормированная корреляция с шаблоном; строка с худшим символом
+# распознаётся Tesseract
+MIN_MATCH_SCORE = 0.75
+
+# Промежуток между символами (в долях высоты строки), после которого ставится пробел
+WORD_GAP = 0.45
+
+# Отрезки длиннее этой доли размера страницы считаются линиями сетки таблицы
+RULE_LENGTH = 0.05
+
+# Минимальные размеры строки и символа в пикселях (всё меньшее - шум)
+MIN_LINE_HEIGHT = 8
+MIN_GLYPH_PIXELS = 6
+
+
+def binarize(image):
+    """Переводит изображение в маску чернил (True - тёмный пиксель) порогом Оцу."""
+    gray = np.asarray(image if image.mode == 'L' else image.convert('L'))
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+
+    weight_bg = np.cumsum(hist)
+    weight_fg = gray.size - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_bg = cum_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+    threshold = np.argmax(weight_bg * weight_fg * (mean_bg - mean_fg) ** 2)
+    return gray <= threshold
+
+
+def _run_lengths(mask, axis):
+    """Длина непрерывного отрезка вдоль оси, которому принадлежит каждый пиксель маски."""
+    def forward(m):
+        counts = np.cumsum(m, axis=axis, dtype=np.int32)
+        resets = np.maximum.accumulate(np.where(m, 0, counts), axis=axis)
+        return counts - resets
+
+    fwd = forward(mask)
+    bwd = np.flip(forward(np.flip(mask, axis=axis)), axis=axis)
+    return np.where(mask, fwd + bwd - 1, 0)
+
+
+def remove_rules(ink):
+    """Убирает длинные горизонтальные и вертикальные линии сетки таблицы."""
+    height, width = ink.shape
+    vertical = _run_lengths(ink, 0) > RULE_LENGTH * height
+    horizontal = _run_lengths(ink, 1) > RULE_LENGTH * width
+    return ink & ~vertical & ~horizontal
+
+
+def _runs(profile, min_gap=1):
+    """
+    Находит непрерывные участки profile > 0.
+
+    Returns:
+        tuple: массивы начал и концов (не включая) участков; участки,
+        разделённые промежутком короче min_gap, склеиваются.
+    """
+    filled = np.concatenate(([False], profile > 0, [False]))
+    edges = np.flatnonzero(filled[1:] != filled[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    if min_gap > 1 and len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) >= min_gap
+        starts = np.concatenate((starts[:1], starts[1:][keep]))
+        ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+    return starts, ends
+
+
+def segment_lines(ink):
+    """Делит страницу на строки по горизонтальной проекции. Возвращает массив (N, 2) [y0, y1)."""
+    starts, ends = _runs(ink.sum(axis=1), min_gap=2)
+    keep = (ends - starts) >= MIN_LINE_HEIGHT
+    return np.stack((starts[keep], ends[keep]), axis=1)
+
+
+def segment_glyphs(ink, y0, y1, x0=0, x1=None):
+    """
+    Делит участок строки на символы по вертикальной проекции.
+
+    Returns:
+        numpy.ndarray: Массив (N, 4) [x0, x1, y0, y1] символов в координатах страницы.
+    """
+    strip = ink[y0:y1, x0:x1]
+    profile = strip.sum(axis=0)
+    starts, ends = _runs(profile)
+    if len(starts):
+        pixels = np.add.reduceat(profile, starts)
+        keep = pixels >= MIN_GLYPH_PIXELS
+        starts, ends = starts[keep], ends[keep]
+    boxes = np.empty((len(starts), 4), dtype=np.int64)
+    boxes[:, 0] = starts + x0
+    boxes[:, 1] = ends + x0
+    boxes[:, 2] = y0
+    boxes[:, 3] = y1
+    return boxes
+
+
+def sample_glyphs(ink, boxes):
+    """
+    Приводит все символы к сетке GLYPH_HEIGHT x GLYPH_WIDTH одной векторной выборкой.
+
+    По вертикали символ занимает всю высоту строки (так точка и запятая остаются
+    у базовой линии), по горизонтали - ячейку фиксированной ширины с центром в символе.
+
+    Returns:
+        numpy.ndarray: Массив (N, GLYPH_HEIGHT * GLYPH_WIDTH) float32.
+    """
+    if not len(boxes):
+        return np.empty((0, GLYPH_HEIGHT * GLYPH_WIDTH), dtype=np.float32)
+
+    x0, x1, y0, y1 = (boxes[:, i].astype(np.float64) for i in range(4))
+    height = y1 - y0
+    cell = height * CELL_ASPECT
+    left = (x0 + x1) / 2 - cell / 2
+
+    rows = (y0[:, None] + (np.arange(GLYPH_HEIGHT) + 0.5) * (height[:, None] / GLYPH_HEIGHT)).astype(np.int64)
+    cols = np.floor(left[:, None] + (np.arange(GLYPH_WIDTH) + 0.5) * (cell[:, None] / GLYPH_WIDTH)).astype(np.int64)
+    # Столбцы вне самого символа (соседи, поля страницы) считаются пустыми
+    own = (cols >= boxes[:, 0:1]) & (cols < boxes[:, 1:2])
+    cols = np.clip(cols, 0, ink.shape[1] - 1)
+
+    samples = ink[rows[:, :, None], cols[:, None, :]] & own[:, None, :]
+    return samples.reshape(len(boxes), -1).astype(np.float32)
+
+
+def page_text(data):
+    """
+    Собирает текст страницы из результата pytesseract.image_to_data.
+
+    Слова одной строки разделяются одним пробелом, строки - переводом строки,
+    как в pytesseract.image_to_string.
+    """
+    lines = {}
+    for text, block, par, line in zip(data['text'], data['block_num'], data['par_num'], data['line_num']):
+        text = text.strip()
+        if text:
+            lines.setdefault((block, par, line), []).append(text)
+    return '\n'.join(' '.join(words) for words in lines.values())
+
+
+def _unit_rows(vectors):
+    """Центрирует и нормирует строки матрицы для нормированной корреляции."""
+    centered = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return centered / np.maximum(norms, 1e-6)
+
+
+class DigitRecognizer:
+    """
+    Распознаватель цифровых строк таблицы по шаблонам символов.
+
+    Шаблоны строятся по символам, уверенно распознанным Tesseract на первых страницах
+    документа (таблицы напечатаны одним-двумя шрифтами). Дальше строки страницы
+    классифицируются одной матричной операцией, а строки с плохо совпавшими
+    символами (заголовки, помарки, слипшиеся цифры) распознаются Tesseract.
+    """
+
+    def __init__(self, lang='rus', min_score=MIN_MATCH_SCORE):
+        self.lang = lang
+        self.min_score = min_score
+        self._sums = {}
+        self._counts = {}
+        self.templates = None
+        self.template_chars = ''
+        self.stats = {'lines': 0, 'fallback_lines': 0, 'glyphs': 0}
+
+    @property
+    def ready(self):
+        return self.templates is not None
+
+    def learn(self, image, data=None):
+        """
+        Добавляет образцы символов со страницы, уже распознанной Tesseract.
+
+        Args:
+            image (PIL.Image.Image): Изображение страницы.
+            data (dict | None): Результат pytesseract.image_to_data для этого изображения;
+                если не передан, страница распознаётся заново.
+
+        Returns:
+            bool: Готовы ли шаблоны для распознавания.
+        """
+        ink = remove_rules(binarize(image))
+        lines = segment_lines(ink)
+        if not len(lines):
+            return self.ready
+
+        if data is None:
+            data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+        boxes, labels = [], []
+        for text, conf, left, top, width, height in zip(
+                data['text'], data['conf'], data['left'], data['top'], data['width'], data['height']):
+            text = text.strip()
+            if not text or float(conf) < MIN_WORD_CONFIDENCE or any(ch not in TEMPLATE_CHARS for ch in text):
+                continue
+
+            line_index = np.searchsorted(lines[:, 0], top + height / 2, side='right') - 1
+            if line_index < 0 or top + height / 2 >= lines[line_index, 1]:
+                continue
+            y0, y1 = lines[line_index]
+            glyphs = segment_glyphs(ink, y0, y1, left, left + width)
+            if len(glyphs) != len(text):
+                continue
+            boxes.append(glyphs)
+            labels.extend(text)
+
+        if boxes:
+            samples = sample_glyphs(ink, np.concatenate(boxes))
+            labels = np.array(labels)
+            for ch in np.unique(labels):
+                selected = samples[labels == ch]
+                self._sums[ch] = self._sums.get(ch, 0) + selected.sum(axis=0)
+                self._counts[ch] = self._counts.get(ch, 0) + len(selected)
+
+        self._build_templates()
+        return self.ready
+
+    def _build_templates(self):
+        if any(self._counts.get(ch, 0) < MIN_SAMPLES for ch in '0123456789'):
+            return
+        chars = [ch for ch in TEMPLATE_CHARS if self._counts.get(ch, 0)]
+        templates = np.stack([self._sums[ch] / self._counts[ch] for ch in chars])
+        self.template_chars = ''.join(chars)
+        self.templates = _unit_rows(templates)
+
+    def recognize(self, image):
+        """
+        Распознаёт страницу: цифровые строки - по шаблонам, остальные - Tesseract.
+
+        Пробелы ставятся по промежуткам между символами, поэтому их число и положение
+        слов в строке не совпадают с текстом Tesseract: столбцы разбираются по словам,
+        а не по позициям символов.
+
+        Returns:
+            str: Текст страницы построчно, как у pytesseract.image_to_string.
+        """
+        ink = remove_rules(binarize(image))
+        lines = segment_lines(ink)
+        if not len(lines):
+            return ''
+
+        line_boxes = [segment_glyphs(ink, y0, y1) for y0, y1 in lines]
+        counts = np.array([len(b) for b in line_boxes])
+        boxes = np.concatenate(line_boxes) if counts.sum() else np.empty((0, 4), dtype=np.int64)
+
+        scores = _unit_rows(sample_glyphs(ink, boxes)) @ self.templates.T
+        best = scores.argmax(axis=1) if len(boxes) else np.empty(0, dtype=np.int64)
+        confident = scores.max(axis=1) >= self.min_score if len(boxes) else np.empty(0, dtype=bool)
+        chars = np.array(list(self.template_chars))[best]
+
+        text_lines = []
+        offset = 0
+        for (y0, y1), glyphs, count in zip(lines, line_boxes, counts):
+            line_chars = chars[offset:offset + count]
+            line_ok = confident[offset:offset + count].all()
+            offset += count
+            if not count:
+                continue
+
+            self.stats['lines'] += 1
+            if line_ok:
+                self.stats['glyphs'] += int(count)
+                gaps = glyphs[1:, 0] - glyphs[:-1, 1]
+                parts = [line_chars[0]]
+                for ch, gap in zip(line_chars[1:], gaps):
+                    if gap > WORD_GAP * (y1 - y0):
+                        parts.append(' ')
+                    parts.append(ch)
+                text_lines.append(''.join(parts))
+            else:
+                self.stats['fallback_lines'] += 1
+                text_lines.append(self._tesseract_line(image, y0, y1))
+
+        return '\n'.join(text_lines)
+
+    def _tesseract_line(self, image, y0, y1):
+        """Распознаёт одну строку Tesseract (режим одной строки текста)."""
+        pad = max((y1 - y0) // 4, 2)
+        strip = image.crop((0, max(int(y0) - pad, 0), image.width, min(int(y1) + pad, image.height)))
+        return pytesseract.image_to_string(strip, lang=self.lang, config='--psm 7').strip()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Файл кэша распознавания по умолчанию
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.contab', 'ocr_cache.sqlite')
+
+# Максимальный объём сохранённого текста, после которого вытесняются давно не использованные записи
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def image_cache_key(image, engine, settings=None):
+    """
+    Строит ключ кэша по содержимому изображения и параметрам распознавания.
+
+    Хэшируются пиксели в полутонах вместе с размером, поэтому одинаковые страницы
+    из разных PDF дают один и тот же ключ, а смена версии движка или настроек - другой.
+
+    Args:
+        image (PIL.Image.Image): Изображение, которое передаётся в OCR.
+        engine (str): Идентификатор движка с версией, например 'tesseract-5.3.0'.
+        settings (dict | None): Настройки распознавания (язык, конфигурация ...).
+
+    Returns:
+        str: Шестнадцатеричный SHA-256.
+    """
+    gray = image if image.mode == 'L' else image.convert('L')
+    digest = hashlib.sha256()
+    digest.update(f"{gray.width}x{gray.height}:".encode('ascii'))
+    digest.update(gray.tobytes())
+    digest.update(engine.encode('utf-8'))
+    digest.update(json.dumps(settings or {}, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """
+    Постоянный кэш результатов OCR в SQLite с ограничением размера.
+
+    При превышении max_bytes удаляются записи, которые дольше всего не запрашивались (LRU).
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_last_used ON ocr_cache (last_used)")
+        self.connection.commit()
+
+    def get(self, key):
+        """Возвращает сохранённый текст или None и отмечает запись как использованную."""
+        row = self.connection.execute(
+            "SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute(
+                "UPDATE ocr_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key, text):
+        """Сохраняет результат распознавания и при необходимости вытесняет старые записи."""
+        size = len(text.encode('utf-8'))
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time()))
+            self._evict()
+
+    def _evict(self):
+        total = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale_keys = []
+        for key, size in self.connection.execute(
+                "SELECT key, size FROM ocr_cache ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM ocr_cache WHERE key = ?", stale_keys)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
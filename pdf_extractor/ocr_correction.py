@@ -0,0 +1,273 @@
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from calibration.numeric import infer_decimals
+
+# Относительный допуск расхождения приращения вместимости с ожидаемым
+RELATIVE_TOLERANCE = 0.02
+
+# Без столбца коэффициентов строка считается подозрительной, если её вторая разность
+# (отклонение от интерполяции по соседям) отличается от вторых разностей через строку
+# больше, чем на столько типичных отличий. Сравнение с соседними вторыми разностями,
+# а не с общей медианой, не даёт отмечать правильные строки на изгибах кривой (концы
+# таблицы горизонтального цилиндра). Такие строки только отмечаются, но не исправляются
+SMOOTHNESS_FACTOR = 5.0
+
+# Допуск на округление вместимостей, в единицах последнего знака: округление трёх строк
+# сдвигает вторую разность, а её сравнение с соседними складывает три таких сдвига
+SMOOTHNESS_ROUNDING = 2.0
+
+
+class Correction(NamedTuple):
+    index: int
+    field: str  # 'level' или 'volume'
+    old: float
+    new: float
+
+
+class CorrectionResult(NamedTuple):
+    levels: np.ndarray
+    volumes: np.ndarray
+    corrections: List[Correction]
+    unresolved: np.ndarray  # индексы строк, нарушающих ограничения, которые не удалось исправить
+
+
+def single_digit_candidates(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Все значения, отличающиеся от исходных ровно одной цифрой.
+
+    Returns:
+        numpy.ndarray: Массив (N, число разрядов, 10) кандидатов.
+    """
+    scale = 10 ** decimals
+    integers = np.round(np.abs(values) * scale).astype(np.int64)
+    digits_count = max(int(np.log10(max(integers.max(initial=1), 1))) + 1, decimals + 1)
+    powers = 10 ** np.arange(digits_count, dtype=np.int64)
+
+    digits = (integers[:, None] // powers[None, :]) % 10
+    replacements = np.arange(10, dtype=np.int64)
+    candidates = integers[:, None, None] + (replacements[None, None, :] - digits[:, :, None]) * powers[None, :, None]
+    return np.sign(values)[:, None, None] * candidates / scale
+
+
+def _best_candidate(values, targets, tolerances, decimals):
+    """Выбирает однозначную замену, ближайшую к целевому значению, если она укладывается в допуск."""
+    candidates = single_digit_candidates(values, decimals).reshape(len(values), -1)
+    errors = np.abs(candidates - targets[:, None])
+    best = errors.argmin(axis=1)
+    chosen = candidates[np.arange(len(values)), best]
+    accepted = (errors[np.arange(len(values)), best] <= tolerances) & (chosen != values)
+    return chosen, accepted
+
+
+def _increment_expectation(levels, volumes, increments):
+    """
+    Ожидаемые приращения вместимости по столбцу коэффициентов.
+
+    Масштаб коэффициента (м3/мм или м3/см) и строка, к которой он относится
+    (текущая или следующая), определяются по медиане отношений.
+    """
+    delta_level = np.diff(levels).astype(np.float64)
+    delta_volume = np.diff(volumes)
+    best = None
+    for aligned in (increments[:-1], increments[1:]):
+        expected = delta_level * aligned
+        valid = np.isfinite(expected) & (expected > 0)
+        if valid.sum() < 3:
+            continue
+        ratios = delta_volume[valid] / expected[valid]
+        ratios = ratios[ratios > 0]
+        if not len(ratios):
+            continue
+        scale = 10.0 ** np.round(np.log10(np.median(ratios)))
+        spread = np.median(np.abs(ratios / scale - 1))
+        if best is None or spread < best[0]:
+            best = (spread, expected * scale)
+    return None if best is None else best[1]
+
+
+def _correct_levels(levels, corrections):
+    """Исправляет уровень, выпадающий из равномерного шага, если соседи согласованы и отличие в одной цифре."""
+    if len(levels) < 3:
+        return levels
+    diffs = np.diff(levels)
+    values, counts = np.unique(diffs, return_counts=True)
+    step = values[counts.argmax()]
+
+    inner = np.arange(1, len(levels) - 1)
+    expected = levels[inner - 1] + step
+    suspect = (levels[inner] != expected) & (levels[inner + 1] - levels[inner - 1] == 2 * step)
+    if not suspect.any():
+        return levels
+
+    indices = inner[suspect]
+    chosen, accepted = _best_candidate(levels[indices].astype(np.float64), expected[suspect].astype(np.float64),
+                                       np.full(len(indices), 0.5), 0)
+    levels = levels.copy()
+    for index, new in zip(indices[accepted], chosen[accepted]):
+        corrections.append(Correction(int(index), 'level', float(levels[index]), float(new)))
+        levels[index] = int(new)
+    return levels
+
+
+def _smoothness_suspects(levels, volumes, unit):
+    """
+    Строки (кроме первой и последней), выбивающиеся из гладкой кривой.
+
+    Вторая разность - отклонение строки от линейной интерполяции по соседним уровням.
+    Ошибка e в строке i сдвигает вторые разности строк i-1, i, i+1, но не i-2 и i+2,
+    поэтому вторая разность строки сравнивается с их средним: на гладкой кривой они
+    почти совпадают даже там, где кривизна велика. У второй и предпоследней строк
+    соседняя вторая разность есть только с одной стороны; там порог увеличивается на
+    её величину, так как кривизна у концов таблицы меняется быстрее всего.
+
+    Returns:
+        numpy.ndarray: Булева маска длины n - 2 для строк 1..n-2.
+    """
+    span = (levels[2:] - levels[:-2]).astype(np.float64)
+    weight = np.divide(levels[1:-1] - levels[:-2], span, out=np.full(len(span), 0.5), where=span != 0)
+    second = volumes[1:-1] - (volumes[:-2] + (volumes[2:] - volumes[:-2]) * weight)
+    m = len(second)
+    if m < 5:
+        return np.zeros(m, dtype=bool)
+
+    predicted = np.empty(m)
+    predicted[2:-2] = (second[:-4] + second[4:]) / 2
+    predicted[:2] = second[2:4]
+    predicted[-2:] = second[-4:-2]
+    residual = np.abs(second - predicted)
+
+    limit = np.full(m, SMOOTHNESS_FACTOR * np.median(residual[2:-2]) + SMOOTHNESS_ROUNDING * unit)
+    limit[:2] += np.abs(predicted[:2])
+    limit[-2:] += np.abs(predicted[-2:])
+
+    # Ошибка сдвигает и остатки строк i-2, i+2 (на половину), поэтому строка отмечается,
+    # только если её остаток наибольший в окне из пяти строк
+    padded = np.concatenate(([0.0, 0.0], residual, [0.0, 0.0]))
+    local_max = residual >= sliding_window_view(padded, 5).max(axis=1)
+    return (residual > limit) & local_max
+
+
+def correct_table(levels: Sequence[int], volumes: Sequence[float],
+                  increments: Optional[Sequence[float]] = None,
+                  decimals: Optional[int] = None) -> CorrectionResult:
+    """
+    Исправляет одиночные ошибки распознавания цифр в блоке градуировочной таблицы.
+
+    Ограничения: уровни идут с постоянным шагом, вместимости строго возрастают и,
+    если есть столбец коэффициентов, volume[i+1] - volume[i] совпадает с приращением
+    по коэффициенту. Для строки, нарушающей ограничения с обеих сторон, перебираются
+    все замены одной цифры и выбирается та, что им удовлетворяет.
+
+    Вместимости исправляются только по столбцу коэффициентов; без него строки,
+    выбивающиеся из гладкой кривой, лишь попадают в unresolved. Первая и последняя
+    строки не исправляются никогда (у них только один сосед).
+
+    Args:
+        levels: Уровни в порядке строк таблицы.
+        volumes: Вместимости в том же порядке.
+        increments: Столбец коэффициентов (NaN там, где его нет) или None.
+        decimals: Число знаков после запятой у вместимостей; по умолчанию определяется по данным.
+
+    Returns:
+        CorrectionResult: Исправленные массивы, список исправлений и неисправленные строки.
+    """
+    levels = np.asarray(levels, dtype=np.int64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    corrections: List[Correction] = []
+    n = len(volumes)
+    if n < 3:
+        return CorrectionResult(levels, volumes, corrections, np.empty(0, dtype=np.int64))
+
+    if decimals is None:
+        decimals = infer_decimals(volumes)
+    unit = 10.0 ** -decimals
+
+    levels = _correct_levels(levels, corrections)
+
+    expected = None
+    if increments is not None:
+        expected = _increment_expectation(levels, volumes, np.asarray(increments, dtype=np.float64))
+
+    targets = np.full(n, np.nan)
+    tolerance = np.full(n, np.inf)
+    suspect = np.zeros(n, dtype=bool)
+
+    if expected is not None:
+        # Ошибка в строке i нарушает сразу два шага: (i-1, i) и (i, i+1)
+        tolerance_step = np.abs(expected) * RELATIVE_TOLERANCE + 1.5 * unit
+        bad_step = ~(np.abs(np.diff(volumes) - expected) <= tolerance_step)
+        suspect[1:-1] = bad_step[:-1] & bad_step[1:]
+        suspect[0] = bad_step[0] and not bad_step[1]
+        suspect[-1] = bad_step[-1] and not bad_step[-2]
+        editable = suspect.copy()
+        editable[[0, -1]] = False
+
+        from_prev = np.full(n, np.nan)
+        from_next = np.full(n, np.nan)
+        from_prev[1:] = volumes[:-1] + expected
+        from_next[:-1] = volumes[1:] - expected
+        targets = np.where(np.isnan(from_prev), from_next,
+                           np.where(np.isnan(from_next), from_prev, (from_prev + from_next) / 2))
+        tolerance[1:] = tolerance_step
+        tolerance[:-1] = np.minimum(tolerance[:-1], tolerance_step)
+    else:
+        suspect[1:-1] = _smoothness_suspects(levels, volumes, unit)
+        editable = np.zeros(n, dtype=bool)
+
+    indices = np.flatnonzero(editable & np.isfinite(targets))
+    unresolved = np.flatnonzero(suspect & ~editable)
+    if len(indices):
+        chosen, accepted = _best_candidate(volumes[indices], targets[indices], tolerance[indices], decimals)
+        volumes = volumes.copy()
+        for index, new in zip(indices[accepted], chosen[accepted]):
+            corrections.append(Correction(int(index), 'volume', float(volumes[index]), float(new)))
+            volumes[index] = round(new, decimals)
+        unresolved = np.union1d(unresolved, indices[~accepted])
+
+    non_monotonic = np.flatnonzero(np.diff(volumes) <= 0) + 1
+    unresolved = np.union1d(unresolved, non_monotonic)
+    return CorrectionResult(levels, volumes, corrections, unresolved)
+
+
+def correct_pairs(pairs: Sequence[Tuple[object, float]], increments: Optional[Sequence[float]] = None
+                  ) -> Tuple[List[Tuple[object, float]], List[Correction], List[int]]:
+    """
+    Исправляет список пар (уровень, вместимость) в порядке строк таблицы.
+
+    Пары с нецелым уровнем (например, неверно распознанным текстом) не участвуют
+    в проверке и возвращаются без изменений.
+
+    Returns:
+        tuple: (пары, исправления, позиции подозрительных пар, оставленных без изменений).
+    """
+    positions, levels, volumes, selected_increments = [], [], [], []
+    for position, (level, volume) in enumerate(pairs):
+        try:
+            level = int(level)
+        except (ValueError, TypeError):
+            continue
+        positions.append(position)
+        levels.append(level)
+        volumes.append(volume)
+        if increments is not None:
+            selected_increments.append(increments[position])
+
+    result = correct_table(levels, volumes, selected_increments if increments is not None else None)
+    unresolved = [positions[index] for index in result.unresolved.tolist()]
+    if not result.corrections:
+        return list(pairs), [], unresolved
+
+    corrected = list(pairs)
+    for correction in result.corrections:
+        position = positions[correction.index]
+        level, volume = corrected[position]
+        if correction.field == 'level':
+            level = str(int(correction.new)) if isinstance(level, str) else int(correction.new)
+        else:
+            volume = correction.new
+        corrected[position] = (level, volume)
+    return (corrected, [correction._replace(index=positions[correction.index]) for correction in result.corrections],
+            unresolved)
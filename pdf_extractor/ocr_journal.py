@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+
+# Каталог журналов распознавания по умолчанию
+JOURNAL_DIR = os.path.join(os.path.expanduser('~'), '.contab', 'ocr_journal')
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Считает SHA-256 содержимого файла, читая его блоками."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OcrJournal:
+    """
+    Журнал контрольных точек распознавания одного PDF.
+
+    Журнал хранится в формате JSON Lines: одна строка на каждую распознанную страницу
+    с её номером и извлечёнными строками таблицы. Имя файла - хэш содержимого PDF
+    вместе с настройками распознавания, поэтому изменённый файл или другие настройки
+    начинают распознавание заново.
+    """
+
+    def __init__(self, pdf_path, settings=None, journal_dir=JOURNAL_DIR):
+        """
+        Args:
+            pdf_path (str): Путь к PDF файлу.
+            settings (dict | None): Настройки распознавания, влияющие на результат (dpi, язык ...).
+            journal_dir (str): Каталог для хранения журналов.
+        """
+        key = hashlib.sha256(file_sha256(pdf_path).encode('ascii'))
+        key.update(json.dumps(settings or {}, sort_keys=True).encode('utf-8'))
+
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.join(journal_dir, f"{key.hexdigest()}.jsonl")
+        self.pages = self._load()
+        self._file = None
+
+    def _load(self):
+        """Читает завершённые страницы, отбрасывая недописанную последнюю строку после сбоя."""
+        pages = {}
+        if not os.path.exists(self.path):
+            return pages
+
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            complete = content.rfind(b'\n') + 1
+            if complete < len(content):
+                f.truncate(complete)
+
+        for line in content[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+                pages[entry['page']] = [tuple(row) for row in entry['rows']]
+            except (ValueError, KeyError, TypeError):
+                continue
+        return pages
+
+    def __contains__(self, page_num):
+        return page_num in self.pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def rows(self, page_num):
+        """Возвращает сохранённые строки страницы."""
+        return self.pages[page_num]
+
+    def first_unfinished(self, page_count):
+        """Номер первой нераспознанной страницы или None, если распознаны все."""
+        for page_num in range(page_count):
+            if page_num not in self.pages:
+                return page_num
+        return None
+
+    def record(self, page_num, rows):
+        """Сохраняет результат страницы и сразу сбрасывает его на диск."""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        entry = {'page': page_num, 'rows': [list(row) for row in rows]}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.pages[page_num] = [tuple(row) for row in rows]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Удаляет журнал после успешного завершения обработки."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
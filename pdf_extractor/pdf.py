@@ -4,86 +4,258 @@ import pytesseract  # Для OCR
 from PIL import Image  # Для работы с изображениями из PDF
 import io  # Для работы с байтами
 import re
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+# Общие модули проекта (calibration) лежат в корне репозитория
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calibration.numeric import parse_numbers
+from calibration.table import CalibrationTable
+from calibration.validation import validate_table
+from calibration.geometry import fit_geometry
+
+from pdf_images import extract_page_image
+from pdf_render import DEFAULT_DPI, available_backends, open_backend, iter_pages
+from ocr_journal import OcrJournal
+from ocr_cache import OcrCache, image_cache_key
+from digit_recognizer import DigitRecognizer, page_text
+from ocr_correction import correct_pairs
 
 # Укажите путь к исполняемому файлу Tesseract OCR (если он не в системном PATH)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def extract_data_from_scanned_pdf(pdf_path, output_txt_path):
+# Язык распознавания Tesseract
+OCR_LANG = 'rus'
+
+
+def tesseract_engine_id():
+    """Идентификатор движка OCR с версией - часть ключа кэша распознавания."""
+    return f"tesseract-{pytesseract.get_tesseract_version()}"
+
+
+def ocr_image(img, cache=None, engine=None):
     """
-    Извлекает данные из отсканированного PDF, содержащего таблицы со столбцами "Уровень наполнения" и "Вместимость",
-    используя OCR для распознавания текста, сохраняет данные в формате "Уровень наполнения~Вместимость" в текстовый файл.
+    Распознаёт изображение страницы, используя кэш результатов, если он передан.
 
     Args:
-        pdf_path (str): Путь к PDF файлу.
-        output_txt_path (str): Путь к выходному текстовому файлу.
+        img (PIL.Image.Image): Изображение страницы.
+        cache (OcrCache | None): Кэш распознавания.
+        engine (str | None): Идентификатор движка (см. tesseract_engine_id).
+
+    Returns:
+        str: Распознанный текст.
     """
+    if cache is None:
+        return pytesseract.image_to_string(img, lang=OCR_LANG) # 'rus' - русский язык, может потребоваться другой
+
+    key = image_cache_key(img, engine or tesseract_engine_id(), {'lang': OCR_LANG})
+    text = cache.get(key)
+    if text is None:
+        text = pytesseract.image_to_string(img, lang=OCR_LANG)
+        cache.put(key, text)
+    return text
+
+
+def parse_ocr_text(text, page_num):
+    """
+    Разбирает распознанный текст страницы и возвращает строки таблицы.
+
+    Args:
+        text (str): Текст, полученный OCR.
+        page_num (int): Номер страницы (с нуля) для сообщений.
+
+    Returns:
+        list: Пары (уровень, вместимость) или пустой список, если заголовки не найдены.
+    """
+    # Разбиваем текст на строки и пытаемся найти строки, содержащие данные
+    lines = text.splitlines()
+    level_word_index = None
+    header_found = False
+
+    # Ищем заголовки и определяем, сколько столбцов стоит перед уровнем
+    for i, line in enumerate(lines):
+        level_match = re.search(r'(?i)уровень\s+наполнения', line)
+        if level_match and re.search(r'(?i)вместимость', line):
+            # Число пробелов зависит от распознавателя (Tesseract или шаблоны цифр),
+            # поэтому столбцы разбираются по словам, а не по позициям символов
+            level_word_index = len(line[:level_match.start()].split())
+            header_found = True
+            break  # Заголовки найдены, можно начинать обработку данных
+
+    if not header_found:
+        print(f"Не удалось найти заголовки 'Уровень наполнения' и 'Вместимость' на странице {page_num + 1}. Пропускаем страницу.")
+        return []
+
+    # Извлекаем данные: слово в столбце уровня, за ним - вместимость
+    # (она может содержать пробелы между разрядами)
+    data_lines = [line.strip() for line in lines[i + 1:]]  # Начинаем с первой строки после заголовков
+    data_lines = [line for line in data_lines if line]  # Пропускаем пустые строки
+    words = [line.split() for line in data_lines]
+    levels = [w[level_word_index] if len(w) > level_word_index else '' for w in words]
+    capacities, valid = parse_numbers([' '.join(w[level_word_index + 1:]) for w in words], ocr=True)
 
-    all_extracted_data = []
+    rows = []
+    for line, level, capacity, ok in zip(data_lines, levels, capacities, valid):
+        if not ok:
+            print(f"Ошибка при обработке строки '{line}' на странице {page_num + 1}: вместимость не является числом")
+            continue
+        rows.append((level, float(capacity)))
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            print(f"Обработка страницы {page_num + 1}/{len(pdf.pages)}")
+    return rows
 
-            # 1. Преобразуем страницу в изображение
-            image = page.to_image()
-            img = image.original  # Получаем PIL Image
+
+def iter_scanned_rows(pdf_path, dpi=DEFAULT_DPI, render_backend=None, journal=None, cache=None,
+                      digit_recognizer=None):
+    """
+    Постранично распознаёт отсканированный PDF.
+
+    Изображение и объекты страницы освобождаются сразу после её обработки, поэтому
+    в памяти не копятся изображения и разобранное содержимое страниц. Кэш объектов
+    pdfminer на уровне документа (словари и потоки PDF) при этом сохраняется и растёт
+    с числом прочитанных страниц, хотя и намного медленнее. Если передан журнал, уже распознанные
+    страницы берутся из него, а результат каждой новой страницы сразу записывается в журнал.
+    Если передан кэш, страницы с уже распознанным ранее изображением повторно не распознаются.
+    Если передан распознаватель цифр, он обучается на первых страницах, распознанных Tesseract,
+    а остальные страницы распознаёт сам.
+
+    Yields:
+        tuple: (номер страницы с нуля, количество страниц, список пар (уровень, вместимость)).
+    """
+    engine = tesseract_engine_id() if cache is not None else None
+
+    with pdfplumber.open(pdf_path) as pdf, ExitStack() as stack:
+        # Средство отрисовки открывает документ повторно, поэтому оно открывается только
+        # для первой страницы без встроенного скана
+        renderer = None
+        page_count = len(pdf.pages)
+        if journal is not None and len(journal):
+            resume_from = journal.first_unfinished(page_count)
+            if resume_from is not None:
+                print(f"Продолжение распознавания со страницы {resume_from + 1}/{page_count}")
+
+        for page_num, page in iter_pages(pdf):
+            if journal is not None and page_num in journal:
+                yield page_num, page_count, journal.rows(page_num)
+                continue
+
+            print(f"Обработка страницы {page_num + 1}/{page_count}")
+
+            # 1. Берём встроенное изображение скана в исходном разрешении,
+            #    а если страница не является сканом - отрисовываем её в полутонах
+            img = extract_page_image(page)
+            if img is None:
+                if renderer is None:
+                    renderer = stack.enter_context(open_backend(pdf_path, render_backend))
+                img = renderer.render_page(page_num, dpi=dpi)
 
             # 2. Применяем OCR для извлечения текста из изображения
             try:
-                text = pytesseract.image_to_string(img, lang='rus') # 'rus' - русский язык, может потребоваться другой
+                if digit_recognizer is not None and digit_recognizer.ready:
+                    text = digit_recognizer.recognize(img)
+                elif digit_recognizer is not None:
+                    # Один проход Tesseract даёт и текст страницы, и образцы символов для шаблонов
+                    data = pytesseract.image_to_data(img, lang=OCR_LANG, output_type=pytesseract.Output.DICT)
+                    text = page_text(data)
+                    if digit_recognizer.learn(img, data):
+                        print(f"Шаблоны цифр построены по странице {page_num + 1}")
+                else:
+                    text = ocr_image(img, cache, engine)
             except Exception as e:
                 print(f"Ошибка OCR на странице {page_num + 1}: {e}")
                 continue  # Переходим к следующей странице в случае ошибки OCR
 
-            # 3. Разбиваем текст на строки и пытаемся найти строки, содержащие данные
-            lines = text.splitlines()
-            level_col_index = None
-            capacity_col_index = None
-            header_found = False
-
-            # Ищем заголовки и определяем индексы столбцов
-            for i, line in enumerate(lines):
-                if re.search(r'(?i)уровень\s+наполнения', line) and re.search(r'(?i)вместимость', line):
-                    # Предполагаем, что заголовки разделены пробелами или другими символами
-                    header_line = line.lower()
-                    level_col_index = header_line.find("уровень наполнения")
-                    capacity_col_index = header_line.find("вместимость")
-                    header_found = True
-                    break  # Заголовки найдены, можно начинать обработку данных
-
-            if not header_found:
-                print(f"Не удалось найти заголовки 'Уровень наполнения' и 'Вместимость' на странице {page_num + 1}. Пропускаем страницу.")
-                continue
+            # 3. Разбираем текст, исправляем одиночные ошибки цифр по шагу уровней
+            #    и отмечаем подозрительные строки; затем отмечаем страницу в журнале
+            #    и передаём строки дальше
+            rows, corrections, unresolved = correct_pairs(parse_ocr_text(text, page_num))
+            for correction in corrections:
+                print(f"Исправлено на странице {page_num + 1}: {correction.old:g} -> {correction.new:g}")
+            for position in unresolved:
+                level, capacity = rows[position]
+                print(f"[ВНИМАНИЕ] Страница {page_num + 1}: проверьте строку {level}~{capacity:g}")
+            if journal is not None:
+                journal.record(page_num, rows)
+            yield page_num, page_count, rows
+
+
+def extract_data_from_scanned_pdf(pdf_path, output_txt_path, dpi=DEFAULT_DPI, render_backend=None, resume=True,
+                                  use_cache=True, use_digit_recognizer=False, expected_capacity=None):
+    """
+    Извлекает данные из отсканированного PDF, содержащего таблицы со столбцами "Уровень наполнения" и "Вместимость",
+    используя OCR для распознавания текста, сохраняет данные в формате "Уровень наполнения~Вместимость" в текстовый файл.
+
+    Строки записываются в файл по мере распознавания страниц. Распознанные страницы
+    отмечаются в журнале, поэтому после сбоя повторный запуск продолжает с первой
+    нераспознанной страницы; после успешного завершения журнал удаляется.
+
+    Args:
+        pdf_path (str): Путь к PDF файлу.
+        output_txt_path (str): Путь к выходному текстовому файлу.
+        dpi (int): Разрешение отрисовки страниц, которые не удалось взять как встроенное изображение.
+        render_backend (str | None): Средство отрисовки ('pdfium', 'pdfplumber'); по умолчанию - самое быстрое.
+        resume (bool): Использовать журнал контрольных точек для продолжения прерванной обработки.
+        use_cache (bool): Использовать постоянный кэш результатов OCR по содержимому изображения.
+        use_digit_recognizer (bool): Распознавать цифровые строки по шаблонам шрифта документа
+            вместо полного OCR каждой страницы.
+        expected_capacity (float | None): Номинальная вместимость резервуара, м3, для сверки
+            с верхней строкой таблицы.
+    """
 
-            # Извлекаем данные
-            for line in lines[i + 1:]:  # Начинаем с первой строки после заголовков
-                line = line.strip()
-                if not line:
-                    continue  # Пропускаем пустые строки
+    rows_written = 0
+    cache = OcrCache() if use_cache else None
+    recognizer = DigitRecognizer(lang=OCR_LANG) if use_digit_recognizer else None
+    # Средство отрисовки и распознаватель меняют результат, поэтому входят в ключ журнала
+    settings = {
+        'dpi': dpi,
+        'lang': OCR_LANG,
+        'render_backend': render_backend or available_backends()[0],
+        'recognizer': f'digits:{recognizer.min_score:g}' if recognizer is not None else 'tesseract',
+    }
+    journal = OcrJournal(pdf_path, settings=settings) if resume else None
 
-                # Извлекаем данные, основываясь на позициях заголовков
-                try:
-                    level = line[level_col_index:capacity_col_index].strip()
-                    capacity_str = line[capacity_col_index:].strip()
-                    capacity_str = capacity_str.replace(',', '.')  # Заменяем запятую на точку
-                    capacity = float(capacity_str)
+    try:
+        # 4. Записываем извлеченные данные в текстовый файл постранично
+        with open(output_txt_path, 'w') as outfile:
+            for _, _, rows in iter_scanned_rows(pdf_path, dpi, render_backend, journal, cache, recognizer):
+                for level, capacity in rows:
+                    outfile.write(f"{level}~{capacity:.3f}\n")
+                rows_written += len(rows)
+    except BaseException:
+        if journal is not None:
+            journal.close()
+            print(f"Обработка прервана, распознанные страницы сохранены в журнале: {journal.path}")
+        raise
+    finally:
+        if cache is not None:
+            cache.close()
 
-                    all_extracted_data.append((level, capacity))
-                except (ValueError, IndexError) as e:
-                    print(f"Ошибка при обработке строки '{line}' на странице {page_num + 1}: {e}")
-                    continue
+    if journal is not None:
+        journal.discard()
 
+    if recognizer is not None and recognizer.stats['lines']:
+        stats = recognizer.stats
+        print(f"Распознано по шаблонам: {stats['lines'] - stats['fallback_lines']} из {stats['lines']} строк")
 
-    # 4. Записываем извлеченные данные в текстовый файл
-    with open(output_txt_path, 'w') as outfile:
-        for level, capacity in all_extracted_data:
-            outfile.write(f"{level}~{capacity:.3f}\n")
+    print(f"Данные успешно извлечены и сохранены в файл: {output_txt_path} (строк: {rows_written})")
 
-    print(f"Данные успешно извлечены и сохранены в файл: {output_txt_path}")
+    # Проверка итоговой таблицы: строки не держатся в памяти, поэтому таблица читается из файла
+    with open(output_txt_path, 'r') as infile:
+        table = CalibrationTable.from_pairs((line.split('~', 1) for line in infile if '~' in line),
+                                            name=output_txt_path)
+    for message in validate_table(table, expected_capacity=expected_capacity).messages():
+        print(f"[ПРОВЕРКА] {message}")
+    if len(table) >= 4:
+        # Сверка с теоретической формой резервуара - справочная: указывает строки,
+        # которые стоит сравнить со сканом
+        for message in fit_geometry(table).messages():
+            print(f"[СПРАВКА] Сверка с формой: {message}")
 
 
 # Пример использования
-pdf_file = 'input.pdf'  # Замените на путь к вашему PDF файлу
-txt_file = 'output.txt'  # Замените на желаемый путь к выходному текстовому файлу
+if __name__ == "__main__":
+    pdf_file = 'input.pdf'  # Замените на путь к вашему PDF файлу
+    txt_file = 'output.txt'  # Замените на желаемый путь к выходному текстовому файлу
 
-extract_data_from_scanned_pdf(pdf_file, txt_file)
\ No newline at end of file
+    extract_data_from_scanned_pdf(pdf_file, txt_file)
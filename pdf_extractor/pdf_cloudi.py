@@ -1,29 +1,52 @@
 import os
 import re
+import sys
 import argparse
 from pathlib import Path
 import pypdf
 import pandas as pd
 import tabula
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator
 
-def extract_tables_from_pdf(pdf_path: str) -> List[pd.DataFrame]:
-    """Extract tables from a PDF file using tabula."""
-    # Extract all tables from the PDF
-    tables = tabula.read_pdf(
-        pdf_path,
-        pages='all',
-        multiple_tables=True,
-        lattice=True,  # Use lattice mode for tables with grid lines
-        guess=False,   # Don't guess table structure
-        stream=False   # Don't use stream mode
-    )
+# Shared project modules (calibration) live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calibration.numeric import parse_numbers
+from calibration.table import CalibrationTable
+from calibration.validation import validate_table
+from ocr_correction import correct_pairs
+
+# Every tabula.read_pdf call starts a JVM, so pages are handed over in chunks:
+# large enough to amortize the start-up, small enough to bound memory use
+DEFAULT_PAGES_PER_CHUNK = 30
+
+def iter_tables_from_pdf(pdf_path: str, pages_per_chunk: int = DEFAULT_PAGES_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """Extract tables chunk by chunk so only one chunk of DataFrames is alive at a time."""
+    page_count = len(pypdf.PdfReader(pdf_path).pages)
     
-    return tables
+    for first_page in range(1, page_count + 1, pages_per_chunk):
+        pages = list(range(first_page, min(first_page + pages_per_chunk, page_count + 1)))
+        tables = tabula.read_pdf(
+            pdf_path,
+            pages=pages,
+            multiple_tables=True,
+            lattice=True,  # Use lattice mode for tables with grid lines
+            guess=False,   # Don't guess table structure
+            stream=False   # Don't use stream mode
+        )
+        
+        while tables:
+            yield tables.pop(0)
+
+def iter_level_volume_pairs(pdf_path: str, pages_per_chunk: int = DEFAULT_PAGES_PER_CHUNK) -> Iterator[Tuple[int, float]]:
+    """Yield level-volume pairs table by table without keeping extracted tables around."""
+    for table in iter_tables_from_pdf(pdf_path, pages_per_chunk):
+        calibration_tables = identify_calibration_tables([table])
+        yield from extract_level_volume_pairs(calibration_tables)
 
-def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.DataFrame, str, str]]:
-    """Identify calibration tables among extracted tables and focus on level and volume columns only."""
+def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.DataFrame, str, str, Optional[str]]]:
+    """Identify calibration tables among extracted tables and find level, volume and (if present) increment columns."""
     calibration_tables = []
     
     for table in tables:
@@ -42,7 +65,7 @@ def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.Dat
         
         # If found through column headers
         if level_col and volume_col:
-            calibration_tables.append((table, level_col, volume_col))
+            calibration_tables.append((table, level_col, volume_col, None))
             continue
             
         # Strategy 2: Check first rows for header information
@@ -67,7 +90,7 @@ def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.Dat
                     # Found both columns, use data below these headers
                     filtered_table = table.iloc[i+1:].copy()
                     filtered_table.columns = table.columns
-                    calibration_tables.append((filtered_table, level_col, volume_col))
+                    calibration_tables.append((filtered_table, level_col, volume_col, None))
                     break
         
         # Strategy 3: For tables with consistent structure but no clear headers
@@ -77,8 +100,7 @@ def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.Dat
             for col_idx in range(len(table.columns)):
                 # Check if column contains mostly numeric values
                 values = table[table.columns[col_idx]].dropna()
-                numeric_count = sum(1 for v in values if isinstance(v, (int, float)) or 
-                                   (isinstance(v, str) and re.match(r'^\d+\.?\d*, v.replace(",", .')))
+                numeric_count = int(parse_numbers(values.tolist())[1].sum())
                 if numeric_count > len(values) * 0.7:  # More than 70% numeric
                     numeric_columns.append(col_idx)
             
@@ -89,75 +111,47 @@ def identify_calibration_tables(tables: List[pd.DataFrame]) -> List[Tuple[pd.Dat
                 col3_idx = numeric_columns[i+2]
                 
                 # Check if third column has values around 0.08xx (coefficients to ignore)
-                coef_pattern = False
-                for val in table[table.columns[col3_idx]].dropna():
-                    if isinstance(val, str):
-                        val = val.replace(',', '.').strip()
-                        if re.match(r'0\.08\d+', val):
-                            coef_pattern = True
-                            break
-                    elif isinstance(val, float) and 0.08 <= val <= 0.09:
-                        coef_pattern = True
-                        break
+                coefficients, valid = parse_numbers(table[table.columns[col3_idx]].dropna().tolist())
+                coef_pattern = bool(np.any(valid & (coefficients >= 0.08) & (coefficients <= 0.09)))
                 
                 # If this looks like a calibration block, take the first two columns
+                # and keep the coefficient column for checking volume increments
                 if coef_pattern:
                     level_col = table.columns[col1_idx]
                     volume_col = table.columns[col2_idx]
-                    calibration_tables.append((table, level_col, volume_col))
+                    increment_col = table.columns[col3_idx]
+                    calibration_tables.append((table, level_col, volume_col, increment_col))
                     break
     
     return calibration_tables
 
-def extract_level_volume_pairs(calibration_tables: List[Tuple[pd.DataFrame, str, str]]) -> List[Tuple[int, float]]:
-    """Extract level-volume pairs from calibration tables."""
+def extract_level_volume_pairs(calibration_tables: List[Tuple[pd.DataFrame, str, str, Optional[str]]]) -> List[Tuple[int, float]]:
+    """Extract level-volume pairs from calibration tables, correcting single-digit misreads per table."""
     level_volume_pairs = []
     
-    for table, level_col, volume_col in calibration_tables:
-        for _, row in table.iterrows():
-            level_value = row[level_col]
-            volume_value = row[volume_col]
-            
-            # Skip rows with missing values
-            if pd.isna(level_value) or pd.isna(volume_value):
-                continue
-            
-            # Convert to string and clean up
-            if isinstance(level_value, str):
-                level_str = level_value.strip()
-                # Extract only numbers from the level string
-                level_match = re.search(r'\d+', level_str)
-                if level_match:
-                    level = int(level_match.group())
-                else:
-                    continue
-            else:
-                try:
-                    level = int(level_value)
-                except (ValueError, TypeError):
-                    continue
-            
-            if isinstance(volume_value, str):
-                volume_str = volume_value.strip().replace(' ', '')
-                # Replace comma with dot for decimal point
-                volume_str = volume_str.replace(',', '.')
-                # Extract floating point number
-                volume_match = re.search(r'\d+\.\d+', volume_str)
-                if volume_match:
-                    volume = float(volume_match.group())
-                else:
-                    # Try to convert the whole string
-                    try:
-                        volume = float(volume_str)
-                    except (ValueError, TypeError):
-                        continue
-            else:
-                try:
-                    volume = float(volume_value)
-                except (ValueError, TypeError):
-                    continue
-            
-            level_volume_pairs.append((level, volume))
+    for table, level_col, volume_col, increment_col in calibration_tables:
+        # Skip rows with missing values
+        table = table.dropna(subset=[level_col, volume_col])
+        
+        # Parse whole columns at once; cells like "300 см" or "258,217" yield their first number
+        levels, level_valid = parse_numbers(table[level_col].tolist(), integer=True, search=True)
+        volumes, volume_valid = parse_numbers(table[volume_col].tolist(), search=True)
+        valid = level_valid & volume_valid
+        
+        table_pairs = list(zip(levels[valid].tolist(), volumes[valid].tolist()))
+        increments = None
+        if increment_col is not None:
+            coefficients, coefficient_valid = parse_numbers(table[increment_col].tolist())
+            increments = np.where(coefficient_valid, coefficients, np.nan)[valid]
+        
+        # Check rows against level step, monotonicity and the increment column
+        table_pairs, corrections, unresolved = correct_pairs(table_pairs, increments)
+        for correction in corrections:
+            print(f"Corrected {correction.field} in row {correction.index + 1}: {correction.old:g} -> {correction.new:g}")
+        for position in unresolved:
+            level, volume = table_pairs[position]
+            print(f"Warning: check row {position + 1}: {level}~{volume:g}")
+        level_volume_pairs.extend(table_pairs)
     
     # Sort by level
     level_volume_pairs.sort(key=lambda x: x[0])
@@ -176,14 +170,12 @@ def fallback_extraction(pdf_path: str) -> List[Tuple[int, float]]:
         # This regex looks for a pattern of digits followed by space and then digits with optional decimal point
         pattern = r'(\d+)\s+(\d+[\.,]\d+)'
         matches = re.findall(pattern, text)
+        if not matches:
+            continue
         
-        for match in matches:
-            try:
-                level = int(match[0])
-                volume = float(match[1].replace(',', '.'))
-                level_volume_pairs.append((level, volume))
-            except (ValueError, IndexError):
-                continue
+        levels, _ = parse_numbers([match[0] for match in matches], integer=True)
+        volumes, _ = parse_numbers([match[1] for match in matches])
+        level_volume_pairs.extend(zip(levels.tolist(), volumes.tolist()))
     
     # Sort by level
     level_volume_pairs.sort(key=lambda x: x[0])
@@ -196,13 +188,18 @@ def write_to_txt(pairs: List[Tuple[int, float]], output_path: str):
         for level, volume in pairs:
             f.write(f"{level}~{volume:.3f}\n")
 
-def clean_and_filter_pairs(pairs: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
-    """Clean and filter the pairs to remove duplicates and ensure proper sorting."""
-    # Remove duplicates
-    unique_pairs = list(set(pairs))
+def clean_and_filter_pairs(pairs: List[Tuple[int, float]],
+                           expected_capacity: Optional[float] = None) -> List[Tuple[int, float]]:
+    """Validate the pairs, then keep one volume per level (the last one read) sorted by level."""
+    report = validate_table(CalibrationTable.from_pairs(pairs), expected_capacity=expected_capacity)
+    for message in report.messages():
+        print(f"Validation: {message}")
+    
+    # Conflicting volumes for one level are reported above; only one may go to the output
+    unique_pairs = dict(pairs)
     
     # Sort by level
-    sorted_pairs = sorted(unique_pairs, key=lambda x: x[0])
+    sorted_pairs = sorted(unique_pairs.items(), key=lambda x: x[0])
     
     return sorted_pairs
 
@@ -210,6 +207,10 @@ def main():
     parser = argparse.ArgumentParser(description='Extract calibration data from PDF tables.')
     parser.add_argument('pdf_path', help='Path to the PDF file')
     parser.add_argument('--output', '-o', help='Output text file path', default=None)
+    parser.add_argument('--pages-per-chunk', type=int, default=DEFAULT_PAGES_PER_CHUNK,
+                        help='Number of pages handed to tabula at once (bounds memory use)')
+    parser.add_argument('--capacity', type=float, default=None,
+                        help='Nominal tank capacity, m3, checked against the top row')
     args = parser.parse_args()
     
     pdf_path = args.pdf_path
@@ -218,10 +219,8 @@ def main():
     print(f"Processing PDF: {pdf_path}")
     
     try:
-        # Try tabula extraction first
-        tables = extract_tables_from_pdf(pdf_path)
-        calibration_tables = identify_calibration_tables(tables)
-        level_volume_pairs = extract_level_volume_pairs(calibration_tables)
+        # Try tabula extraction first, streaming tables page by page
+        level_volume_pairs = list(iter_level_volume_pairs(pdf_path, args.pages_per_chunk))
         
         # If tabula doesn't find enough data, try fallback method
         if len(level_volume_pairs) < 10:
@@ -229,7 +228,7 @@ def main():
             level_volume_pairs = fallback_extraction(pdf_path)
         
         # Clean and filter the pairs
-        final_pairs = clean_and_filter_pairs(level_volume_pairs)
+        final_pairs = clean_and_filter_pairs(level_volume_pairs, args.capacity)
         
         if final_pairs:
             write_to_txt(final_pairs, output_path)
@@ -244,7 +243,7 @@ def main():
         try:
             print("Trying fallback extraction method...")
             level_volume_pairs = fallback_extraction(pdf_path)
-            final_pairs = clean_and_filter_pairs(level_volume_pairs)
+            final_pairs = clean_and_filter_pairs(level_volume_pairs, args.capacity)
             
             if final_pairs:
                 write_to_txt(final_pairs, output_path)
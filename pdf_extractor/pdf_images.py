@@ -0,0 +1,230 @@
+import io
+import struct
+
+from PIL import Image, ImageOps
+from pdfminer.pdftypes import resolve1
+
+# Минимальная доля площади страницы, которую должно занимать изображение,
+# чтобы страница считалась отсканированной (одно изображение на всю страницу)
+MIN_PAGE_COVERAGE = 0.9
+
+# Допустимое расхождение пропорций изображения и области, в которую оно вписано
+ASPECT_TOLERANCE = 0.1
+
+
+def _name(obj):
+    """Возвращает имя PDF-литерала (/DCTDecode -> 'DCTDecode') или None."""
+    obj = resolve1(obj)
+    name = getattr(obj, 'name', None)
+    if isinstance(name, bytes):
+        name = name.decode('latin-1')
+    return name
+
+
+def _colorspace_components(colorspace):
+    """
+    Определяет число цветовых компонент изображения.
+
+    Поддерживаются только DeviceGray, DeviceRGB и ICCBased с 1 или 3 компонентами;
+    для остальных пространств (Indexed, Separation, CMYK ...) возвращается None.
+    """
+    if isinstance(colorspace, list):
+        if not colorspace:
+            return None
+        if len(colorspace) == 1:
+            return _colorspace_components(colorspace[0])
+        if _name(colorspace[0]) == 'ICCBased':
+            profile = resolve1(colorspace[1])
+            n = resolve1(profile.get('N')) if hasattr(profile, 'get') else None
+            return n if n in (1, 3) else None
+        return None
+
+    name = _name(colorspace)
+    if name in ('DeviceGray', 'G', 'CalGray'):
+        return 1
+    if name in ('DeviceRGB', 'RGB', 'CalRGB'):
+        return 3
+    return None
+
+
+def _ccitt_to_tiff(data, width, height, params):
+    """
+    Оборачивает поток CCITTFax в минимальный TIFF-заголовок,
+    чтобы его декодировал libtiff через Pillow, а не медленный декодер pdfminer.
+    """
+    k = resolve1(params.get('K', 0)) or 0
+    compression = 4 if k < 0 else 3  # 4 - CCITT G4, 3 - CCITT G3
+    t4_options = 0
+    if k > 0:
+        t4_options |= 1  # двумерное кодирование G3
+    if resolve1(params.get('EncodedByteAlign', False)):
+        if compression == 4:
+            return None
+        t4_options |= 4
+    # При BlackIs1 фильтр PDF выдаёт чёрные участки единицами, и в DeviceGray
+    # они выглядят белыми - то же даёт TIFF с BlackIsZero
+    photometric = 1 if resolve1(params.get('BlackIs1', False)) else 0
+
+    tags = [
+        (256, 4, 1, width),        # ImageWidth
+        (257, 4, 1, height),       # ImageLength
+        (258, 3, 1, 1),            # BitsPerSample
+        (259, 3, 1, compression),  # Compression
+        (262, 3, 1, photometric),  # PhotometricInterpretation: WhiteIsZero или BlackIsZero
+        (273, 4, 1, 0),            # StripOffsets (заполняется ниже)
+        (278, 4, 1, height),       # RowsPerStrip
+        (279, 4, 1, len(data)),    # StripByteCounts
+    ]
+    if compression == 3:
+        tags.append((292, 4, 1, t4_options))  # T4Options
+
+    data_offset = 8 + 2 + 12 * len(tags) + 4
+    header = bytearray(b'II' + struct.pack('<HI', 42, 8))
+    header += struct.pack('<H', len(tags))
+    for tag, field_type, count, value in tags:
+        if tag == 273:
+            value = data_offset
+        header += struct.pack('<HHII', tag, field_type, count, value)
+    header += struct.pack('<I', 0)
+    return bytes(header) + data
+
+
+def _decode_raw(stream, width, height, bits, components):
+    """Создаёт изображение из несжатых (после Flate/LZW) пикселей без копирования буфера."""
+    if bits == 8 and components == 1:
+        mode = 'L'
+    elif bits == 8 and components == 3:
+        mode = 'RGB'
+    elif bits == 1 and components == 1:
+        mode = '1'
+    else:
+        return None
+
+    data = stream.get_data()
+    stride = (width * bits * components + 7) // 8
+    if len(data) < stride * height:
+        return None
+
+    # frombuffer ссылается на декодированные байты потока, а не копирует их
+    return Image.frombuffer(mode, (width, height), data, 'raw', mode, stride, 1)
+
+
+def decode_image_stream(image_obj):
+    """
+    Декодирует встроенное изображение PDF в исходном разрешении.
+
+    Args:
+        image_obj (dict): Объект изображения из page.images (pdfplumber).
+
+    Returns:
+        PIL.Image.Image | None: Изображение или None, если формат не поддерживается
+        и страницу нужно отрисовать обычным способом.
+    """
+    stream = image_obj.get('stream')
+    if stream is None or image_obj.get('imagemask'):
+        return None
+    # Зашифрованные потоки декодирует только pdfminer, исходные байты бесполезны
+    if getattr(stream, 'decipher', None):
+        return None
+
+    width, height = image_obj.get('srcsize') or (None, None)
+    if not width or not height:
+        return None
+
+    filters = stream.get_filters()
+    last_filter, params = filters[-1] if filters else (None, {})
+    last_filter = _name(last_filter)
+    params = resolve1(params) or {}
+    bits = resolve1(image_obj.get('bits')) or 8
+    components = _colorspace_components(image_obj.get('colorspace'))
+
+    try:
+        if last_filter in ('DCTDecode', 'DCT', 'JPXDecode'):
+            if len(filters) != 1:
+                return None
+            # BytesIO разделяет буфер с bytes до первой записи - без копирования
+            image = Image.open(io.BytesIO(stream.get_rawdata()))
+            if image.mode not in ('L', 'RGB', '1'):
+                return None
+        elif last_filter in ('CCITTFaxDecode', 'CCF'):
+            if len(filters) != 1:
+                return None
+            tiff = _ccitt_to_tiff(stream.get_rawdata(), width, height, params)
+            if tiff is None:
+                return None
+            image = Image.open(io.BytesIO(tiff))
+        elif last_filter in ('JBIG2Decode',):
+            # Pillow не умеет JBIG2 - такие страницы отрисовываются
+            return None
+        else:
+            if components is None:
+                return None
+            image = _decode_raw(stream, width, height, bits, components)
+            if image is None:
+                return None
+        image.load()
+    except Exception:
+        return None
+
+    decode = resolve1(stream.get_any(('D', 'Decode')))
+    if isinstance(decode, list) and len(decode) == 2 and decode[0] == 1 and decode[1] == 0:
+        image = ImageOps.invert(image.convert('L'))
+
+    return image
+
+
+def find_scan_image(page):
+    """
+    Проверяет, является ли страница сканом: ровно одно изображение,
+    покрывающее почти всю страницу, без векторной графики поверх него.
+
+    Returns:
+        dict | None: Объект изображения из page.images или None.
+    """
+    images = page.images
+    if len(images) != 1:
+        return None
+    if page.rects or page.lines or page.curves:
+        return None
+
+    image_obj = images[0]
+    image_width = image_obj['x1'] - image_obj['x0']
+    image_height = image_obj['bottom'] - image_obj['top']
+    if image_width <= 0 or image_height <= 0:
+        return None
+    if image_width * image_height < MIN_PAGE_COVERAGE * page.width * page.height:
+        return None
+
+    # Если изображение повёрнуто матрицей трансформации, пропорции не совпадут
+    width, height = image_obj.get('srcsize') or (0, 0)
+    if not width or not height:
+        return None
+    if abs(width / height - image_width / image_height) > ASPECT_TOLERANCE * (image_width / image_height):
+        return None
+
+    return image_obj
+
+
+def extract_page_image(page):
+    """
+    Извлекает встроенное изображение отсканированной страницы без повторной растеризации.
+
+    Args:
+        page (pdfplumber.page.Page): Страница PDF.
+
+    Returns:
+        PIL.Image.Image | None: Изображение страницы в исходном разрешении
+        или None, если страницу нужно отрисовать.
+    """
+    image_obj = find_scan_image(page)
+    if image_obj is None:
+        return None
+
+    image = decode_image_stream(image_obj)
+    if image is None:
+        return None
+
+    rotation = getattr(page, 'rotation', 0) or 0
+    if rotation % 360:
+        image = image.rotate(-rotation, expand=True)
+    return image
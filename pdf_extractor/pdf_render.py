@@ -0,0 +1,209 @@
+import argparse
+import time
+
+import pdfplumber
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # pypdfium2 - необязательная зависимость
+    pdfium = None
+    pdfium_c = None
+
+# Разрешение по умолчанию для OCR: Tesseract лучше всего работает при 300 dpi
+DEFAULT_DPI = 300
+
+
+def release_page(pdf, page):
+    """
+    Освобождает разобранные объекты страницы pdfplumber.
+
+    Кроме кэшей самой страницы сбрасываются кэши pdfplumber на уровне документа
+    (объекты, собранные со всех прочитанных страниц). Кэш разобранных объектов
+    pdfminer открытого API для очистки не имеет и остаётся до закрытия документа.
+    """
+    page.close()
+    pdf.flush_cache()
+
+
+def iter_pages(pdf):
+    """
+    Перебирает страницы открытого pdfplumber документа, освобождая каждую после обработки.
+
+    Yields:
+        tuple: (номер страницы с нуля, pdfplumber.page.Page).
+    """
+    for page_num in range(len(pdf.pages)):
+        page = pdf.pages[page_num]
+        try:
+            yield page_num, page
+        finally:
+            release_page(pdf, page)
+
+
+class RenderBackend:
+    """
+    Базовый класс средства отрисовки страниц PDF.
+
+    Все реализации возвращают 8-битное полутоновое изображение (режим 'L')
+    в запрошенном разрешении. Область clip задаётся в координатах pdfplumber:
+    (x0, top, x1, bottom) в пунктах от левого верхнего угла страницы.
+    """
+
+    name = None
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+
+    def render_page(self, page_index, dpi=DEFAULT_DPI, clip=None):
+        raise NotImplementedError
+
+    def page_count(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PdfplumberBackend(RenderBackend):
+    """Отрисовка через pdfplumber (pypdfium2 внутри новых версий или Wand в старых)."""
+
+    name = 'pdfplumber'
+
+    def __init__(self, pdf_path):
+        super().__init__(pdf_path)
+        self.pdf = pdfplumber.open(pdf_path)
+
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    def render_page(self, page_index, dpi=DEFAULT_DPI, clip=None):
+        page = self.pdf.pages[page_index]
+        try:
+            region = page.crop(clip) if clip is not None else page
+            return region.to_image(resolution=dpi).original.convert('L')
+        finally:
+            release_page(self.pdf, page)
+
+    def close(self):
+        self.pdf.close()
+
+
+class PdfiumBackend(RenderBackend):
+    """Прямая отрисовка через PDFium сразу в полутоновый битмап без промежуточного RGB."""
+
+    name = 'pdfium'
+
+    def __init__(self, pdf_path):
+        super().__init__(pdf_path)
+        self.pdf = pdfium.PdfDocument(pdf_path)
+
+    def page_count(self):
+        return len(self.pdf)
+
+    def render_page(self, page_index, dpi=DEFAULT_DPI, clip=None):
+        page = self.pdf[page_index]
+        try:
+            crop = (0, 0, 0, 0)
+            if clip is not None:
+                # PDFium обрезает отступами от краёв в системе координат PDF (начало внизу)
+                width, height = page.get_size()
+                x0, top, x1, bottom = clip
+                crop = (x0, height - bottom, width - x1, top)
+
+            bitmap = page.render(
+                scale=dpi / 72,
+                crop=crop,
+                grayscale=True,
+                force_bitmap_format=pdfium_c.FPDFBitmap_Gray,
+            )
+            # Копия нужна, чтобы изображение не зависело от времени жизни буфера PDFium
+            return bitmap.to_pil().copy()
+        finally:
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+
+BACKENDS = {
+    PdfiumBackend.name: PdfiumBackend,
+    PdfplumberBackend.name: PdfplumberBackend,
+}
+
+
+def available_backends():
+    """Возвращает имена доступных средств отрисовки в порядке предпочтения."""
+    names = []
+    if pdfium is not None:
+        names.append(PdfiumBackend.name)
+    names.append(PdfplumberBackend.name)
+    return names
+
+
+def open_backend(pdf_path, name=None):
+    """
+    Открывает PDF выбранным средством отрисовки.
+
+    Args:
+        pdf_path (str): Путь к PDF файлу.
+        name (str | None): 'pdfium' или 'pdfplumber'; по умолчанию - самое быстрое доступное.
+
+    Returns:
+        RenderBackend: Открытое средство отрисовки (закрыть через close() или with).
+    """
+    available = available_backends()
+    if name is None:
+        name = available[0]
+    if name not in available:
+        raise ValueError(f"Средство отрисовки '{name}' недоступно. Доступны: {', '.join(available)}")
+    return BACKENDS[name](pdf_path)
+
+
+def benchmark_backends(pdf_path, dpi=DEFAULT_DPI, max_pages=5, clip=None):
+    """
+    Замеряет время отрисовки первых страниц каждым доступным средством.
+
+    Returns:
+        dict: имя -> список времени отрисовки каждой страницы в секундах.
+    """
+    results = {}
+    for name in available_backends():
+        timings = []
+        with open_backend(pdf_path, name) as backend:
+            for page_index in range(min(max_pages, backend.page_count())):
+                start = time.perf_counter()
+                backend.render_page(page_index, dpi=dpi, clip=clip)
+                timings.append(time.perf_counter() - start)
+        results[name] = timings
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF page rendering backends.')
+    parser.add_argument('pdf_path', help='Path to the PDF file')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='Target resolution')
+    parser.add_argument('--pages', type=int, default=5, help='Number of pages to render')
+    parser.add_argument('--clip', type=float, nargs=4, metavar=('X0', 'TOP', 'X1', 'BOTTOM'),
+                        help='Render only this region (points)', default=None)
+    args = parser.parse_args()
+
+    results = benchmark_backends(args.pdf_path, args.dpi, args.pages, args.clip)
+    print(f"Rendering {args.pdf_path} at {args.dpi} dpi")
+    for name, timings in results.items():
+        if not timings:
+            print(f"{name:>12}: no pages")
+            continue
+        total = sum(timings)
+        print(f"{name:>12}: {len(timings)} pages, {total * 1000 / len(timings):8.1f} ms/page, "
+              f"total {total:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Copyright (c) 2025 Шмерко Евгений Леонидович
+# SPDX-License-Identifier: MIT
+
+"""
+Замер времени запуска графического приложения.
+
+Приложение запускается несколько раз с переменными окружения
+CONTAB_STARTUP_TIMING (файл, куда оно записывает этапы запуска) и
+CONTAB_STARTUP_EXIT (закрыться, как только окно готово). Для каждого этапа
+выводится медиана по запускам:
+
+    imports      - модули загружены, создаётся QApplication
+    window       - главное окно построено
+    first_paint  - окно впервые отрисовано
+    ready        - достроены необязательные части (очередь заданий)
+
+Время отсчитывается от начала импорта contab_v.0.0.3.py; полное время процесса
+(вместе с запуском интерпретатора или распаковкой сборки PyInstaller) выводится отдельно.
+При запуске из исходников дополнительно включается -X importtime и выводятся
+самые медленные модули верхнего уровня.
+
+Примеры:
+    python startup_timing.py
+    python startup_timing.py --runs 10 --top 30
+    python startup_timing.py --exe dist/contab_v.0.0.3.exe
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contab_v.0.0.3.py')
+STAGES = ('imports', 'window', 'first_paint', 'ready')
+
+
+def parse_importtime(stderr):
+    """Суммарное время импорта модулей верхнего уровня из вывода -X importtime, мкс."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Вложенные импорты выводятся с отступом
+        if not name.startswith(' ') or name.startswith('  '):
+            continue
+        modules[name.strip()] = modules.get(name.strip(), 0) + int(cumulative)
+    return modules
+
+
+def run_once(command, timeout):
+    """Один запуск приложения: этапы запуска (мс), время процесса (мс) и stderr."""
+    fd, timing_path = tempfile.mkstemp(prefix='contab_startup_', suffix='.txt')
+    os.close(fd)
+    env = dict(os.environ, CONTAB_STARTUP_TIMING=timing_path, CONTAB_STARTUP_EXIT='1')
+    try:
+        start = time.perf_counter()
+        completed = subprocess.run(command, env=env, capture_output=True, text=True, timeout=timeout)
+        process_ms = (time.perf_counter() - start) * 1000
+        stages = {}
+        with open(timing_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                stage, milliseconds = line.split()
+                stages[stage] = float(milliseconds)
+    finally:
+        os.remove(timing_path)
+    if completed.returncode != 0 or 'ready' not in stages:
+        raise RuntimeError(f"Приложение завершилось с кодом {completed.returncode}:\n{completed.stderr[-2000:]}")
+    return stages, process_ms, completed.stderr
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замер времени запуска графического приложения')
+    parser.add_argument('--runs', type=int, default=5, help='Число запусков (по умолчанию 5)')
+    parser.add_argument('--exe', help='Собранный исполняемый файл вместо contab_v.0.0.3.py')
+    parser.add_argument('--top', type=int, default=15, help='Сколько самых медленных модулей показать')
+    parser.add_argument('--timeout', type=float, default=120, help='Наибольшее время одного запуска, с')
+    args = parser.parse_args(argv)
+
+    if args.exe:
+        command = [os.path.abspath(args.exe)]
+    else:
+        command = [sys.executable, '-X', 'importtime', GUI_SCRIPT]
+
+    runs = []
+    modules = {}
+    for number in range(1, args.runs + 1):
+        try:
+            stages, process_ms, stderr = run_once(command, args.timeout)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"Запуск {number}: {e}", file=sys.stderr)
+            return 2
+        runs.append(dict(stages, process=process_ms))
+        for name, microseconds in parse_importtime(stderr).items():
+            modules.setdefault(name, []).append(microseconds)
+        print(f"Запуск {number}: первая отрисовка {stages.get('first_paint', float('nan')):.0f} мс, "
+              f"процесс {process_ms:.0f} мс")
+
+    print()
+    print(f"Медиана по {len(runs)} запускам, мс:")
+    for stage in STAGES + ('process',):
+        values = [run[stage] for run in runs if stage in run]
+        if values:
+            print(f"  {stage:<12} {statistics.median(values):8.1f}")
+
+    if modules:
+        print()
+        print("Самые медленные модули верхнего уровня (медиана, мс):")
+        slowest = sorted(modules.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for name, values in slowest[:args.top]:
+            print(f"  {statistics.median(values) / 1000:8.1f}  {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())